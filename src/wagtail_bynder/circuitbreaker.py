@@ -0,0 +1,184 @@
+import functools
+import threading
+import time
+import types
+
+from collections.abc import Iterator
+from typing import Any
+
+import requests
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .exceptions import BynderUnavailable
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+_CIRCUIT_BREAKER: "CircuitBreaker | None" = None
+_CIRCUIT_BREAKER_CREATED = False
+_CIRCUIT_BREAKER_LOCK = threading.Lock()
+
+
+def is_failure(error: BaseException) -> bool:
+    """
+    Return ``True`` if ``error`` (raised by a request to the Bynder API)
+    suggests that Bynder is unavailable, rather than there being a problem
+    with the request itself.
+    """
+    if isinstance(
+        error,
+        requests.ConnectionError
+        | requests.Timeout
+        # The connection was lost partway through a (streamed) response
+        | requests.exceptions.ChunkedEncodingError,
+    ):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code >= 500
+    return False
+
+
+class CircuitBreaker:
+    """
+    Stops requests from being made to the Bynder API for ``recovery_timeout``
+    seconds once ``failure_threshold`` requests in a row have failed (see
+    ``is_failure()``), so that callers fail fast with ``BynderUnavailable``
+    instead of each waiting for a request to time out.
+
+    Once ``recovery_timeout`` has passed, a single request is let through to
+    check whether Bynder has recovered. If it succeeds, requests are allowed
+    again as normal. If it fails, the breaker stays open for another
+    ``recovery_timeout`` seconds.
+    """
+
+    def __init__(self, failure_threshold: int, recovery_timeout: float):
+        self.failure_threshold = max(int(failure_threshold), 1)
+        self.recovery_timeout = float(recovery_timeout)
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.lock = threading.Lock()
+
+    def call(self, func, *args, **kwargs) -> Any:
+        """
+        Return the result of calling ``func(*args, **kwargs)``, or raise
+        ``BynderUnavailable`` without calling it if the breaker is open.
+        """
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if is_failure(e):
+                self.record_failure()
+            else:
+                # Bynder responded, so is available
+                self.record_success()
+            raise
+        self.record_success()
+        return result
+
+    def iterate(self, iterator: Iterator[Any]) -> Iterator[Any]:
+        """
+        Yield the items from ``iterator`` (e.g. one returned by a call that
+        streams its response), recording errors raised while iterating as
+        failures, as if they had been raised by the call itself.
+        """
+        try:
+            yield from iterator
+        except Exception as e:
+            if is_failure(e):
+                self.record_failure()
+            raise
+
+    def before_call(self) -> None:
+        with self.lock:
+            if self.state == CLOSED:
+                return
+            now = time.monotonic()
+            if now - self.opened_at >= self.recovery_timeout:
+                # Let this request through to check whether Bynder has
+                # recovered, while others continue to fail fast
+                self.state = HALF_OPEN
+                self.opened_at = now
+                return
+        raise BynderUnavailable(
+            "Bynder is currently unavailable, following repeated failed requests."
+        )
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+
+class CircuitBreakerClient:
+    """
+    Wraps a Bynder API client (e.g. ``BynderClient.asset_bank_client``) so
+    that every method call is made through ``breaker``, including the
+    iteration of any generator returned (such as by
+    ``StreamingAssetBankClient.iter_media_list()``).
+    """
+
+    def __init__(self, client: Any, breaker: CircuitBreaker):
+        self._client = client
+        self._breaker = breaker
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._client, name)
+        if not callable(value):
+            return value
+
+        @functools.wraps(value)
+        def guarded(*args, **kwargs):
+            result = self._breaker.call(value, *args, **kwargs)
+            if isinstance(result, types.GeneratorType):
+                return self._breaker.iterate(result)
+            return result
+
+        return guarded
+
+
+def get_circuit_breaker() -> CircuitBreaker | None:
+    """
+    Return the ``CircuitBreaker`` shared by all requests to the Bynder API
+    made by the process, or ``None`` if the
+    ``BYNDER_CIRCUIT_BREAKER_THRESHOLD`` setting is not set.
+    """
+    global _CIRCUIT_BREAKER, _CIRCUIT_BREAKER_CREATED
+    if not _CIRCUIT_BREAKER_CREATED:
+        with _CIRCUIT_BREAKER_LOCK:
+            if not _CIRCUIT_BREAKER_CREATED:
+                threshold = getattr(settings, "BYNDER_CIRCUIT_BREAKER_THRESHOLD", None)
+                _CIRCUIT_BREAKER = (
+                    CircuitBreaker(
+                        threshold,
+                        getattr(
+                            settings, "BYNDER_CIRCUIT_BREAKER_RECOVERY_TIMEOUT", 30
+                        ),
+                    )
+                    if threshold
+                    else None
+                )
+                _CIRCUIT_BREAKER_CREATED = True
+    return _CIRCUIT_BREAKER
+
+
+@receiver(setting_changed)
+def reset_circuit_breaker(*, setting: str, **kwargs) -> None:
+    global _CIRCUIT_BREAKER, _CIRCUIT_BREAKER_CREATED
+    if setting.startswith("BYNDER_CIRCUIT_BREAKER"):
+        with _CIRCUIT_BREAKER_LOCK:
+            _CIRCUIT_BREAKER = None
+            _CIRCUIT_BREAKER_CREATED = False
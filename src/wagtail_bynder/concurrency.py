@@ -0,0 +1,493 @@
+import contextvars
+import copy
+import queue
+import threading
+import time
+import uuid
+
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from concurrent import futures
+from dataclasses import dataclass
+from typing import Any
+
+from django.core.cache import caches
+from django.db import connections
+
+
+@dataclass(frozen=True)
+class TaskResult:
+    """
+    The outcome of running a ``TaskRunner`` function for a single item.
+    """
+
+    item: Any
+    value: Any = None
+    error: Exception | None = None
+
+    def get(self) -> Any:
+        """
+        Return the value returned by the function, or raise the exception
+        it raised.
+        """
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    Works out how many calls a ``TaskRunner`` should have in flight at
+    once, between ``minimum`` and ``maximum``, using additive increase /
+    multiplicative decrease (AIMD).
+
+    The limit starts at ``minimum``, and grows by one for each round of
+    successful calls. It is multiplied by ``backoff_factor`` when a call fails
+    because the server is overloaded (according to ``get_retry_delay``), or
+    when calls start taking more than ``latency_tolerance`` times as long as
+    they did when things were quickest. It is reduced at most once per round,
+    so that calls that were already in flight don't cut it further.
+
+    ``get_retry_delay`` should return the number of seconds to wait before
+    retrying a call that raised the supplied exception because the server
+    was overloaded, or ``None`` for any other exception. Overloaded calls are
+    retried up to ``max_retries`` times.
+    """
+
+    # How much weight to give the latest call duration in the moving average
+    smoothing = 0.2
+
+    def __init__(
+        self,
+        maximum: int,
+        *,
+        minimum: int = 1,
+        backoff_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        max_retries: int = 3,
+        get_retry_delay: Callable[[Exception], float | None] | None = None,
+    ):
+        self.maximum = max(int(maximum), 1)
+        self.minimum = min(max(int(minimum), 1), self.maximum)
+        self.backoff_factor = backoff_factor
+        self.latency_tolerance = latency_tolerance
+        self.max_retries = max_retries
+        self._get_retry_delay = get_retry_delay
+        self.limit = float(self.minimum)
+        self.latency: float | None = None
+        self.baseline_latency: float | None = None
+        self.backed_off_at: float | None = None
+        self.lock = threading.Lock()
+
+    @property
+    def current(self) -> int:
+        """
+        The number of calls that should currently be in flight at once.
+        """
+        return int(self.limit)
+
+    def get_retry_delay(self, error: Exception) -> float | None:
+        if self._get_retry_delay is None:
+            return None
+        return self._get_retry_delay(error)
+
+    def record_success(self, duration: float) -> None:
+        """
+        Adjust the limit following a call that succeeded (or failed for
+        reasons unrelated to load) after ``duration`` seconds.
+        """
+        with self.lock:
+            if self.latency is None:
+                self.latency = duration
+            else:
+                self.latency += self.smoothing * (duration - self.latency)
+            if self.baseline_latency is None or self.latency < self.baseline_latency:
+                self.baseline_latency = self.latency
+            if self.latency > self.baseline_latency * self.latency_tolerance:
+                self.back_off()
+                # Allow for calls having become slower for good
+                self.baseline_latency += self.smoothing * (
+                    self.latency - self.baseline_latency
+                )
+            else:
+                # Add one for every 'limit' successful calls
+                self.limit = min(self.limit + 1 / self.limit, float(self.maximum))
+
+    def record_overload(self) -> None:
+        """
+        Adjust the limit following a call that failed because the server is
+        overloaded.
+        """
+        with self.lock:
+            self.back_off()
+
+    def back_off(self) -> None:
+        now = time.monotonic()
+        if (
+            self.backed_off_at is not None
+            and self.latency is not None
+            and now - self.backed_off_at < self.latency
+        ):
+            # Already reduced for this round of calls
+            return
+        self.limit = max(self.limit * self.backoff_factor, float(self.minimum))
+        self.backed_off_at = now
+
+
+class TaskRunner:
+    """
+    Runs a blocking, I/O-bound function (such as one that fetches data or
+    files from Bynder) for many items concurrently, using a pool of up to
+    ``max_concurrency`` worker threads.
+
+    Items are taken from the iterable (and results are handed back) in the
+    calling thread, so that querysets can be iterated and objects saved there
+    as usual. The function itself is run in a worker thread, using that
+    thread's own database connections, which are closed once all the items
+    have been dealt with.
+
+    Each call is made in a copy of the context the runner was created in, so
+    that context variables (such as the current ``wagtail_bynder.ratelimit``
+    budget) apply to it as usual.
+
+    If a ``limit`` (an ``AdaptiveConcurrencyLimit``) is supplied, it decides
+    how many calls (up to ``max_concurrency``) are in flight at any time,
+    based on how long they take and whether they fail because the server is
+    overloaded.
+    """
+
+    def __init__(
+        self,
+        func: Callable[[Any], Any],
+        *,
+        max_concurrency: int = 1,
+        limit: AdaptiveConcurrencyLimit | None = None,
+    ):
+        self.func = func
+        self.max_concurrency = max(int(max_concurrency), 1)
+        self.limit = limit
+        self.context = contextvars.copy_context()
+
+    def get_concurrency(self) -> int:
+        """
+        Return the number of calls that should be in flight at once right now.
+        """
+        if self.limit is None:
+            return self.max_concurrency
+        return max(min(self.limit.current, self.max_concurrency), 1)
+
+    def imap_unordered(self, items: Iterable[Any]) -> Iterator[TaskResult]:
+        """
+        Call the function for every item in ``items``, yielding a
+        ``TaskResult`` for each one as soon as it is ready (which may not be
+        in the original order). Exceptions raised by the function are
+        captured in the result rather than raised, so that the caller can
+        decide how to handle them.
+        """
+        return self.run(items, ordered=False)
+
+    def imap(self, items: Iterable[Any]) -> Iterator[Any]:
+        """
+        Call the function for every item in ``items``, yielding the return
+        values in the same order as ``items``. Exceptions raised by the
+        function are raised when its return value would have been yielded.
+
+        To keep the pool busy while waiting for a slow call, up to twice as
+        many calls as can be in flight are queued at once.
+        """
+        for result in self.run(items, ordered=True):
+            yield result.get()
+
+    def run(self, items: Iterable[Any], *, ordered: bool) -> Iterator[TaskResult]:
+        workers: list[threading.Thread] = []
+        executor = futures.ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="wagtail-bynder",
+            initializer=lambda: workers.append(threading.current_thread()),
+        )
+        # Maps calls that haven't been handed back yet to their items, in the
+        # order they were made
+        pending: dict[futures.Future, Any] = {}
+        try:
+            for item in items:
+                max_pending = self.get_concurrency() * (2 if ordered else 1)
+                while len(pending) >= max_pending:
+                    yield from self.collect(pending, ordered=ordered)
+                pending[executor.submit(self.call, item)] = item
+                if ordered:
+                    # Hand back whatever is already done, in order
+                    yield from self.collect(pending, ordered=True, wait=False)
+            while pending:
+                yield from self.collect(pending, ordered=ordered)
+        finally:
+            # Don't start anything still queued if the caller stopped early
+            for future in pending:
+                future.cancel()
+            futures.wait(pending)
+            close_connections_in_workers(executor, len(workers))
+            executor.shutdown(wait=True)
+
+    @staticmethod
+    def collect(
+        pending: dict[futures.Future, Any], *, ordered: bool, wait: bool = True
+    ) -> Iterator[TaskResult]:
+        """
+        Remove finished calls from ``pending`` and yield their results,
+        waiting for at least one of them to finish if ``wait`` is ``True``.
+        When ``ordered``, only calls made before any unfinished ones are
+        collected.
+        """
+        if ordered:
+            done = []
+            for future in pending:
+                if not future.done():
+                    if not wait or done:
+                        break
+                    futures.wait([future])
+                done.append(future)
+        else:
+            done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+        for future in done:
+            item = pending.pop(future)
+            error = future.exception()
+            if error is None:
+                yield TaskResult(item, future.result())
+            elif isinstance(error, Exception):
+                yield TaskResult(item, error=error)
+            else:
+                # Don't hold on to KeyboardInterrupt and friends
+                raise error
+
+    def call(self, item: Any) -> Any:
+        """
+        Call the function for ``item`` (from a worker thread). Calls that
+        fail because the server is overloaded (as determined by ``limit``)
+        are retried after the delay it gives.
+        """
+        if self.limit is None:
+            return self.context.copy().run(self.func, item)
+        retries = 0
+        while True:
+            started_at = time.monotonic()
+            try:
+                value = self.context.copy().run(self.func, item)
+            except Exception as e:
+                delay = self.limit.get_retry_delay(e)
+                if delay is None:
+                    self.limit.record_success(time.monotonic() - started_at)
+                    raise
+                self.limit.record_overload()
+                if retries >= self.limit.max_retries:
+                    raise
+                retries += 1
+                time.sleep(delay)
+                continue
+            self.limit.record_success(time.monotonic() - started_at)
+            return value
+
+
+def close_connections_in_workers(
+    executor: futures.ThreadPoolExecutor, workers: int
+) -> None:
+    """
+    Close the database connections of the ``workers`` threads started by
+    ``executor``, which must all be idle.
+
+    ``connections.close_all()`` only closes the connections of the thread
+    that calls it, so it is called once from each worker thread, with each
+    call waiting for the others to start, so that every thread gets one.
+    """
+    if not workers:
+        return
+    barrier = threading.Barrier(workers)
+
+    def close() -> None:
+        connections.close_all()
+        barrier.wait()
+
+    for _ in range(workers):
+        executor.submit(close)
+
+
+_END = object()
+
+
+def iter_in_background(items: Iterable[Any], *, buffer_size: int) -> Iterator[Any]:
+    """
+    Iterate over ``items`` in a background thread, yielding them in order
+    from a queue that holds up to ``buffer_size`` of them. This allows the
+    next few items to be produced (e.g. fetched from Bynder) while the caller
+    works on the current one, with the background thread waiting whenever the
+    queue is full, so that it never gets too far ahead.
+
+    Iteration happens in a copy of the calling context, and must not use the
+    database. Exceptions raised while iterating are raised by this generator.
+    If the caller stops early, ``items`` is closed (if it is a generator) once
+    the item it is working on has been produced.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=max(int(buffer_size), 1))
+    stopped = threading.Event()
+
+    def put(value: Any) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(value, timeout=0.1)
+            except queue.Full:
+                continue
+            return True
+        return False
+
+    def produce() -> None:
+        try:
+            iterator = iter(items)
+            try:
+                for item in iterator:
+                    if not put(item):
+                        return
+            finally:
+                if hasattr(iterator, "close"):
+                    iterator.close()
+        finally:
+            # Even if iteration failed (which is raised by producer.result())
+            put(_END)
+
+    executor = futures.ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix="wagtail-bynder-prefetch"
+    )
+    producer = executor.submit(contextvars.copy_context().run, produce)
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END:
+                # Raise any exception raised while iterating
+                producer.result()
+                return
+            yield item
+    finally:
+        stopped.set()
+        executor.shutdown(wait=True)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a ``key``, so that only the first
+    one does the work, and the rest wait for it to finish and share the
+    outcome. If the work raises an exception, each waiting call raises a copy
+    of it (where possible), so that threads don't add to the traceback of the
+    same exception object.
+
+    Only calls made by threads in the same process are coalesced. Once a
+    call has finished, the next call with the same key does the work again.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls: dict[Hashable, futures.Future] = {}
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Return the result of calling ``func(*args, **kwargs)``, or of the
+        call already in progress for ``key`` in another thread.
+        """
+        return self.do_shared(key, func, *args, **kwargs)[0]
+
+    def do_shared(
+        self, key: Hashable, func: Callable[..., Any], *args, **kwargs
+    ) -> tuple[Any, bool]:
+        """
+        Like ``do()``, but return a ``(result, shared)`` tuple, where
+        ``shared`` is ``True`` if ``result`` came from a call made by another
+        thread (and so is also being used by that thread).
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            if call is not None:
+                is_leader = False
+            else:
+                call = self.calls[key] = futures.Future()
+                is_leader = True
+
+        if not is_leader:
+            error = call.exception()
+            if error is None:
+                return call.result(), True
+            copied_error = copy_exception(error)
+            if copied_error is error:
+                raise error
+            raise copied_error from error
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result, False
+        finally:
+            with self.lock:
+                del self.calls[key]
+
+
+def copy_exception(error: BaseException) -> BaseException:
+    """
+    Return a new exception with the same type, arguments and attributes as
+    ``error`` (but no traceback), or ``error`` itself if it can't be copied.
+    """
+    try:
+        return copy.copy(error)
+    except Exception:
+        return error
+
+
+class CacheLock:
+    """
+    A lock shared by every process using the same Django cache backend (e.g.
+    Redis or Memcached), so that only one process or server at a time does
+    the work it protects. The lock expires after ``timeout`` seconds, so a
+    process that dies while holding it can't block others forever.
+
+    The lock is not reentrant, and only the ``CacheLock`` instance that
+    acquired it can release it.
+
+    Django's cache API has no atomic 'delete if unchanged' operation, so
+    releasing the lock is a check of its value followed by a delete. To stop
+    the delete from removing a lock taken by someone else in between (after
+    this one expired), a lock that is due to expire within
+    ``release_margin`` seconds is left to expire instead of being released.
+    """
+
+    release_margin: float = 1.0
+
+    def __init__(self, cache_alias: str, key: str, timeout: float):
+        self.cache_alias = cache_alias
+        self.key = key
+        self.timeout = timeout
+        self.token: str | None = None
+        self.expires_at: float = 0.0
+
+    def acquire(self) -> bool:
+        """
+        Take the lock if it is free, and return ``True``. Otherwise, return
+        ``False`` without waiting.
+        """
+        token = uuid.uuid4().hex
+        expires_at = time.monotonic() + self.timeout
+        if caches[self.cache_alias].add(self.key, token, timeout=self.timeout):
+            self.token = token
+            self.expires_at = expires_at
+            return True
+        return False
+
+    def release(self) -> None:
+        """
+        Release the lock, if it is still held by this instance.
+        """
+        if self.token is None:
+            return
+        cache = caches[self.cache_alias]
+        if (
+            time.monotonic() < self.expires_at - self.release_margin
+            and cache.get(self.key) == self.token
+        ):
+            cache.delete(self.key)
+        self.token = None
@@ -16,3 +16,28 @@ class BynderAssetDownloadError(Exception):
     """
     Raised when a server error occurs while downloading an asset from Bynder.
     """
+
+
+class BynderAssetFileNotModified(Exception):
+    """
+    Raised when a conditional request to download an asset file from Bynder
+    results in a '304 Not Modified' response, meaning the copy of the file
+    that was downloaded previously is still current.
+    """
+
+
+class BynderAssetDownloadInterrupted(BynderAssetDownloadError):
+    """
+    Raised when the connection to Bynder is lost partway through downloading
+    an asset file. When ``settings.BYNDER_DOWNLOAD_RESUME_DIR`` is set, the
+    data received so far is kept, and the download will pick up where it
+    left off on the next attempt.
+    """
+
+
+class BynderUnavailable(BynderAssetDownloadError):
+    """
+    Raised instead of making a request to the Bynder API while the circuit
+    breaker (see ``wagtail_bynder.circuitbreaker``) is open, because recent
+    requests have failed.
+    """
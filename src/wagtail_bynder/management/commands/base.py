@@ -1,17 +1,36 @@
-from collections.abc import Iterable
-from datetime import datetime
+import contextlib
+import threading
+import time
+
+from collections.abc import Iterable, Iterator, Mapping
+from datetime import UTC, datetime, timedelta
 from typing import TYPE_CHECKING, Any
 
+from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.db.models.base import ModelBase
 from django.db.models.query import Q
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from requests import ConnectionError as RequestsConnectionError
 from requests import HTTPError
+from requests.exceptions import ChunkedEncodingError
 
+from wagtail_bynder import ratelimit, usage
+from wagtail_bynder.concurrency import (
+    AdaptiveConcurrencyLimit,
+    TaskRunner,
+    iter_in_background,
+)
 from wagtail_bynder.exceptions import BynderAssetDownloadError
 from wagtail_bynder.models import BynderAssetMixin
-from wagtail_bynder.utils import get_bynder_client
+from wagtail_bynder.records import AssetRecord, get_date_modified
+from wagtail_bynder.utils import (
+    get_asset_data,
+    get_bynder_client,
+    get_sync_concurrency,
+    invalidate_stale_asset_data,
+)
 
 
 if TYPE_CHECKING:
@@ -20,22 +39,121 @@ if TYPE_CHECKING:
 
 class BaseModelCommand(BaseCommand):
     model: ModelBase | None = None
+    concurrency: int = 1
+    concurrency_limit: AdaptiveConcurrencyLimit | None = None
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            help=_(
+                "The number of assets to fetch data and files for at the same time "
+                "(defaults to the BYNDER_SYNC_CONCURRENCY setting value)."
+            ),
+        )
+        parser.add_argument(
+            "--adaptive-concurrency",
+            action="store_true",
+            default=None,
+            help=_(
+                "Treat 'concurrency' as a maximum, and adjust the number of assets "
+                "processed at the same time according to how quickly Bynder responds "
+                "(defaults to the BYNDER_SYNC_ADAPTIVE_CONCURRENCY setting value)."
+            ),
+        )
+
+    def execute(self, *args, **options):
+        self.concurrency = options.get("concurrency") or get_sync_concurrency()
+        adaptive = options.get("adaptive_concurrency")
+        if adaptive is None:
+            adaptive = getattr(settings, "BYNDER_SYNC_ADAPTIVE_CONCURRENCY", False)
+        # Shared by all batches, so that what is learned carries over
+        self.concurrency_limit = (
+            AdaptiveConcurrencyLimit(
+                self.concurrency, get_retry_delay=ratelimit.get_retry_after
+            )
+            if adaptive and self.concurrency > 1
+            else None
+        )
+        usage_at_start = usage.get_usage()
+        # Have downloads made by the command treated as background work, and
+        # requests counted against the command
+        with (
+            ratelimit.use_budget(ratelimit.BACKGROUND),
+            usage.use_caller(self.get_command_name()),
+        ):
+            output = super().execute(*args, **options)
+        self.write_usage_summary(usage.get_usage().since(usage_at_start))
+        return output
+
+    def get_command_name(self) -> str:
+        return self.__module__.rsplit(".", 1)[-1]
+
+    def write_usage_summary(self, summary: usage.UsageSummary) -> None:
+        """
+        Write a summary of the requests made to Bynder while the command was
+        running, along with the latest rate limit information from Bynder.
+        """
+        self.stdout.write(f"Requests made to Bynder: {summary.total}")
+        for endpoint, count in sorted(summary.by_endpoint().items()):
+            self.stdout.write(f"  {endpoint}: {count}")
+        if summary.rate_limit_headers:
+            self.stdout.write("Latest rate limit information from Bynder:")
+            for name, value in sorted(summary.rate_limit_headers.items()):
+                self.stdout.write(f"  {name}: {value}")
 
     def get_queryset(self) -> "QuerySet":
         return self.model.objects.all()  # type: ignore[attr-defined]
 
+    def get_task_runner(self, func) -> TaskRunner:
+        """
+        Return a ``TaskRunner`` for running ``func`` (which must not use the
+        database) for many objects or assets at the same time.
+        """
+        return TaskRunner(
+            func, max_concurrency=self.concurrency, limit=self.concurrency_limit
+        )
+
+    @property
+    def prefetch_files(self) -> bool:
+        """
+        Whether asset files should be downloaded by ``prepare_for_update()``
+        in worker threads, ahead of objects being updated. There is nothing to
+        gain from this when assets are processed one at a time.
+        """
+        return self.concurrency > 1
+
 
 class BaseBynderSyncCommand(BaseModelCommand):
     bynder_asset_type: str = ""
+    # The number of assets to request from Bynder at a time
     page_size: int = 200
+    # The number of assets to check against the database at a time
+    batch_size: int = 200
+    # The most assets Bynder will return in a single response
+    max_page_size: int = 1000
+    min_page_size: int = 50
+    # How long responses can take before the page size is reduced (when
+    # adapting the page size)
+    page_latency_target: float = 2.0
+    adaptive_page_size: bool = False
+    # Whether to parse assets one at a time as each page arrives, instead of
+    # waiting for the whole page
+    stream_pages: bool = False
+    # The number of threads to update and save stale objects in
+    workers: int = 1
+    # The number of batches of assets to fetch from Bynder ahead of the one
+    # being processed. Off by default, as get_assets() is then called from a
+    # background thread, which subclasses might not expect
+    prefetch_batches: int = 0
 
     def add_arguments(self, parser):
+        super().add_arguments(parser)
         parser.add_argument(
             "--minutes",
             type=int,
             help=_(
-                "The number of minutes into the past to look for asset "
-                "modifications."
+                "The number of minutes into the past to look for asset modifications."
             ),
         )
         parser.add_argument(
@@ -54,6 +172,84 @@ class BaseBynderSyncCommand(BaseModelCommand):
                 "modifications (takes precedence over 'hours' and 'minutes')"
             ),
         )
+        parser.add_argument(
+            "--since",
+            type=parse_utc_datetime,
+            help=_(
+                "An ISO 8601 date and time to look for asset modifications from, "
+                "e.g. to resume an earlier run from the point reported in its "
+                "output (takes precedence over 'days', 'hours' and 'minutes')"
+            ),
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            help=_(
+                "The number of assets to request from Bynder at a time "
+                "(defaults to %(default)s, maximum %(maximum)s)."
+            )
+            % {"default": self.page_size, "maximum": self.max_page_size},
+        )
+        parser.add_argument(
+            "--adaptive-page-size",
+            action="store_true",
+            help=_(
+                "Grow the number of assets requested from Bynder at a time (up to "
+                "%(maximum)s) while responses arrive within 'page-latency-target' "
+                "seconds, and shrink it when they don't."
+            )
+            % {"maximum": self.max_page_size},
+        )
+        parser.add_argument(
+            "--page-latency-target",
+            type=float,
+            help=_(
+                "How long responses from Bynder may take before the number of "
+                "assets requested at a time is reduced, when using "
+                "'adaptive-page-size' (defaults to %(default)s)."
+            )
+            % {"default": self.page_latency_target},
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help=_(
+                "The number of assets to check against the database at a time "
+                "(defaults to %(default)s)."
+            )
+            % {"default": self.batch_size},
+        )
+        parser.add_argument(
+            "--stream-pages",
+            action="store_true",
+            default=None,
+            help=_(
+                "Parse assets one at a time as each page arrives from Bynder, "
+                "instead of waiting for the whole page (defaults to the "
+                "BYNDER_SYNC_STREAM_PAGES setting value)."
+            ),
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help=_(
+                "The number of stale objects to update and save at the same time, "
+                "each in its own thread with its own database connection "
+                "(defaults to %(default)s)."
+            )
+            % {"default": self.workers},
+        )
+        parser.add_argument(
+            "--prefetch-batches",
+            type=int,
+            help=_(
+                "The number of batches of assets to fetch from Bynder in the "
+                "background while a batch is being processed, or 0 to fetch each "
+                "batch only once the last one has been processed "
+                "(defaults to %(default)s)."
+            )
+            % {"default": self.prefetch_batches},
+        )
 
     def handle(self, *args, **options):
         # Default timespan to 1 day (1440 minutes)
@@ -73,56 +269,190 @@ class BaseBynderSyncCommand(BaseModelCommand):
             timespan = timezone.timedelta(days=1)
             timespan_desc = "1 day"
 
-        self.date_modified_from = datetime.utcnow() - timespan
+        if since := options.get("since"):
+            self.date_modified_from = since
+            self.stdout.write(
+                f"Looking for {self.bynder_asset_type or 'all'} assets modified since {format_bynder_datetime(since)}"
+            )
+        else:
+            self.date_modified_from = datetime.utcnow() - timespan
+            self.stdout.write(
+                f"Looking for {self.bynder_asset_type or 'all'} assets modified within the last {timespan_desc}"
+            )
 
-        self.stdout.write(
-            f"Looking for {self.bynder_asset_type or 'all'} assets modified within the last {timespan_desc}"
-        )
+        if page_size := options.get("page_size"):
+            self.page_size = min(max(page_size, 1), self.max_page_size)
+        if batch_size := options.get("batch_size"):
+            self.batch_size = max(batch_size, 1)
+        if options.get("adaptive_page_size"):
+            self.adaptive_page_size = True
+        if page_latency_target := options.get("page_latency_target"):
+            self.page_latency_target = page_latency_target
+        stream_pages = options.get("stream_pages")
+        if stream_pages is None:
+            stream_pages = getattr(settings, "BYNDER_SYNC_STREAM_PAGES", False)
+        self.stream_pages = stream_pages
+        if workers := options.get("workers"):
+            self.workers = max(workers, 1)
+        if (prefetch_batches := options.get("prefetch_batches")) is not None:
+            self.prefetch_batches = max(prefetch_batches, 0)
 
         self.batch_count = 1
-        self.bynder_client = get_bynder_client()
-        asset_dict: dict[str, dict[str, Any]] = {}
+        self.bynder_client = get_bynder_client(ratelimit.BACKGROUND)
+
+        batches = self.get_batches()
+        if self.prefetch_batches:
+            # Keep fetching pages from Bynder in the background while each
+            # batch is processed, without getting too far ahead
+            batches = iter_in_background(batches, buffer_size=self.prefetch_batches)
+        for batch in batches:
+            self.process_batch(batch)
+            self.report_progress(batch)
 
+    def get_batches(self) -> Iterator[dict[str, AssetRecord]]:
+        """
+        A generator method that gathers the assets yielded by ``get_assets()``
+        into batches of ``batch_size``, yielding each batch as a dict of
+        ``AssetRecord`` objects, keyed by asset ID. Called from a background
+        thread when ``prefetch_batches`` is greater than 0, so must not use
+        the database.
+
+        Records keep all of the data returned by Bynder, unless the
+        ``BYNDER_COMPACT_ASSET_RECORDS`` setting is ``True``, in which case
+        only the fields used by the models (plus any listed in the
+        ``BYNDER_ASSET_RECORD_EXTRA_FIELDS`` setting) are kept.
+        """
+        extra_fields = None
+        if getattr(settings, "BYNDER_COMPACT_ASSET_RECORDS", False):
+            extra_fields = getattr(settings, "BYNDER_ASSET_RECORD_EXTRA_FIELDS", ())
+        batch: dict[str, AssetRecord] = {}
         for asset in self.get_assets():
-            # Gather asset details into a large dict, using the 'id' as the key
-            asset_dict[asset["id"]] = asset
-            # Process the gathered assets once the batch reaches a certain size
-            if len(asset_dict) == self.page_size:
-                self.process_batch(asset_dict)
-                # Clear this batch to start another
-                asset_dict.clear()
+            batch[asset["id"]] = AssetRecord(asset, extra_fields)
+            if len(batch) == self.batch_size:
+                yield batch
+                # Start a new dict, as this one might still be in use
+                batch = {}
+        # Include any remaining assets
+        if batch:
+            yield batch
 
-        # Process any remaining assets
-        if asset_dict:
-            self.process_batch(asset_dict)
+    def report_progress(self, assets: dict[str, Mapping[str, Any]]) -> None:
+        """
+        Report the point an interrupted run can be resumed from, once the
+        supplied batch of assets has been processed.
+        """
+        resume_from = format_bynder_datetime(
+            max(to_utc(get_date_modified(asset)) for asset in assets.values())
+        )
+        self.stdout.write(
+            f"Assets modified up to {resume_from} have been processed. "
+            f"To resume from this point, use: --since={resume_from}"
+        )
 
     def get_assets(self) -> Iterable[dict[str, Any]]:
         """
-        A generator method that yields all relevant Bynder assets, one at a time.
-        It silently uses pagination to ensure all possible assets are returned.
+        A generator method that yields all relevant Bynder assets, one at a time,
+        in the order they were modified. It silently uses pagination to ensure all
+        possible assets are returned.
+
+        Rather than requesting numbered pages of the same results, each page is
+        requested for assets modified since the last asset on the previous page
+        (known as 'keyset' pagination). This means that assets being modified
+        while the command runs can't cause others to be skipped, and each asset is
+        yielded only once (even if it appears on more than one page).
+
+        When ``stream_pages`` is ``True``, assets are parsed and yielded as each
+        page arrives. If the connection is lost part of the way through a page
+        (e.g. because it was left idle while a batch was processed), the page is
+        requested again from the last asset received.
         """
+        cursor = self.date_modified_from
         page = 1
+        page_size = self.page_size
+        seen_ids: set[str] = set()
         while True:
             query = {
                 # Datetimes must be supplied in ISO 8601 format without microseconds. See:
                 # https://bynder.docs.apiary.io/#reference/assets/asset-operations/retrieve-assets
-                "dateModified": self.date_modified_from.strftime("%Y-%m-%dT%H:%M:%SZ"),
-                "orderBy": "dateModified desc",
+                "dateModified": format_bynder_datetime(cursor),
+                "orderBy": "dateModified asc",
                 "page": page,
-                "limit": self.page_size,
+                "limit": page_size,
             }
             if self.bynder_asset_type:
                 query["type"] = self.bynder_asset_type
-            results = self.bynder_client.asset_bank_client.media_list(query)
+            started_at = time.monotonic()
+            if self.stream_pages:
+                # NOTE: Only the time taken for the response to start arriving
+                # is measured, as the rest is read while assets are processed
+                results = self.bynder_client.asset_bank_client.iter_media_list(query)
+            else:
+                results = self.bynder_client.asset_bank_client.media_list(query)
+            duration = time.monotonic() - started_at
             if not results:
+                # No more results (Bynder can return nothing at all, rather
+                # than an empty list)
                 break
-            yield from results
-            if len(results) < self.page_size:
+            count = 0
+            last_asset = None
+            interrupted = False
+            new_assets = 0
+            try:
+                for asset in results:
+                    count += 1
+                    last_asset = asset
+                    if asset["id"] not in seen_ids:
+                        seen_ids.add(asset["id"])
+                        new_assets += 1
+                        yield asset
+            except (RequestsConnectionError, ChunkedEncodingError):
+                # Carry on from the last asset received, as long as some
+                # progress was made
+                if not self.stream_pages or not new_assets:
+                    raise
+                interrupted = True
+            if count < page_size and not interrupted:
                 break
-            page += 1
+            # Start the next page a second before the last asset was modified,
+            # in case others were modified in the same second (any that were
+            # already yielded are skipped)
+            next_cursor = parse_utc_datetime(last_asset["dateModified"]) - timedelta(
+                seconds=1
+            )
+            if interrupted and next_cursor <= cursor:
+                # Request the rest of the same page again
+                continue
+            if next_cursor > cursor:
+                cursor = next_cursor
+                page = 1
+                # Page numbers are only meaningful for the same page size, so
+                # only change it when starting from a new point
+                page_size = self.get_next_page_size(page_size, duration)
+            else:
+                # A whole page of assets were modified within the same second,
+                # so the next page of those is needed to make progress
+                page += 1
         return
 
-    def process_batch(self, assets: dict[str, dict[str, Any]]) -> None:
+    def get_next_page_size(self, page_size: int, duration: float) -> int:
+        """
+        Return the number of assets to request in the next page, given that a
+        page of ``page_size`` assets took ``duration`` seconds to arrive.
+
+        Unless ``adaptive_page_size`` is ``True``, the page size doesn't change.
+        Otherwise, it is doubled (up to ``max_page_size``) while responses arrive
+        within half of ``page_latency_target``, and halved (down to
+        ``min_page_size``) when they take longer than it.
+        """
+        if not self.adaptive_page_size:
+            return page_size
+        if duration > self.page_latency_target:
+            return max(page_size // 2, min(self.min_page_size, page_size))
+        if duration <= self.page_latency_target / 2:
+            return min(page_size * 2, self.max_page_size)
+        return page_size
+
+    def process_batch(self, assets: dict[str, Mapping[str, Any]]) -> None:
         """
         Identifies and updates (where needed) model objects to reflect changes
         in the supplied 'batch' of Bynder assets.
@@ -132,13 +462,76 @@ class BaseBynderSyncCommand(BaseModelCommand):
         )
         self.batch_count += 1
 
+        # Ensure data cached for assets that have since changed isn't used
+        invalidate_stale_asset_data(assets.values())
+
         stale = self.get_stale_objects(assets)
         self.stdout.write(f"{len(stale)} stale objects were found for this batch.")
-        for obj in stale:
-            data = assets[obj.bynder_id]
-            self.update_object(obj, data)
 
-    def get_stale_objects(self, assets: dict[str, dict[str, Any]]) -> "QuerySet":
+        def fetch(obj: BynderAssetMixin) -> Mapping[str, Any]:
+            asset_data = self.fetch_asset_data(assets[obj.bynder_id])
+            if self.prefetch_files:
+                obj.prepare_for_update(asset_data)
+            return asset_data
+
+        # Fetch data (and files) for several objects at once, saving each
+        # object as soon as everything it needs has arrived
+        fetched = (
+            (result.item, result.get())
+            for result in self.get_task_runner(fetch).imap_unordered(stale)
+        )
+        if self.workers > 1:
+            outcomes = self.update_objects_in_workers(fetched)
+        else:
+            outcomes = (
+                self.update_object(obj, asset_data) for obj, asset_data in fetched
+            )
+        updated = sum(1 for outcome in outcomes if outcome is not False)
+        self.stdout.write(
+            f"{updated} of {len(stale)} stale objects were updated for this batch."
+        )
+
+    def update_objects_in_workers(
+        self, items: Iterable[tuple[BynderAssetMixin, Mapping[str, Any]]]
+    ) -> Iterator[bool | None]:
+        """
+        Call ``update_object()`` for each ``(obj, asset_data)`` pair in
+        ``items`` using a pool of ``workers`` threads (each with its own
+        database connection), yielding the outcomes in the same order.
+
+        Output written by ``update_object()`` is held back until the object
+        has been updated, then written out in one go, so that output for
+        different objects isn't interleaved.
+        """
+        stdout = self.stdout
+        self.stdout = output = BufferedOutput(stdout)
+
+        def update(item: tuple[BynderAssetMixin, Mapping[str, Any]]):
+            with output.capture() as lines:
+                outcome = self.update_object(*item)
+            return outcome, lines
+
+        try:
+            runner = TaskRunner(update, max_concurrency=self.workers)
+            for outcome, lines in runner.imap(items):
+                for args in lines:
+                    stdout.write(*args)
+                yield outcome
+        finally:
+            self.stdout = stdout
+
+    def fetch_asset_data(self, asset_data: Mapping[str, Any]) -> Mapping[str, Any]:
+        """
+        Return the asset data that should be used to update the object
+        representing the asset in ``asset_data`` (an ``AssetRecord`` made from
+        an item returned by ``get_assets()``). Called from a worker thread, so
+        must not use the database.
+
+        By default, ``asset_data`` is returned as is.
+        """
+        return asset_data
+
+    def get_stale_objects(self, assets: dict[str, Mapping[str, Any]]) -> "QuerySet":
         """
         Return a queryset of model instances that represent items in the supplied
         batch of assets, and are out-of-sync with the data in Bynder (and
@@ -151,14 +544,18 @@ class BaseBynderSyncCommand(BaseModelCommand):
             q |= Q(bynder_id=id, bynder_last_modified__lt=asset["dateModified"])
         return self.get_queryset().filter(q)
 
-    def update_object(self, obj: BynderAssetMixin, asset_data: dict[str, Any]) -> None:
+    def update_object(
+        self, obj: BynderAssetMixin, asset_data: Mapping[str, Any]
+    ) -> bool:
+        """
+        Update and save ``obj`` to reflect ``asset_data``, and return ``True``,
+        or return ``False`` if the update had to be skipped. Called from a
+        worker thread when ``--workers`` is greater than 1.
+        """
         self.stdout.write("\n")
         self.stdout.write(f"Updating object for asset '{asset_data['id']}'")
         if obj.bynder_last_modified:
-            time_diff = (
-                datetime.fromisoformat(asset_data["dateModified"])
-                - obj.bynder_last_modified
-            )
+            time_diff = get_date_modified(asset_data) - obj.bynder_last_modified
             self.stdout.write(f"{repr(obj)} is behind by: {time_diff}")
         self.stdout.write("The latest data from Bynder is:")
         for key, value in asset_data.items():
@@ -179,10 +576,19 @@ class BaseBynderSyncCommand(BaseModelCommand):
                     f"Skipping update for {repr(obj)}. The asset will be retried on the next sync.\n"
                 )
             )
+            return False
+        return True
 
 
 class BaseBynderRefreshCommand(BaseModelCommand):
+    page_size: int = 200
+    # Whether the data returned by get_assets() (using media_list()) is enough
+    # to update objects with. If not, the data for each object is fetched
+    # individually with media_info() instead
+    fetch_assets_in_batches: bool = True
+
     def add_arguments(self, parser):
+        super().add_arguments(parser)
         parser.add_argument(
             "--from",
             type=int,
@@ -197,6 +603,14 @@ class BaseBynderRefreshCommand(BaseModelCommand):
                 "Force redownloading and updating of files, regardless of whether they have changed."
             ),
         )
+        parser.add_argument(
+            "--verify-files",
+            action="store_true",
+            help=_(
+                "Check files that appear to be unchanged against Bynder, and update any that "
+                "have changed. For images, this only requires the first few KB of each file."
+            ),
+        )
         parser.add_argument(
             "--delete-not-recognised",
             action="store_true",
@@ -206,33 +620,28 @@ class BaseBynderRefreshCommand(BaseModelCommand):
         )
 
     def handle(self, *args, **options):
-        self.batch_count = 0
-        self.bynder_client = get_bynder_client()
+        self.batch_count = 1
+        self.bynder_client = get_bynder_client(ratelimit.BACKGROUND)
         self.force_download = options["force_download"]
+        self.verify_files = options["verify_files"]
         self.from_pk = options["from"]
         self.delete_not_recognised = options["delete_not_recognised"]
-        unrecognised_asset_ids = []
+        self.unrecognised_asset_ids: list[str] = []
 
-        for obj in self.get_queryset():
-            try:
-                asset_data = self.bynder_client.asset_bank_client.media_info(
-                    obj.bynder_id
-                )
-            except HTTPError as e:
-                if e.response.status_code == 404:
-                    self.stdout.write(
-                        f"Asset ID '{obj.bynder_id}' was not recognized by Bynder\n"
-                    )
-                    unrecognised_asset_ids.append(obj.bynder_id)
-                    continue
-                else:
-                    raise e
-            else:
-                self.stdout.write(
-                    f"Asset with ID '{asset_data['id']}' was fetched successfully\n"
-                )
-                self.update_object(obj, asset_data)
+        batch: list[BynderAssetMixin] = []
+        for obj in self.get_queryset().iterator():
+            batch.append(obj)
+            # Process the gathered objects once the batch reaches a certain size
+            if len(batch) == self.page_size:
+                self.process_batch(batch)
+                # Clear this batch to start another
+                batch.clear()
+
+        # Process any remaining objects
+        if batch:
+            self.process_batch(batch)
 
+        unrecognised_asset_ids = self.unrecognised_asset_ids
         self.stdout.write(
             f"During this run, {len(unrecognised_asset_ids)} asset id(s) were not recognised by Bynder"
         )
@@ -247,6 +656,93 @@ class BaseBynderRefreshCommand(BaseModelCommand):
                     f"All local {self.model._meta.label} objects using these IDs have been deleted."  # type: ignore[attr-defined]
                 )
 
+    def process_batch(self, objects: list[BynderAssetMixin]) -> None:
+        """
+        Fetches the latest data for a 'batch' of model objects from Bynder (using
+        as few requests as possible), and updates each object to reflect it.
+        Objects with a 'bynder_id' that is missing from the batch results are
+        looked up individually, and flagged as unrecognised if Bynder doesn't
+        recognise them either.
+        """
+        self.stdout.write(
+            f"Processing batch {self.batch_count} ({len(objects)} objects)..."
+        )
+        self.batch_count += 1
+
+        assets: dict[str, dict[str, Any]] = {}
+        if self.fetch_assets_in_batches:
+            assets = self.get_assets({obj.bynder_id for obj in objects})
+            # Ensure data cached for assets that have since changed isn't used
+            invalidate_stale_asset_data(assets.values())
+
+        def fetch(obj: BynderAssetMixin) -> dict[str, Any]:
+            return self.fetch_asset_data(obj, assets.get(obj.bynder_id))
+
+        for result in self.get_task_runner(fetch).imap_unordered(objects):
+            obj = result.item
+            try:
+                asset_data = result.get()
+            except HTTPError as e:
+                if e.response.status_code == 404:
+                    self.flag_unrecognised(obj)
+                    continue
+                else:
+                    raise e
+            else:
+                self.stdout.write(
+                    f"Asset with ID '{asset_data['id']}' was fetched successfully\n"
+                )
+                self.update_object(obj, asset_data)
+
+    def flag_unrecognised(self, obj: BynderAssetMixin) -> None:
+        self.stdout.write(f"Asset ID '{obj.bynder_id}' was not recognized by Bynder\n")
+        if obj.bynder_id not in self.unrecognised_asset_ids:
+            self.unrecognised_asset_ids.append(obj.bynder_id)
+
+    def get_assets(self, asset_ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """
+        Return a dict of data for the Bynder assets with the supplied IDs (using
+        the 'id' as the key), fetched with a single request. IDs that are not
+        recognised by Bynder are missing from the result.
+        """
+        asset_ids = sorted(asset_ids)
+        if not asset_ids:
+            return {}
+        results = self.bynder_client.asset_bank_client.media_list(
+            {"ids": ",".join(asset_ids), "limit": len(asset_ids)}
+        )
+        return {asset["id"]: asset for asset in results or ()}
+
+    def fetch_asset_data(
+        self, obj: BynderAssetMixin, asset_data: dict[str, Any] | None
+    ) -> dict[str, Any]:
+        """
+        Return the asset data to use to update ``obj``: the ``asset_data``
+        returned by ``get_assets()``, or if there isn't any (because the
+        asset was missing from the batch results, or batches aren't used),
+        the data fetched with ``media_info()``, which raises an ``HTTPError``
+        if Bynder doesn't recognise the asset. If ``prefetch_files`` is
+        ``True``, any file ``obj`` needs is fetched too. Called from a worker
+        thread, so must not use the database.
+        """
+        if asset_data is None:
+            asset_data = get_asset_data(
+                obj.bynder_id, client=self.bynder_client.asset_bank_client, refresh=True
+            )
+        if self.prefetch_files:
+            obj.prepare_for_update(asset_data, **self.get_update_options())
+        return asset_data
+
+    def get_update_options(self) -> dict[str, Any]:
+        """
+        Return the keyword arguments to pass to ``update_from_asset_data()``
+        (and ``prepare_for_update()``) for each object.
+        """
+        options = {"force_download": self.force_download}
+        if self.verify_files:
+            options["verify_file"] = True
+        return options
+
     def get_queryset(self) -> "QuerySet":
         queryset = super().get_queryset().exclude(bynder_id__isnull=True).order_by("pk")
         if self.from_pk:
@@ -258,7 +754,7 @@ class BaseBynderRefreshCommand(BaseModelCommand):
             f"Updating <{self.model._meta.label}: pk='{obj.pk}' title='{obj.title}'>"  # type: ignore[attr-defined]
         )
         try:
-            obj.update_from_asset_data(asset_data, force_download=self.force_download)
+            obj.update_from_asset_data(asset_data, **self.get_update_options())
             obj.save()
         except BynderAssetDownloadError as e:
             self.stdout.write(
@@ -271,3 +767,64 @@ class BaseBynderRefreshCommand(BaseModelCommand):
                     f"Skipping update for {repr(obj)}. The asset will be retried on the next sync.\n"
                 )
             )
+
+
+class BufferedOutput:
+    """
+    Stands in for a command's ``stdout`` while objects are being updated in
+    worker threads, holding back anything written by a thread within
+    ``capture()``, so that it can be written out later in one go. Anything
+    written outside of ``capture()`` is written straight away.
+    """
+
+    def __init__(self, stdout):
+        self.stdout = stdout
+        self.local = threading.local()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.stdout, name)
+
+    def write(self, msg: str = "", style_func=None, ending=None) -> None:
+        lines = getattr(self.local, "lines", None)
+        if lines is None:
+            self.stdout.write(msg, style_func, ending)
+        else:
+            lines.append((msg, style_func, ending))
+
+    @contextlib.contextmanager
+    def capture(self) -> Iterator[list[tuple]]:
+        """
+        A context manager to hold back everything written by the current
+        thread within it, in the list it returns.
+        """
+        lines: list[tuple] = []
+        self.local.lines = lines
+        try:
+            yield lines
+        finally:
+            self.local.lines = None
+
+
+def parse_utc_datetime(value: str) -> datetime:
+    """
+    Parse an ISO 8601 date and time (e.g. a 'dateModified' value from Bynder)
+    into a naive datetime in UTC, to match ``datetime.utcnow()``.
+    """
+    return to_utc(datetime.fromisoformat(value))
+
+
+def to_utc(value: datetime) -> datetime:
+    """
+    Convert an aware datetime into a naive datetime in UTC (naive datetimes
+    are assumed to be in UTC already).
+    """
+    if value.tzinfo is not None:
+        return value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
+
+def format_bynder_datetime(value: datetime) -> str:
+    """
+    Format a naive UTC datetime in the way Bynder expects it in queries.
+    """
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
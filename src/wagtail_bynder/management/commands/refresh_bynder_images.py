@@ -9,3 +9,6 @@ class Command(BaseBynderRefreshCommand):
         "Update ALL Wagtail image library items to reflect the latest data from Bynder."
     )
     model = get_image_model()
+    # The media_list() results used by get_assets() never include focal point
+    # data ('activeOriginalFocusPoint'), so fetch each image individually
+    fetch_assets_in_batches = False
@@ -1,13 +1,12 @@
-from typing import TYPE_CHECKING, Any
+from collections.abc import Mapping
+from typing import Any
 
 from django.utils.translation import gettext_lazy as _
 from wagtail.images import get_image_model
 
-from .base import BaseBynderSyncCommand
-
+from wagtail_bynder.utils import get_asset_data
 
-if TYPE_CHECKING:
-    from wagtail_bynder.models import BynderAssetMixin
+from .base import BaseBynderSyncCommand
 
 
 class Command(BaseBynderSyncCommand):
@@ -18,15 +17,12 @@ class Command(BaseBynderSyncCommand):
     bynder_asset_type: str = "image"
     page_size: int = 200
 
-    def update_object(
-        self, obj: "BynderAssetMixin", asset_data: dict[str, Any]
-    ) -> None:
+    def fetch_asset_data(self, asset_data: Mapping[str, Any]) -> dict[str, Any]:
         """
-        Overrides `BaseBynderSyncCommand.update_object()` to fetch the
-        complete asset details before handing off to `obj.update_from_asset_data()`.
+        Overrides `BaseBynderSyncCommand.fetch_asset_data()` to fetch the
+        complete asset details to hand off to `obj.update_from_asset_data()`.
         (the API endpoint used by get_assets() does not include focal point data).
         """
-        full_asset_data = self.bynder_client.asset_bank_client.media_info(
-            asset_data["id"]
+        return get_asset_data(
+            asset_data["id"], client=self.bynder_client.asset_bank_client
         )
-        super().update_object(obj, full_asset_data)
@@ -4,14 +4,20 @@ import math
 import os
 
 from dataclasses import dataclass
-from datetime import datetime
 from mimetypes import guess_type
-from tempfile import NamedTemporaryFile
 from typing import Any
 
+import requests
+
 from django.conf import settings
-from django.core.files.uploadedfile import InMemoryUploadedFile, UploadedFile
+from django.core.files.uploadedfile import (
+    InMemoryUploadedFile,
+    TemporaryUploadedFile,
+    UploadedFile,
+)
 from django.db import models
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from wagtail.admin.panels import FieldPanel, MultiFieldPanel
@@ -24,10 +30,17 @@ from wagtail.images.models import (
 )
 from wagtail.models import Collection, CollectionMember
 from wagtail.search import index
+from wagtail.utils.file import hash_filelike
 
 from wagtail_bynder import utils
 
-from .exceptions import BynderAssetDataError
+from .exceptions import (
+    BynderAssetDataError,
+    BynderAssetDownloadError,
+    BynderAssetFileNotModified,
+    BynderAssetFileTooLarge,
+)
+from .records import get_date_modified
 
 
 logger = logging.getLogger("wagtail.images")
@@ -107,8 +120,7 @@ class BynderAssetMixin(models.Model):
         """
         return (
             not self.bynder_last_modified
-            or self.bynder_last_modified
-            >= datetime.fromisoformat(asset_data["dateModified"])
+            or self.bynder_last_modified >= get_date_modified(asset_data)
         )
 
     def update_from_asset_data(
@@ -118,7 +130,8 @@ class BynderAssetMixin(models.Model):
     ) -> None:
         """
         Update this object (without saving) to reflect values in `asset_data`,
-        which is a representation of the related asset from the Bynder API.
+        which is a representation of the related asset from the Bynder API
+        (either a `dict`, or a `wagtail_bynder.records.AssetRecord`).
 
         NOTE: Although this base implementation does nothing with them currently,
         for compatibility reasons, ``**kwargs`` should always be accepted by all
@@ -133,11 +146,38 @@ class BynderAssetMixin(models.Model):
         self.is_limited_use = bool(asset_data.get("limited", 0))
         self.is_public = bool(asset_data.get("isPublic", 0))
 
+    def prepare_for_update(self, asset_data: dict[str, Any], **kwargs) -> None:
+        """
+        A hook that is called before ``update_from_asset_data()`` (with the
+        same arguments) when objects are being updated concurrently by the
+        management commands, to allow slow network operations to be carried
+        out ahead of time, in a worker thread.
+
+        Implementations must not use the database, and should not raise
+        exceptions, leaving ``update_from_asset_data()`` to raise them later
+        instead. By default, this does nothing.
+        """
+
     def get_target_collection(self, asset_data: dict[str, Any]) -> Collection:
         return utils.get_default_collection()
 
 
 class BynderAssetWithFileMixin(BynderAssetMixin):
+    # The 'ETag' and 'Last-Modified' header values from the last download of
+    # the source file, used to make conditional requests for the same file
+    source_etag = models.CharField(
+        verbose_name=_("source ETag"),
+        max_length=255,
+        blank=True,
+        editable=False,
+    )
+    source_last_modified = models.CharField(
+        verbose_name=_("source last modified"),
+        max_length=64,
+        blank=True,
+        editable=False,
+    )
+
     extra_search_fields = BynderAssetMixin.extra_search_fields + [
         index.SearchField("file", boost=1),
         index.AutocompleteField("file"),
@@ -146,23 +186,107 @@ class BynderAssetWithFileMixin(BynderAssetMixin):
     class Meta:
         abstract = True
 
+    def save(self, *args, **kwargs):
+        # Hold on to any newly downloaded file, so that it can be closed
+        # (and any temporary file removed) once it has been saved to storage
+        uploaded_file = None
+        if self.file and not self.file._committed:
+            uploaded_file = self.file.file
+        try:
+            super().save(*args, **kwargs)
+        finally:
+            if isinstance(uploaded_file, UploadedFile):
+                uploaded_file.close()
+
     @staticmethod
     def extract_file_source(asset_data: dict[str, Any]) -> str:
         raise NotImplementedError
 
     def update_from_asset_data(
-        self, asset_data: dict[str, Any], *, force_download: bool = False, **kwargs
+        self,
+        asset_data: dict[str, Any],
+        *,
+        force_download: bool = False,
+        verify_file: bool = False,
+        **kwargs,
     ) -> None:
         """
         Overrides ``BynderAssetMixin.update_from_asset_data()`` to explicitly
-        handle the ``force_download`` option that can be provided by management
-        commands, and to initiate downloading of the source file when it has
-        changed in some way.
+        handle the ``force_download`` and ``verify_file`` options that can be
+        provided by management commands, and to initiate downloading of the
+        source file when it has changed in some way.
         """
         super().update_from_asset_data(asset_data, **kwargs)
-        if force_download or not self.file or self.asset_file_has_changed(asset_data):
+        # NOTE: If prepare_for_update() has been called, the decision has
+        # been made already (which may have involved probing the file)
+        needs_update = self.__dict__.pop("_file_needs_update", None)
+        if needs_update is None:
+            needs_update = self.file_needs_update(
+                asset_data, force_download=force_download, verify_file=verify_file
+            )
+        if needs_update:
+            # Used by get_download_validators() to skip conditional requests
+            self._force_download = force_download
             self.update_file(asset_data)
 
+    def file_needs_update(
+        self,
+        asset_data: dict[str, Any],
+        *,
+        force_download: bool = False,
+        verify_file: bool = False,
+    ) -> bool:
+        """
+        Return ``True`` if the source file should be (re)downloaded to update
+        this object. When ``verify_file`` is ``True``, files that appear to be
+        unchanged according to ``asset_data`` are checked with
+        ``probe_file_has_changed()`` too.
+        """
+        return (
+            force_download
+            or not self.file
+            or self.asset_file_has_changed(asset_data)
+            or (verify_file and self.probe_file_has_changed(asset_data))
+        )
+
+    def prepare_for_update(
+        self,
+        asset_data: dict[str, Any],
+        *,
+        force_download: bool = False,
+        verify_file: bool = False,
+        **kwargs,
+    ) -> None:
+        """
+        Overrides ``BynderAssetMixin.prepare_for_update()`` to download (and
+        process) the source file ahead of time, if ``update_from_asset_data()``
+        is going to need it. Download errors are kept until ``update_file()``
+        is called, and raised from there instead.
+        """
+        try:
+            source_url = self.extract_file_source(asset_data)
+            needs_update = self.file_needs_update(
+                asset_data, force_download=force_download, verify_file=verify_file
+            )
+        except (BynderAssetDataError, KeyError, TypeError, ValueError):
+            # Leave update_from_asset_data() to report problems with the data
+            return
+        # Saves update_from_asset_data() working this out again
+        self._file_needs_update = needs_update
+        if not needs_update:
+            return
+        self._force_download = force_download
+        try:
+            result = self.fetch_file(source_url, asset_data)
+        except (
+            BynderAssetDownloadError,
+            BynderAssetFileNotModified,
+            BynderAssetFileTooLarge,
+            requests.RequestException,
+        ) as e:
+            result = e
+        self._prepared_file = (source_url, result)
+
     def asset_file_has_changed(self, asset_data: dict[str, Any]) -> bool:
         source_url = self.extract_file_source(asset_data)
         filename = utils.filename_from_url(source_url)
@@ -172,12 +296,37 @@ class BynderAssetWithFileMixin(BynderAssetMixin):
             or self.original_filesize != int(asset_data["fileSize"])
         )
 
+    def probe_file_has_changed(self, asset_data: dict[str, Any]) -> bool:
+        """
+        Return ``True`` if, after a closer look at the source file in Bynder,
+        it should be downloaded again. Used when a file appears unchanged
+        according to ``asset_data``, but needs to be verified.
+
+        By default, this always returns ``True``, leaving the download to
+        establish whether the file has changed (which only costs a small
+        request when ``BYNDER_CONDITIONAL_DOWNLOADS`` is enabled).
+        """
+        return True
+
     def update_file(self, asset_data: dict[str, Any]) -> None:
         source_url = self.extract_file_source(asset_data)
-        file = self.download_file(source_url)
-        processed_file = self.process_downloaded_file(file, asset_data)
-
-        self.file = processed_file if processed_file is not None else file
+        try:
+            file = self.get_file(source_url, asset_data)
+        except BynderAssetFileNotModified:
+            # The file we already have is up-to-date, so there is nothing
+            # to download, process or purge
+            self.original_filesize = int(asset_data["fileSize"])
+            return
+
+        validators = getattr(file, "validators", None) or utils.DownloadValidators()
+
+        duplicate = self.find_file_duplicate(file)
+        if duplicate is not None:
+            # Reference the file that's already in storage instead
+            file.close()
+            self.use_file_from(duplicate)
+        else:
+            self.file = file
 
         # Used to trigger additional updates on save()
         self._file_changed = True
@@ -185,6 +334,116 @@ class BynderAssetWithFileMixin(BynderAssetMixin):
         # Update supplementary field values
         self.source_filename = utils.filename_from_url(source_url)
         self.original_filesize = int(asset_data["fileSize"])
+        self.set_download_validators(validators)
+
+    def get_file(
+        self, source_url: str, asset_data: dict[str, Any]
+    ) -> UploadedFile | utils.StoredFileDetails:
+        """
+        Return the result of ``fetch_file()`` for ``source_url``, using the
+        one from ``prepare_for_update()`` if the file has already been fetched
+        (raising any error encountered at the time).
+        """
+        prepared_url, result = self.__dict__.pop("_prepared_file", ("", None))
+        if prepared_url == source_url:
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return self.fetch_file(source_url, asset_data)
+
+    def fetch_file(
+        self, source_url: str, asset_data: dict[str, Any]
+    ) -> UploadedFile | utils.StoredFileDetails:
+        """
+        Download the file at ``source_url`` and return it, once it has been
+        passed through ``process_downloaded_file()``. The ``validators`` from
+        the download are carried over to the processed file.
+        """
+        file = self.download_file(source_url)
+        validators = getattr(file, "validators", None)
+        processed_file = self.process_downloaded_file(file, asset_data)
+        if processed_file is not None:
+            file = processed_file
+            file.validators = validators
+        return file
+
+    def get_download_validators(
+        self, source_url: str
+    ) -> utils.DownloadValidators | None:
+        """
+        Return the ``DownloadValidators`` from the last time the file at
+        ``source_url`` was downloaded for this object, so that it is only
+        downloaded again if it has changed. Returns ``None`` if the file has
+        not been downloaded before (or is missing from storage), if a download
+        is being forced, or if conditional downloads are disabled by the
+        ``BYNDER_CONDITIONAL_DOWNLOADS`` setting.
+        """
+        if not getattr(settings, "BYNDER_CONDITIONAL_DOWNLOADS", True):
+            return None
+        if getattr(self, "_force_download", False):
+            return None
+        if not self.file or self.source_filename != utils.filename_from_url(source_url):
+            return None
+        if not self.file.storage.exists(self.file.name):
+            return None
+        return (
+            utils.DownloadValidators(self.source_etag, self.source_last_modified)
+            or None
+        )
+
+    def set_download_validators(self, validators: utils.DownloadValidators) -> None:
+        self.source_etag = validators.etag[:255]
+        self.source_last_modified = validators.last_modified[:64]
+
+    def find_file_duplicate(
+        self, file: UploadedFile | None = None, *, file_hash: str = ""
+    ) -> "BynderAssetWithFileMixin | None":
+        """
+        When the ``BYNDER_DEDUPLICATE_FILES`` setting is ``True``, return
+        another object with a stored file identical to ``file`` (or with the
+        SHA-1 hash ``file_hash``), which this object can share instead of
+        storing a copy of its own. Otherwise, return ``None``.
+        """
+        if not getattr(settings, "BYNDER_DEDUPLICATE_FILES", False):
+            return None
+        if not file_hash:
+            file_hash = hash_filelike(file)
+        duplicate = (
+            type(self)
+            ._default_manager.filter(file_hash=file_hash)
+            .exclude(pk=self.pk)
+            .exclude(file="")
+            .first()
+        )
+        if duplicate is None or not duplicate.file.storage.exists(duplicate.file.name):
+            return None
+        return duplicate
+
+    def use_file_from(self, other: "BynderAssetWithFileMixin") -> None:
+        """
+        Update this object to share the stored file of ``other``, which must
+        be an object of the same type.
+        """
+        self.file = other.file
+        # There is no need for save() to read the file back to work these out
+        self.file_size = other.file_size
+        self.file_hash = other.file_hash
+        self._file_metadata_set = True
+
+    def file_is_shared(self) -> bool:
+        """
+        Return ``True`` if another object references the same stored file as
+        this one (as a result of ``BYNDER_DEDUPLICATE_FILES`` being enabled),
+        meaning it should not be deleted along with this one.
+        """
+        if not self.file or not self.file_hash:
+            return False
+        return (
+            type(self)
+            ._default_manager.filter(file_hash=self.file_hash, file=self.file.name)
+            .exclude(pk=self.pk)
+            .exists()
+        )
 
     def download_file(self, source_url: str) -> UploadedFile:
         raise NotImplementedError
@@ -228,7 +487,9 @@ class BynderSyncedImage(BynderAssetWithFileMixin, AbstractImage):
         abstract = True
 
     def save(self, *args, **kwargs):
-        if getattr(self, "_file_changed", False):
+        if getattr(self, "_file_changed", False) and not getattr(
+            self, "_file_metadata_set", False
+        ):
             self._set_image_file_metadata()
         if self.pk and (
             getattr(self, "_file_changed", False)
@@ -276,13 +537,61 @@ class BynderSyncedImage(BynderAssetWithFileMixin, AbstractImage):
             or (self.original_width or 0) != int(asset_data["width"])
         )
 
+    def probe_file_has_changed(self, asset_data: dict[str, Any]) -> bool:
+        """
+        Overrides ``BynderAssetWithFileMixin.probe_file_has_changed()`` to
+        read the dimensions and format of the source image from the first few
+        KB of the file (using ``utils.probe_image()``), and compare them to
+        those of the current file, taking into account the conversion applied
+        by ``convert_downloaded_image()``. Returns ``True`` if they differ, or
+        if the image can't be probed.
+        """
+        probe = utils.probe_image(self.extract_file_source(asset_data))
+        if probe is None or probe.format_name == "gif":
+            # Conversion of GIFs depends on whether they are animated, which
+            # can't be established from the start of the file
+            return True
+        expected_width, expected_height = self.get_source_image_size(
+            probe.width, probe.height
+        )
+        expected_extension = IMAGE_FORMAT_EXTENSIONS.get(
+            utils.get_output_image_format(probe.format_name)
+        )
+        _, current_extension = os.path.splitext(self.file.name)
+        return (
+            # Allow for differences in rounding when images are resized
+            abs((self.width or 0) - expected_width) > 1
+            or abs((self.height or 0) - expected_height) > 1
+            or current_extension.lower() != expected_extension
+        )
+
+    def get_source_image_size(self, width: int, height: int) -> tuple[int, int]:
+        """
+        Return the dimensions that a source image of ``width`` x ``height``
+        pixels will have once downsized (if needed) to fit within
+        ``BYNDER_MAX_SOURCE_IMAGE_WIDTH`` and ``BYNDER_MAX_SOURCE_IMAGE_HEIGHT``.
+        """
+        max_width = int(getattr(settings, "BYNDER_MAX_SOURCE_IMAGE_WIDTH", 3500))
+        max_height = int(getattr(settings, "BYNDER_MAX_SOURCE_IMAGE_HEIGHT", 3500))
+        if width <= max_width and height <= max_height:
+            return width, height
+        scale = min(max_width / width, max_height / height)
+        return int(width * scale), int(height * scale)
+
     def update_file(self, asset_data: dict[str, Any]) -> None:
         self.original_width = int(asset_data["width"])
         self.original_height = int(asset_data["height"])
         return super().update_file(asset_data)
 
+    def use_file_from(self, other: "BynderSyncedImage") -> None:
+        # Avoid the file being read back from storage to find the dimensions
+        other.file._dimensions_cache = (other.width, other.height)
+        super().use_file_from(other)
+
     def download_file(self, source_url: str) -> UploadedFile:
-        return utils.download_image(source_url)
+        return utils.download_image(
+            source_url, validators=self.get_download_validators(source_url)
+        )
 
     def process_downloaded_file(
         self,
@@ -296,29 +605,39 @@ class BynderSyncedImage(BynderAssetWithFileMixin, AbstractImage):
         """
 
         # Write to filesystem to avoid using memory for the same image
-        tmp = NamedTemporaryFile(mode="w+b", dir=settings.FILE_UPLOAD_TEMP_DIR)
-        details = self.convert_downloaded_image(file, tmp)
+        tmp = TemporaryUploadedFile(file.name, None, 0, None)
+        details = self.convert_downloaded_image(file, tmp.file)
 
         # The original file is now redundant and can be deleted, making
         # more memory available
+        file.close()
         del file.file
 
-        # Load the converted image into memory to speed up the additional
-        # reads and writes performed by Wagtail
-        new_file = io.BytesIO()
+        name_minus_extension, _ = os.path.splitext(file.name)
+        new_name = (
+            f"{name_minus_extension}{IMAGE_FORMAT_EXTENSIONS[details.image_format]}"
+        )
         tmp.seek(0)
-        with open(tmp.name, "rb") as source:
-            for line in source:
-                new_file.write(line)
 
-        name_minus_extension, _ = os.path.splitext(file.name)
-        new_extension = IMAGE_FORMAT_EXTENSIONS[details.image_format]
+        max_memory_size = utils.get_download_max_memory_size()
+        if max_memory_size is not None and details.file_size > max_memory_size:
+            # The converted image is too large to hold in memory, so use
+            # the temporary file as it is
+            tmp.name = new_name
+            tmp.content_type = details.mime_type
+            tmp.size = details.file_size
+            return tmp
+
+        # Load the converted image into memory to speed up the additional
+        # reads and writes performed by Wagtail
+        new_file = io.BytesIO(tmp.read())
+        tmp.close()
 
         # Return replacement InMemoryUploadedFile
         return InMemoryUploadedFile(
             new_file,
             field_name="file",
-            name=f"{name_minus_extension}{new_extension}",
+            name=new_name,
             content_type=details.mime_type,
             size=details.file_size,
             charset=None,
@@ -464,9 +783,27 @@ class BynderSyncedDocument(BynderAssetWithFileMixin, AbstractDocument):
         abstract = True
 
     def save(self, *args, **kwargs):
-        if getattr(self, "_file_changed", False):
-            self._set_document_file_metadata()
-        super().save(*args, **kwargs)
+        try:
+            if getattr(self, "_file_changed", False) and not getattr(
+                self, "_file_metadata_set", False
+            ):
+                self._set_document_file_metadata()
+            super().save(*args, **kwargs)
+        except Exception:
+            # Don't leave a streamed file in storage with nothing using it
+            self.discard_streamed_file()
+            raise
+        # The streamed file now belongs to this object
+        self.__dict__.pop("_streamed_file", None)
+
+    def discard_streamed_file(self) -> None:
+        """
+        Delete the file streamed into storage by ``update_file()`` (if any)
+        that has not yet been saved as this object's file.
+        """
+        name = self.__dict__.pop("_streamed_file", None)
+        if name:
+            self._meta.get_field("file").storage.delete(name)
 
     @staticmethod
     def extract_file_source(asset_data: dict[str, Any]) -> str:
@@ -480,8 +817,72 @@ class BynderSyncedDocument(BynderAssetWithFileMixin, AbstractDocument):
                 "'original' asset URL in order to download and save its own copy."
             ) from e
 
+    def update_file(self, asset_data: dict[str, Any]) -> None:
+        """
+        Overrides ``BynderAssetWithFileMixin.update_file()`` to stream the
+        file straight into storage when the ``BYNDER_STREAM_DOCUMENTS_TO_STORAGE``
+        setting is ``True``, instead of downloading it first.
+
+        NOTE: ``process_downloaded_file()`` is not called for streamed files.
+        If anything fails before the object is saved, the streamed file is
+        deleted from storage again.
+        """
+        if not getattr(settings, "BYNDER_STREAM_DOCUMENTS_TO_STORAGE", False):
+            return super().update_file(asset_data)
+
+        source_url = self.extract_file_source(asset_data)
+        try:
+            details = self.get_file(source_url, asset_data)
+        except BynderAssetFileNotModified:
+            self.original_filesize = int(asset_data["fileSize"])
+            return
+
+        self._streamed_file = details.name
+        try:
+            duplicate = self.find_file_duplicate(file_hash=details.file_hash)
+            if duplicate is not None:
+                # The file was already in storage, so remove the new copy
+                self.discard_streamed_file()
+                self.use_file_from(duplicate)
+            else:
+                self.file = details.name
+                # The file is already in storage, so there is no need for save()
+                # to read it back again to work these out
+                self.file_size = details.size
+                self.file_hash = details.file_hash
+                self._file_metadata_set = True
+            self._file_changed = True
+
+            # Update supplementary field values
+            self.source_filename = utils.filename_from_url(source_url)
+            self.original_filesize = int(asset_data["fileSize"])
+            self.set_download_validators(details.validators)
+        except Exception:
+            self.discard_streamed_file()
+            raise
+
+    def fetch_file(
+        self, source_url: str, asset_data: dict[str, Any]
+    ) -> UploadedFile | utils.StoredFileDetails:
+        if getattr(settings, "BYNDER_STREAM_DOCUMENTS_TO_STORAGE", False):
+            return self.stream_file_to_storage(source_url)
+        return super().fetch_file(source_url, asset_data)
+
     def download_file(self, source_url: str) -> UploadedFile:
-        return utils.download_document(source_url)
+        return utils.download_document(
+            source_url, validators=self.get_download_validators(source_url)
+        )
+
+    def stream_file_to_storage(self, source_url: str) -> utils.StoredFileDetails:
+        field = self._meta.get_field("file")
+        name = field.generate_filename(self, utils.filename_from_url(source_url))
+        return utils.stream_document_to_storage(
+            source_url,
+            field.storage,
+            name,
+            max_length=field.max_length,
+            validators=self.get_download_validators(source_url),
+        )
 
 
 class BynderSyncedVideo(
@@ -626,3 +1027,15 @@ class BynderSyncedVideo(
         self.original_height = int(asset_data["height"])
 
         super().update_from_asset_data(asset_data, **kwargs)
+
+
+@receiver(post_delete)
+def keep_shared_file(sender, instance, **kwargs):
+    """
+    Prevent a file that is shared with other objects (see
+    ``BynderAssetWithFileMixin.file_is_shared()``) from being deleted by
+    Wagtail's ``post_delete`` handler, which deletes it once the transaction
+    is committed.
+    """
+    if isinstance(instance, BynderAssetWithFileMixin) and instance.file_is_shared():
+        instance.file.name = None
@@ -0,0 +1,269 @@
+import abc
+import contextlib
+import contextvars
+import functools
+import math
+import threading
+import time
+
+from collections.abc import Iterator
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from typing import Any
+
+import requests
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+# Requests made while editors are waiting (e.g. from the chooser views)
+INTERACTIVE = "interactive"
+# Requests made by management commands and other background tasks
+BACKGROUND = "background"
+
+_CURRENT_BUDGET: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "wagtail_bynder_budget", default=INTERACTIVE
+)
+
+_RATE_LIMITERS: dict[str, "RateLimiter | None"] = {}
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+# How long to wait before retrying a '429 Too Many Requests' response that
+# doesn't say how long to wait
+DEFAULT_RETRY_AFTER = 1.0
+
+_BANDWIDTH_LIMITER: "RateLimiter | None" = None
+_BANDWIDTH_LIMITER_CREATED = False
+
+
+def get_current_budget() -> str:
+    """
+    Return the budget (``INTERACTIVE`` or ``BACKGROUND``) that work in the
+    current thread / asyncio task counts towards.
+    """
+    return _CURRENT_BUDGET.get()
+
+
+@contextlib.contextmanager
+def use_budget(budget: str) -> Iterator[None]:
+    """
+    A context manager to have work carried out within it (including by an
+    ``TaskRunner``) count towards ``budget``.
+    """
+    token = _CURRENT_BUDGET.set(budget)
+    try:
+        yield
+    finally:
+        _CURRENT_BUDGET.reset(token)
+
+
+class RateLimiter(abc.ABC):
+    """
+    Limits the rate at which requests are made to ``rate`` requests per
+    second, by making callers of ``acquire()`` wait their turn.
+    """
+
+    def __init__(self, rate: float):
+        if rate <= 0:
+            raise ValueError("rate must be greater than zero")
+        self.rate = float(rate)
+
+    def acquire(self, amount: int = 1) -> None:
+        """
+        Block until another request (or ``amount`` units of whatever is
+        being limited) can be made without exceeding the limit.
+        """
+        while (delay := self.try_acquire(amount)) > 0:
+            time.sleep(delay)
+
+    @abc.abstractmethod
+    def try_acquire(self, amount: int = 1) -> float:
+        """
+        Take the allowance for one request (or ``amount`` units) if it is
+        available, and return ``0``. Otherwise, return the number of seconds
+        to wait before trying again.
+        """
+
+
+class TokenBucketRateLimiter(RateLimiter):
+    """
+    A thread-safe token bucket, shared by all threads in the process. Up to
+    ``capacity`` requests (one second's worth, by default) can be made in
+    quick succession before the limit kicks in.
+
+    Amounts larger than the capacity are allowed once the bucket is full,
+    leaving it in debt, so that the limit is still respected on average.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        super().__init__(rate)
+        self.capacity = max(float(capacity or rate), 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self, amount: int = 1) -> float:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated_at) * self.rate
+            )
+            self.updated_at = now
+            required = min(amount, self.capacity)
+            if self.tokens >= required:
+                self.tokens -= amount
+                return 0.0
+            return (required - self.tokens) / self.rate
+
+
+class CacheRateLimiter(RateLimiter):
+    """
+    A rate limiter shared by every process using the same Django cache
+    backend (e.g. Redis or Memcached), so that the limit applies across a
+    whole cluster. Requests are counted in fixed windows of time (one second,
+    or however long it takes for one request to be allowed at slower rates).
+    """
+
+    def __init__(self, rate: float, cache_alias: str, key: str):
+        super().__init__(rate)
+        self.cache_alias = cache_alias
+        self.key = key
+        self.window = max(1.0, 1.0 / self.rate)
+        self.limit = max(math.floor(self.rate * self.window), 1)
+
+    def try_acquire(self, amount: int = 1) -> float:
+        cache = caches[self.cache_alias]
+        now = time.time()
+        window_index = int(now // self.window)
+        key = f"{self.key}:{window_index}"
+        timeout = math.ceil(self.window) + 1
+        cache.add(key, 0, timeout=timeout)
+        try:
+            count = cache.incr(key, amount)
+        except ValueError:
+            # The key expired (or was evicted) since it was added
+            cache.add(key, amount, timeout=timeout)
+            count = amount
+        if count <= max(self.limit, amount):
+            return 0.0
+        return (window_index + 1) * self.window - now
+
+
+class RateLimitedClient:
+    """
+    Wraps a Bynder API client (e.g. ``BynderClient.asset_bank_client``) so
+    that ``limiter.acquire()`` is called before every method call.
+    """
+
+    def __init__(self, client: Any, limiter: RateLimiter):
+        self._client = client
+        self._limiter = limiter
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._client, name)
+        if not callable(value):
+            return value
+
+        @functools.wraps(value)
+        def rate_limited(*args, **kwargs):
+            self._limiter.acquire()
+            return value(*args, **kwargs)
+
+        return rate_limited
+
+
+def get_retry_after(error: Exception) -> float | None:
+    """
+    Return the number of seconds to wait before retrying a request to Bynder
+    that raised ``error`` because Bynder is overloaded (a ``429 Too Many
+    Requests`` response, or any other error response with a ``Retry-After``
+    header), or ``None`` if ``error`` is for some other reason.
+    """
+    response = getattr(error, "response", None)
+    if not isinstance(error, requests.HTTPError) or response is None:
+        return None
+    retry_after = response.headers.get("Retry-After")
+    if not retry_after:
+        if response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+            return DEFAULT_RETRY_AFTER
+        return None
+    try:
+        return max(float(retry_after), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+def get_rate_limiter(budget: str) -> RateLimiter | None:
+    """
+    Return the ``RateLimiter`` for requests to the Bynder API from the named
+    ``budget`` (``INTERACTIVE`` or ``BACKGROUND``), or ``None`` if no limit is
+    set for it in the ``BYNDER_API_RATE_LIMITS`` setting.
+
+    Each budget has its own limiter, shared by the whole process (or, if the
+    ``BYNDER_API_RATE_LIMIT_CACHE`` setting is set, by every process using
+    that cache), so that background work can't use up the allowance needed
+    for interactive requests.
+    """
+    try:
+        return _RATE_LIMITERS[budget]
+    except KeyError:
+        pass
+    with _RATE_LIMITERS_LOCK:
+        if budget not in _RATE_LIMITERS:
+            _RATE_LIMITERS[budget] = create_rate_limiter(budget)
+        return _RATE_LIMITERS[budget]
+
+
+def create_rate_limiter(budget: str) -> RateLimiter | None:
+    rate = getattr(settings, "BYNDER_API_RATE_LIMITS", {}).get(budget)
+    if not rate:
+        return None
+    cache_alias = getattr(settings, "BYNDER_API_RATE_LIMIT_CACHE", None)
+    if cache_alias:
+        return CacheRateLimiter(
+            rate, cache_alias, f"wagtail-bynder:api-rate-limit:{budget}"
+        )
+    return TokenBucketRateLimiter(rate)
+
+
+def get_download_bandwidth_limiter() -> RateLimiter | None:
+    """
+    Return the ``RateLimiter`` that limits the number of bytes per second
+    downloaded by background work (as set by the
+    ``BYNDER_DOWNLOAD_BANDWIDTH_LIMIT`` setting), or ``None`` if downloads
+    made in the current context should not be limited. Downloads that count
+    towards the ``INTERACTIVE`` budget are never limited.
+
+    The limiter is shared by all threads in the process, so the limit applies
+    to all concurrent downloads combined.
+    """
+    global _BANDWIDTH_LIMITER, _BANDWIDTH_LIMITER_CREATED
+    if get_current_budget() != BACKGROUND:
+        return None
+    if not _BANDWIDTH_LIMITER_CREATED:
+        with _RATE_LIMITERS_LOCK:
+            if not _BANDWIDTH_LIMITER_CREATED:
+                rate = getattr(settings, "BYNDER_DOWNLOAD_BANDWIDTH_LIMIT", None)
+                _BANDWIDTH_LIMITER = TokenBucketRateLimiter(rate) if rate else None
+                _BANDWIDTH_LIMITER_CREATED = True
+    return _BANDWIDTH_LIMITER
+
+
+@receiver(setting_changed)
+def reset_rate_limiters(*, setting: str, **kwargs) -> None:
+    global _BANDWIDTH_LIMITER, _BANDWIDTH_LIMITER_CREATED
+    if setting.startswith("BYNDER_API_RATE_LIMIT"):
+        with _RATE_LIMITERS_LOCK:
+            _RATE_LIMITERS.clear()
+    elif setting == "BYNDER_DOWNLOAD_BANDWIDTH_LIMIT":
+        with _RATE_LIMITERS_LOCK:
+            _BANDWIDTH_LIMITER = None
+            _BANDWIDTH_LIMITER_CREATED = False
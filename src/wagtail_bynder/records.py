@@ -0,0 +1,81 @@
+from collections.abc import Iterable, Iterator, Mapping
+from datetime import datetime
+from typing import Any
+
+
+class AssetRecord(Mapping):
+    """
+    A compact, read-only representation of an asset from the Bynder API
+    (e.g. an item returned by ``media_list()``), keeping only the fields that
+    the models use when updating objects, plus any ``extra_fields``. When
+    ``extra_fields`` is ``None``, all other fields are kept too.
+
+    Records behave like the dicts they are created from (so they can be
+    passed to ``update_from_asset_data()`` and friends as usual), but take up
+    far less memory, and have the 'dateModified' value parsed once, as
+    ``date_modified``.
+    """
+
+    fields = (
+        "id",
+        "name",
+        "description",
+        "copyright",
+        "dateModified",
+        "archive",
+        "limited",
+        "isPublic",
+        "fileSize",
+        "width",
+        "height",
+        "original",
+        "thumbnails",
+        "videoPreviewURLs",
+        "activeOriginalFocusPoint",
+    )
+    __slots__ = (*fields, "date_modified", "extra")
+
+    def __init__(
+        self, data: Mapping[str, Any], extra_fields: Iterable[str] | None = ()
+    ):
+        for name in self.fields:
+            if name in data:
+                setattr(self, name, data[name])
+        self.date_modified = datetime.fromisoformat(data["dateModified"])
+        if extra_fields is None:
+            self.extra = {
+                name: value for name, value in data.items() if name not in self.fields
+            }
+        else:
+            self.extra = {name: data[name] for name in extra_fields if name in data}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.fields:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                # The field was missing from the original data
+                raise KeyError(key) from None
+        return self.extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self.fields:
+            if hasattr(self, name):
+                yield name
+        yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}: {self.get('id')}>"
+
+
+def get_date_modified(asset_data: Mapping[str, Any]) -> datetime:
+    """
+    Return the 'dateModified' value from ``asset_data`` (an ``AssetRecord``,
+    or a dict from the Bynder API) as a ``datetime``.
+    """
+    if isinstance(asset_data, AssetRecord):
+        return asset_data.date_modified
+    return datetime.fromisoformat(asset_data["dateModified"])
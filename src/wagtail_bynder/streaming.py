@@ -0,0 +1,121 @@
+import codecs
+import json
+
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+import requests
+
+
+# The number of bytes to read from a streamed response at a time
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """
+    Parse a UTF-8 encoded JSON array from ``chunks`` of bytes (e.g. from
+    ``Response.iter_content()``), yielding each item as soon as all of it has
+    arrived, so that only one item (and one chunk) is held in memory at a
+    time. Raises ``ValueError`` if the data is not a complete JSON array.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    started = False
+    # Whether the next thing in the array should be an item (rather than a
+    # ',' or the closing ']')
+    expecting_item = True
+    # Whether the array can end here (it can't straight after a ',')
+    can_end = True
+
+    for chunk in chunks:
+        buffer = buffer[pos:] + text_decoder.decode(chunk)
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos == len(buffer):
+                # Wait for more data
+                break
+            char = buffer[pos]
+            if not started:
+                if char != "[":
+                    raise ValueError("Expected a JSON array")
+                started = True
+                pos += 1
+                continue
+            if char == "]" and can_end:
+                return
+            if not expecting_item:
+                if char != ",":
+                    raise ValueError(f"Unexpected {char!r} in JSON array")
+                expecting_item = True
+                can_end = False
+                pos += 1
+                continue
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # The item is (most likely) incomplete, so wait for the rest
+                break
+            if isinstance(item, int | float) and (
+                end == len(buffer) or buffer[end] not in _WHITESPACE + ",]"
+            ):
+                # More of the number might be in the next chunk
+                break
+            yield item
+            pos = end
+            expecting_item = False
+            can_end = True
+
+    # Reaching the end of the data before the closing ']' means that it was
+    # truncated (or that an item was invalid)
+    if buffer[pos:].strip():
+        # Raise the decoder's own error for invalid items
+        decoder.raw_decode(buffer, pos)
+    raise ValueError("Incomplete JSON array")
+
+
+class StreamingAssetBankClient:
+    """
+    Wraps a Bynder asset bank client (``BynderClient.asset_bank_client``) to
+    add ``iter_media_list()``, which parses the assets in a page of
+    ``media_list()`` results one at a time, as the response arrives.
+    """
+
+    def __init__(self, client: Any, session: requests.Session, domain: str):
+        self._client = client
+        self._session = session
+        self._url = f"https://{domain}/api/v4/media/"
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    def iter_media_list(self, query: dict[str, Any] | None = None) -> Iterator[Any]:
+        """
+        Request a page of assets, like ``media_list()``, but return an iterator
+        that yields each asset as soon as it has arrived, rather than waiting
+        for the whole page.
+
+        The request is made (and error responses raised) straight away, but
+        the connection is held until the iterator is exhausted or closed, so
+        connection errors can also be raised while iterating.
+        """
+        response = self._session.request(
+            "GET", self._url, params=query or {}, stream=True
+        )
+        try:
+            response.raise_for_status()
+        except requests.HTTPError:
+            response.close()
+            raise
+        return self._iter_response(response)
+
+    def _iter_response(self, response: requests.Response) -> Iterator[Any]:
+        try:
+            yield from iter_json_array(response.iter_content(CHUNK_SIZE))
+        finally:
+            response.close()
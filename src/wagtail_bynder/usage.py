@@ -0,0 +1,205 @@
+import collections
+import contextlib
+import contextvars
+import functools
+import threading
+
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+import requests
+
+
+# Requests made by the chooser views (other callers are named after the
+# management command making them)
+CHOOSER = "chooser"
+OTHER = "other"
+
+# Endpoint names used for requests made to download files
+DOWNLOAD = "download"
+DOWNLOAD_PREFLIGHT = "download_preflight"
+
+_CURRENT_CALLER: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "wagtail_bynder_caller", default=OTHER
+)
+
+
+def get_current_caller() -> str:
+    """
+    Return the name that requests made in the current thread / asyncio task
+    are counted against (e.g. ``CHOOSER``, or the name of a management
+    command).
+    """
+    return _CURRENT_CALLER.get()
+
+
+@contextlib.contextmanager
+def use_caller(caller: str) -> Iterator[None]:
+    """
+    A context manager to have requests made within it (including by an
+    ``TaskRunner``) counted against ``caller``.
+    """
+    token = _CURRENT_CALLER.set(caller)
+    try:
+        yield
+    finally:
+        _CURRENT_CALLER.reset(token)
+
+
+@dataclass(frozen=True)
+class UsageSummary:
+    """
+    A summary of the requests made to Bynder by the process, as returned by
+    ``get_usage()``.
+    """
+
+    # The number of requests made by each (caller, endpoint) combination
+    calls: dict[tuple[str, str], int] = field(default_factory=dict)
+    # The rate limit headers from the most recent Bynder API response
+    rate_limit_headers: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return sum(self.calls.values())
+
+    def by_endpoint(self) -> dict[str, int]:
+        """
+        Return the number of requests made to each endpoint (e.g.
+        ``"media_info"`` or ``DOWNLOAD``), by any caller.
+        """
+        counts: collections.Counter[str] = collections.Counter()
+        for (_, endpoint), count in self.calls.items():
+            counts[endpoint] += count
+        return dict(counts)
+
+    def by_caller(self) -> dict[str, int]:
+        """
+        Return the number of requests made by each caller, to any endpoint.
+        """
+        counts: collections.Counter[str] = collections.Counter()
+        for (caller, _), count in self.calls.items():
+            counts[caller] += count
+        return dict(counts)
+
+    def since(self, earlier: "UsageSummary") -> "UsageSummary":
+        """
+        Return a summary of the requests made since ``earlier`` was taken.
+        """
+        calls = {
+            key: count - earlier.calls.get(key, 0)
+            for key, count in self.calls.items()
+            if count > earlier.calls.get(key, 0)
+        }
+        return UsageSummary(calls, dict(self.rate_limit_headers))
+
+
+class UsageTracker:
+    """
+    Counts requests made to Bynder by all threads in the process, by caller
+    and endpoint, and keeps the rate limit headers from the most recent
+    Bynder API response.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls: collections.Counter[tuple[str, str]] = collections.Counter()
+        self.rate_limit_headers: dict[str, str] = {}
+
+    def record_call(self, endpoint: str) -> None:
+        with self.lock:
+            self.calls[(get_current_caller(), endpoint)] += 1
+
+    def record_rate_limit_headers(self, headers: Any) -> None:
+        rate_limit_headers = {
+            name: value for name, value in headers.items() if is_rate_limit_header(name)
+        }
+        if rate_limit_headers:
+            with self.lock:
+                self.rate_limit_headers = rate_limit_headers
+
+    def get_summary(self) -> UsageSummary:
+        with self.lock:
+            return UsageSummary(dict(self.calls), dict(self.rate_limit_headers))
+
+    def reset(self) -> None:
+        with self.lock:
+            self.calls.clear()
+            self.rate_limit_headers = {}
+
+
+_TRACKER = UsageTracker()
+
+
+def is_rate_limit_header(name: str) -> bool:
+    name = name.lower()
+    return (
+        name.startswith(("x-ratelimit", "ratelimit", "x-rate-limit"))
+        or name == "retry-after"
+    )
+
+
+def get_usage() -> UsageSummary:
+    """
+    Return a summary of the requests made to Bynder by the process so far
+    (or since ``reset_usage()`` was last called).
+    """
+    return _TRACKER.get_summary()
+
+
+def reset_usage() -> None:
+    _TRACKER.reset()
+
+
+def record_api_response(response: requests.Response, *args, **kwargs) -> None:
+    """
+    A ``requests`` response hook for the Bynder API session, that keeps the
+    rate limit headers from each response.
+    """
+    _TRACKER.record_rate_limit_headers(response.headers)
+
+
+def record_download_response(response: requests.Response, *args, **kwargs) -> None:
+    """
+    A ``requests`` response hook for the download session, that counts each
+    request made to download a file (not including redirects).
+    """
+    if response.is_redirect:
+        return
+    if response.request is not None and response.request.method == "HEAD":
+        _TRACKER.record_call(DOWNLOAD_PREFLIGHT)
+    else:
+        _TRACKER.record_call(DOWNLOAD)
+
+
+# Client methods that make requests to the same endpoint as another method
+# (e.g. ``StreamingAssetBankClient.iter_media_list()``), and should be
+# counted as such
+METHOD_ENDPOINTS = {
+    "iter_media_list": "media_list",
+}
+
+
+class UsageTrackingClient:
+    """
+    Wraps a Bynder API client (e.g. ``BynderClient.asset_bank_client``) so
+    that every method call is counted against the current caller, using the
+    method name (e.g. ``"media_list"``) as the endpoint, unless it is mapped
+    to another endpoint in ``METHOD_ENDPOINTS``.
+    """
+
+    def __init__(self, client: Any):
+        self._client = client
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._client, name)
+        if not callable(value):
+            return value
+        endpoint = METHOD_ENDPOINTS.get(name, name)
+
+        @functools.wraps(value)
+        def tracked(*args, **kwargs):
+            _TRACKER.record_call(endpoint)
+            return value(*args, **kwargs)
+
+        return tracked
@@ -1,60 +1,625 @@
+import contextlib
+import hashlib
+import io
+import json
+import logging
 import mimetypes
 import os
+import re
+import shutil
+import tempfile
+import threading
 
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
 from http import HTTPStatus
 from io import BytesIO
+from typing import Any
 
 import requests
 
 from asgiref.local import Local
 from bynder_sdk import BynderClient
 from django.conf import settings
+from django.core.cache import caches
 from django.core.files import File
-from django.core.files.uploadedfile import InMemoryUploadedFile
+from django.core.files.storage import Storage
+from django.core.files.uploadedfile import (
+    InMemoryUploadedFile,
+    TemporaryUploadedFile,
+    UploadedFile,
+)
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.template.defaultfilters import filesizeformat
+from PIL import Image as PILImage
+from PIL import UnidentifiedImageError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from wagtail.models import Collection
 from willow import Image
 
-from .exceptions import BynderAssetDownloadError, BynderAssetFileTooLarge
+from . import circuitbreaker, ratelimit, streaming, usage
+from .concurrency import CacheLock
+from .exceptions import (
+    BynderAssetDownloadError,
+    BynderAssetDownloadInterrupted,
+    BynderAssetFileNotModified,
+    BynderAssetFileTooLarge,
+)
 
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # Not available on Windows
+    fcntl = None
+
+logger = logging.getLogger("wagtail_bynder")
+
 _DEFAULT_COLLECTION = Local()
 
+_BYNDER_CLIENTS: dict[tuple[str, str, str], BynderClient] = {}
+_BYNDER_CLIENTS_LOCK = threading.Lock()
+_BYNDER_CLIENTS_GENERATION = 0
+_THREAD_BYNDER_CLIENTS = threading.local()
 
-def download_file(
-    url: str, max_filesize: int, max_filesize_setting_name: str
-) -> InMemoryUploadedFile:
+_DOWNLOAD_SESSION: requests.Session | None = None
+_DOWNLOAD_SESSION_LOCK = threading.Lock()
+
+# Server errors that are worth retrying, because they are usually temporary
+RETRY_STATUS_CODES = frozenset(
+    {
+        HTTPStatus.INTERNAL_SERVER_ERROR,
+        HTTPStatus.BAD_GATEWAY,
+        HTTPStatus.SERVICE_UNAVAILABLE,
+        HTTPStatus.GATEWAY_TIMEOUT,
+    }
+)
+
+CONTENT_RANGE_START_RE = re.compile(r"^bytes (\d+)-")
+
+
+def get_download_session() -> requests.Session:
+    """
+    Return the ``requests.Session`` used to download asset files from Bynder.
+
+    The session is created on first use and then shared by all threads in
+    the process, so that connections to the Bynder CDN are pooled and kept
+    alive between downloads, instead of a new TCP and TLS handshake being
+    needed for every file.
+    """
+    global _DOWNLOAD_SESSION
+    if _DOWNLOAD_SESSION is None:
+        with _DOWNLOAD_SESSION_LOCK:
+            if _DOWNLOAD_SESSION is None:
+                _DOWNLOAD_SESSION = create_download_session()
+    return _DOWNLOAD_SESSION
+
+
+def create_download_session() -> requests.Session:
+    """
+    Return a new ``requests.Session`` with connection pooling and automatic
+    retries (with exponential backoff) for connection errors and temporary
+    server errors, configured using the ``BYNDER_DOWNLOAD_*`` settings.
+    """
+    retry = Retry(
+        total=int(getattr(settings, "BYNDER_DOWNLOAD_MAX_RETRIES", 3)),
+        backoff_factor=float(
+            getattr(settings, "BYNDER_DOWNLOAD_RETRY_BACKOFF_FACTOR", 0.5)
+        ),
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        # Return the final error response instead of raising, so that
+        # download_file() can report it in the usual way
+        raise_on_status=False,
+    )
+    pool_size = int(getattr(settings, "BYNDER_DOWNLOAD_POOL_SIZE", 10))
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.hooks["response"].append(usage.record_download_response)
+    return session
+
+
+@receiver(setting_changed)
+def reset_download_session(*, setting: str, **kwargs) -> None:
+    global _DOWNLOAD_SESSION
+    if setting.startswith("BYNDER_DOWNLOAD_"):
+        with _DOWNLOAD_SESSION_LOCK:
+            _DOWNLOAD_SESSION = None
+
+
+def get_download_max_memory_size() -> int | None:
+    """
+    Return the maximum number of bytes of a downloaded file that should be
+    held in memory before it is written to a temporary file on disk instead,
+    or ``None`` if downloaded files should always be held in memory.
+    """
+    value = getattr(settings, "BYNDER_DOWNLOAD_MAX_MEMORY_SIZE", None)
+    return None if value is None else int(value)
+
+
+def get_sync_concurrency() -> int:
+    """
+    Return the default number of assets that management commands should
+    fetch data and files for at the same time.
+    """
+    return max(int(getattr(settings, "BYNDER_SYNC_CONCURRENCY", 1)), 1)
+
+
+@dataclass(frozen=True)
+class DownloadValidators:
+    """
+    The ``ETag`` and ``Last-Modified`` response header values for a
+    downloaded file, which can be sent back to Bynder with later requests for
+    the same file, so that it is only downloaded again if it has changed.
+    """
+
+    etag: str = ""
+    last_modified: str = ""
+
+    def __bool__(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    @classmethod
+    def from_response(cls, response: requests.Response) -> "DownloadValidators":
+        return cls(
+            etag=response.headers.get("ETag", ""),
+            last_modified=response.headers.get("Last-Modified", ""),
+        )
+
+    def get_request_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PartialDownload:
+    """
+    The data received so far for an interrupted download, persisted in the
+    ``BYNDER_DOWNLOAD_RESUME_DIR`` directory along with the validators for
+    the response it came from, so that the download can be resumed later
+    using a ``Range`` request.
+
+    Resumption is conditional (using ``If-Range``), so if the file has
+    changed in Bynder in the meantime, the full file is returned instead, and
+    the download starts again from the beginning.
+
+    The shared partial file for a URL is locked for as long as the
+    ``PartialDownload`` is open, so if another thread or process is already
+    downloading the same file, a new file of its own is used instead (which
+    can't be resumed). Call ``close()`` once the download is over.
+    """
+
+    def __init__(self, url: str, directory: str):
+        key = hashlib.sha1(url.encode(), usedforsecurity=False).hexdigest()
+        self.path = os.path.join(directory, f"{key}.part")
+        self.metadata_path: str | None = os.path.join(directory, f"{key}.json")
+        self._lock_fd = self.lock(self.path)
+        if self._lock_fd is None:
+            fd, self.path = tempfile.mkstemp(
+                prefix=f"{key}-", suffix=".part", dir=directory
+            )
+            os.close(fd)
+            self.metadata_path = None
+        self.validators = self.read_validators()
+
+    @staticmethod
+    def lock(path: str) -> int | None:
+        """
+        Open the file at ``path`` (creating it if needed) and take an
+        exclusive lock on it, returning the file descriptor, or ``None`` if
+        the file is already locked by someone else (or locking isn't
+        supported on this platform).
+        """
+        if fcntl is None:
+            return None
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            # The file may have been removed by the previous holder of the
+            # lock between being opened and locked here
+            if os.path.samestat(os.fstat(fd), os.stat(path)):
+                return fd
+        except OSError:
+            pass
+        os.close(fd)
+        return None
+
+    def close(self) -> None:
+        """
+        Remove the partial file unless it can be resumed later, and release
+        the lock on it.
+        """
+        if not self.is_resumable:
+            # Removed while still locked, so that nobody else can start
+            # using it in the meantime
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.path)
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def read_validators(self) -> DownloadValidators:
+        if self.metadata_path is None:
+            return DownloadValidators()
+        try:
+            with open(self.metadata_path) as f:
+                return DownloadValidators(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return DownloadValidators()
+
+    @property
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def get_request_headers(self) -> dict[str, str]:
+        size = self.size
+        if not size or not self.validators:
+            return {}
+        etag = self.validators.etag
+        # Weak ETags cannot be used with If-Range
+        if etag and not etag.startswith("W/"):
+            if_range = etag
+        elif self.validators.last_modified:
+            if_range = self.validators.last_modified
+        else:
+            return {}
+        return {"Range": f"bytes={size}-", "If-Range": if_range}
+
+    def is_continued_by(self, response: requests.Response) -> bool:
+        """
+        Return ``True`` if ``response`` is a '206 Partial Content' response
+        starting exactly where the data received so far ends.
+        """
+        if response.status_code != HTTPStatus.PARTIAL_CONTENT:
+            return False
+        match = CONTENT_RANGE_START_RE.match(response.headers.get("Content-Range", ""))
+        return bool(match) and int(match.group(1)) == self.size
+
+    def open(self, validators: DownloadValidators, *, append: bool = False):
+        """
+        Return the partial file opened for writing, either to continue from
+        where it left off (``append=True``), or to start a new download of
+        the file identified by ``validators``.
+        """
+        if not append:
+            self.validators = validators
+            if validators and self.metadata_path is not None:
+                with open(self.metadata_path, "w") as f:
+                    json.dump(
+                        {
+                            "etag": validators.etag,
+                            "last_modified": validators.last_modified,
+                        },
+                        f,
+                    )
+            else:
+                # Without validators, there would be no way to tell whether
+                # the partial file was still current, so it can't be resumed
+                self.discard_metadata()
+        return open(self.path, "ab" if append else "wb")
+
+    @property
+    def is_resumable(self) -> bool:
+        return self.metadata_path is not None and os.path.exists(self.metadata_path)
+
+    def discard_metadata(self) -> None:
+        if self.metadata_path is None:
+            return
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.metadata_path)
+
+    def discard(self) -> None:
+        self.discard_metadata()
+        self.validators = DownloadValidators()
+        # The file itself is only emptied (and removed by close()), so that
+        # the locked file stays in place
+        with contextlib.suppress(FileNotFoundError):
+            os.truncate(self.path, 0)
+
+
+def get_partial_download(url: str) -> PartialDownload | None:
+    """
+    Return a ``PartialDownload`` for ``url``, or ``None`` if resumable
+    downloads are not enabled via the ``BYNDER_DOWNLOAD_RESUME_DIR`` setting.
+    """
+    directory = getattr(settings, "BYNDER_DOWNLOAD_RESUME_DIR", None)
+    if not directory:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    return PartialDownload(url, directory)
+
+
+def get_download_response(
+    url: str,
+    *,
+    validators: DownloadValidators | None = None,
+    partial: PartialDownload | None = None,
+) -> requests.Response:
+    """
+    Request the file at ``url`` using the shared download session, and return
+    the response, so that the body can be streamed.
+
+    When ``validators`` from a previous download of the file are provided,
+    the request is made conditional, and ``BynderAssetFileNotModified`` is
+    raised if Bynder responds to say the file has not changed.
+
+    When a ``partial`` download is provided, only the rest of the file is
+    requested, and a '206 Partial Content' response may be returned (use
+    ``partial.is_continued_by()`` to check). If the partial download cannot
+    be continued, it is discarded, and the full file is requested instead.
+
+    Raises ``BynderAssetDownloadError`` if Bynder cannot be reached, or if
+    anything other than a ``200`` response is returned.
+    """
     name = os.path.basename(url)
-    response = requests.get(url, timeout=20, stream=True)
+    timeout = getattr(settings, "BYNDER_DOWNLOAD_TIMEOUT", 20)
+    headers = validators.get_request_headers() if validators else {}
+    range_headers = partial.get_request_headers() if partial is not None else {}
+    headers.update(range_headers)
+    try:
+        response = get_download_session().get(
+            url, headers=headers, timeout=timeout, stream=True
+        )
+    except requests.RequestException as e:
+        raise BynderAssetDownloadError(
+            f"Error connecting to Bynder to download '{name}': {e}"
+        ) from e
+
+    if response.status_code == HTTPStatus.NOT_MODIFIED:
+        response.close()
+        if partial is not None:
+            # Whatever was partially downloaded, it wasn't the current file
+            partial.discard()
+        raise BynderAssetFileNotModified(f"'{name}' has not changed in Bynder.")
+
+    if (
+        response.status_code
+        in (HTTPStatus.PARTIAL_CONTENT, HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+        and range_headers
+        and not partial.is_continued_by(response)
+    ):
+        # The partial download doesn't match what Bynder has, so start again
+        response.close()
+        partial.discard()
+        return get_download_response(url, validators=validators, partial=partial)
+
+    if partial is not None and partial.is_continued_by(response):
+        return response
 
     # Make sure we don't store error responses instead of the file requested
     if response.status_code != HTTPStatus.OK:
+        response.close()
         raise BynderAssetDownloadError(
             f"Server error downloading '{name}' from Bynder. "
         )
+    return response
 
-    file = BytesIO()
-    # Stream the file to memory. We use iter_content() instead of the default iterator for requests.Response,
-    # as the latter uses iter_lines() which isn't suitable for streaming binary data.
-    # Get data in largish 8KB chunks, for more performant streaming while staying within CPU cache limits
-    for chunk in response.iter_content(chunk_size=8192):
-        file.write(chunk)
-        if file.tell() > max_filesize:
-            file.truncate(0)
-            raise BynderAssetFileTooLarge(
-                f"File '{name}' exceeded the size limit enforced by the {max_filesize_setting_name} setting, which is currently set to {filesizeformat(max_filesize)}."
+
+def get_content_length(response: requests.Response) -> int | None:
+    """
+    Return the size of the body of ``response`` in bytes, if the server has
+    provided it, or ``None`` if it can't be known until the body is read.
+    """
+    value = response.headers.get("Content-Length")
+    # For compressed responses, the length given isn't the size of the file
+    if not value or response.headers.get("Content-Encoding", "identity") != "identity":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def get_file_too_large_error(
+    name: str, max_filesize: int, max_filesize_setting_name: str
+) -> BynderAssetFileTooLarge:
+    return BynderAssetFileTooLarge(
+        f"File '{name}' exceeded the size limit enforced by the {max_filesize_setting_name} setting, which is currently set to {filesizeformat(max_filesize)}."
+    )
+
+
+def check_download_size(
+    url: str, max_filesize: int, max_filesize_setting_name: str
+) -> None:
+    """
+    If the ``BYNDER_DOWNLOAD_PREFLIGHT`` setting is ``True``, make a ``HEAD``
+    request for the file at ``url``, and raise ``BynderAssetFileTooLarge`` if
+    the ``Content-Length`` of the response exceeds ``max_filesize``, so that
+    a ``GET`` request is never made for it.
+
+    This is only a shortcut, so any problems with the ``HEAD`` request are
+    ignored, and left for the download itself to deal with.
+    """
+    if not getattr(settings, "BYNDER_DOWNLOAD_PREFLIGHT", False):
+        return
+    timeout = getattr(settings, "BYNDER_DOWNLOAD_TIMEOUT", 20)
+    try:
+        response = get_download_session().head(
+            url, timeout=timeout, allow_redirects=True
+        )
+    except requests.RequestException:
+        return
+    response.close()
+    if response.status_code != HTTPStatus.OK:
+        return
+    content_length = get_content_length(response)
+    if content_length is not None and content_length > max_filesize:
+        raise get_file_too_large_error(
+            os.path.basename(url), max_filesize, max_filesize_setting_name
+        )
+
+
+def iter_download_chunks(
+    response: requests.Response,
+    name: str,
+    max_filesize: int,
+    max_filesize_setting_name: str,
+    *,
+    offset: int = 0,
+) -> Iterator[bytes]:
+    """
+    Yield the body of a response from ``get_download_response()`` in chunks,
+    raising ``BynderAssetFileTooLarge`` as soon as ``max_filesize`` is
+    exceeded (or before anything is read, if the ``Content-Length`` of the
+    response says it will be), ``BynderAssetDownloadInterrupted`` if the download is
+    interrupted, and ``BynderAssetDownloadError`` if it turns out to be empty.
+    The response is closed once the body has been consumed.
+
+    For a response continuing a partial download, ``offset`` should be the
+    number of bytes already received, so that it counts towards the limit.
+
+    For background work (see ``ratelimit.use_budget()``), reading is slowed
+    down as needed to keep within the ``BYNDER_DOWNLOAD_BANDWIDTH_LIMIT``.
+    """
+    size = offset
+    bandwidth_limiter = ratelimit.get_download_bandwidth_limiter()
+    try:
+        content_length = get_content_length(response)
+        if content_length is not None and offset + content_length > max_filesize:
+            raise get_file_too_large_error(
+                name, max_filesize, max_filesize_setting_name
             )
+        # We use iter_content() instead of the default iterator for requests.Response,
+        # as the latter uses iter_lines() which isn't suitable for streaming binary data.
+        # Get data in largish 8KB chunks, for more performant streaming while staying within CPU cache limits
+        for chunk in response.iter_content(chunk_size=8192):
+            size += len(chunk)
+            if size > max_filesize:
+                raise get_file_too_large_error(
+                    name, max_filesize, max_filesize_setting_name
+                )
+            if bandwidth_limiter is not None:
+                # Wait until reading more keeps within the bandwidth limit
+                bandwidth_limiter.acquire(len(chunk))
+            yield chunk
+    except requests.RequestException as e:
+        raise BynderAssetDownloadInterrupted(
+            f"Error downloading '{name}' from Bynder: {e}"
+        ) from e
+    finally:
+        # Return the connection to the pool, even if the body wasn't consumed
+        response.close()
 
-    size = file.tell()
     # Catch empty case where iter_content wouldn't have iterated
     if size == 0:
         raise BynderAssetDownloadError(
             f"Downloaded file '{name}' from Bynder is empty."
         )
-    file.seek(0)
 
+
+def download_file(
+    url: str,
+    max_filesize: int,
+    max_filesize_setting_name: str,
+    *,
+    validators: DownloadValidators | None = None,
+) -> UploadedFile:
+    """
+    Download the file at ``url`` and return it as an ``UploadedFile``.
+
+    Files are held in memory (as an ``InMemoryUploadedFile``) unless they are
+    larger than the ``BYNDER_DOWNLOAD_MAX_MEMORY_SIZE`` setting value, in
+    which case they are spooled to a ``TemporaryUploadedFile`` in
+    ``FILE_UPLOAD_TEMP_DIR`` as soon as that size is exceeded.
+
+    The ``validators`` attribute of the returned file holds the
+    ``DownloadValidators`` for the response, which can be passed back as
+    ``validators`` to avoid downloading the same file again if it hasn't
+    changed (in which case ``BynderAssetFileNotModified`` is raised).
+
+    If the ``BYNDER_DOWNLOAD_RESUME_DIR`` setting is set, the file is
+    downloaded to a partial file in that directory instead, which is kept if
+    the download is interrupted, so that the next attempt can resume from
+    where this one left off.
+
+    Where the size of the file is known before the download starts, files
+    that are too large are rejected straight away, and the file is written to
+    a buffer allocated up front (or straight to disk), instead of one that
+    has to keep growing as data arrives.
+    """
+    name = os.path.basename(url)
     content_type, charset = mimetypes.guess_type(name)
-    return InMemoryUploadedFile(
+    max_memory_size = get_download_max_memory_size()
+    check_download_size(url, max_filesize, max_filesize_setting_name)
+    partial = get_partial_download(url)
+    if partial is not None:
+        try:
+            response = get_download_response(
+                url, validators=validators, partial=partial
+            )
+            uploaded_file = download_partial_file(
+                response, partial, name, max_filesize, max_filesize_setting_name
+            )
+            uploaded_file.validators = (
+                DownloadValidators.from_response(response) or partial.validators
+            )
+            partial.discard()
+            return uploaded_file
+        finally:
+            partial.close()
+
+    response = get_download_response(url, validators=validators)
+    response_validators = DownloadValidators.from_response(response)
+
+    file = BytesIO()
+    spooled_file = None
+    size = 0
+    content_length = get_content_length(response)
+    if content_length is not None and content_length <= max_filesize:
+        if max_memory_size is not None and content_length > max_memory_size:
+            # Write to disk from the start
+            spooled_file = TemporaryUploadedFile(name, content_type, 0, charset)
+            file = spooled_file.file
+        elif content_length:
+            # Have the buffer allocated once, at its final size
+            file.seek(content_length - 1)
+            file.write(b"\0")
+            file.seek(0)
+    try:
+        for chunk in iter_download_chunks(
+            response, name, max_filesize, max_filesize_setting_name
+        ):
+            size += len(chunk)
+            if (
+                spooled_file is None
+                and max_memory_size is not None
+                and size > max_memory_size
+            ):
+                # Move what we have so far to disk, and write the rest there too
+                spooled_file = TemporaryUploadedFile(name, content_type, 0, charset)
+                spooled_file.write(file.getbuffer())
+                file.close()
+                file = spooled_file.file
+            file.write(chunk)
+    except Exception:
+        # Free up memory / remove the temporary file
+        file.close()
+        raise
+    finally:
+        response.close()
+
+    # In case fewer bytes were received than expected
+    file.truncate(size)
+    file.seek(0)
+
+    if spooled_file is not None:
+        spooled_file.size = size
+        spooled_file.validators = response_validators
+        return spooled_file
+
+    uploaded_file = InMemoryUploadedFile(
         file,
         field_name="file",
         name=name,
@@ -62,18 +627,264 @@ def download_file(
         size=size,
         charset=charset,
     )
+    uploaded_file.validators = response_validators
+    return uploaded_file
+
+
+def download_partial_file(
+    response: requests.Response,
+    partial: PartialDownload,
+    name: str,
+    max_filesize: int,
+    max_filesize_setting_name: str,
+) -> UploadedFile:
+    """
+    Write the body of ``response`` to the ``partial`` file, continuing from
+    where it left off if the response allows, and return the complete file as
+    an ``UploadedFile`` (held in memory, or in a ``TemporaryUploadedFile``,
+    as ``download_file()`` would).
+
+    If the download is interrupted, the partial file is kept for next time
+    (so long as it can be identified by validators). On any other error, it
+    is discarded.
+    """
+    content_type, charset = mimetypes.guess_type(name)
+    append = partial.is_continued_by(response)
+    offset = partial.size if append else 0
+    try:
+        with partial.open(
+            DownloadValidators.from_response(response), append=append
+        ) as file:
+            for chunk in iter_download_chunks(
+                response,
+                name,
+                max_filesize,
+                max_filesize_setting_name,
+                offset=offset,
+            ):
+                file.write(chunk)
+    except BynderAssetDownloadInterrupted:
+        if not partial.is_resumable:
+            partial.discard()
+        raise
+    except Exception:
+        partial.discard()
+        raise
+    finally:
+        response.close()
+
+    size = partial.size
+    max_memory_size = get_download_max_memory_size()
+    with open(partial.path, "rb") as source:
+        if max_memory_size is None or size <= max_memory_size:
+            return InMemoryUploadedFile(
+                BytesIO(source.read()),
+                field_name="file",
+                name=name,
+                content_type=content_type,
+                size=size,
+                charset=charset,
+            )
+        uploaded_file = TemporaryUploadedFile(name, content_type, size, charset)
+        shutil.copyfileobj(source, uploaded_file.file)
+    uploaded_file.file.seek(0)
+    return uploaded_file
+
+
+@dataclass(frozen=True)
+class StoredFileDetails:
+    name: str
+    size: int
+    file_hash: str
+    validators: DownloadValidators = DownloadValidators()
+
+
+class ChunkReader(io.RawIOBase):
+    """
+    A read-only, non-seekable file-like object that reads from an iterable
+    of ``bytes`` chunks, only pulling the next chunk when it is needed.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._pending = memoryview(b"")
 
+    def readable(self) -> bool:
+        return True
 
-def download_document(url: str) -> InMemoryUploadedFile:
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            try:
+                self._pending = memoryview(next(self._chunks))
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def stream_file_to_storage(
+    url: str,
+    storage: Storage,
+    name: str,
+    max_filesize: int,
+    max_filesize_setting_name: str,
+    *,
+    max_length: int | None = None,
+    validators: DownloadValidators | None = None,
+) -> StoredFileDetails:
+    """
+    Download the file at ``url`` and save it to ``storage`` as ``name`` (or
+    the nearest available alternative), passing the response body through
+    chunk by chunk, so that the file is never held in memory or on local disk.
+
+    The storage backend reads from a non-seekable ``File``, so backends that
+    support it (e.g. ``S3Storage`` from ``django-storages``) will upload the
+    file in parts as it arrives. The size and SHA-1 hash of the file are
+    calculated along the way, and returned with the final name.
+
+    As with ``download_file()``, ``validators`` can be provided to make the
+    request conditional.
+    """
+    filename = os.path.basename(url)
+    check_download_size(url, max_filesize, max_filesize_setting_name)
+    response = get_download_response(url, validators=validators)
+    hasher = hashlib.sha1(usedforsecurity=False)
+    size = 0
+
+    def chunks():
+        nonlocal size
+        for chunk in iter_download_chunks(
+            response, filename, max_filesize, max_filesize_setting_name
+        ):
+            hasher.update(chunk)
+            size += len(chunk)
+            yield chunk
+
+    try:
+        name = storage.get_available_name(name, max_length=max_length)
+        name_was_available = not storage.exists(name)
+        content = File(io.BufferedReader(ChunkReader(chunks())), name=name)
+        try:
+            name = storage.save(name, content, max_length=max_length)
+        except Exception:
+            # Remove anything that might have been written before the failure
+            if name_was_available and storage.exists(name):
+                storage.delete(name)
+            raise
+    finally:
+        response.close()
+
+    return StoredFileDetails(
+        name, size, hasher.hexdigest(), DownloadValidators.from_response(response)
+    )
+
+
+def download_document(
+    url: str, *, validators: DownloadValidators | None = None
+) -> UploadedFile:
     max_filesize_setting_name = "BYNDER_MAX_DOCUMENT_FILE_SIZE"
     max_filesize = getattr(settings, max_filesize_setting_name, 5242880)
-    return download_file(url, max_filesize, max_filesize_setting_name)
+    return download_file(
+        url, max_filesize, max_filesize_setting_name, validators=validators
+    )
 
 
-def download_image(url: str) -> InMemoryUploadedFile:
+def stream_document_to_storage(
+    url: str,
+    storage: Storage,
+    name: str,
+    *,
+    max_length: int | None = None,
+    validators: DownloadValidators | None = None,
+) -> StoredFileDetails:
+    max_filesize_setting_name = "BYNDER_MAX_DOCUMENT_FILE_SIZE"
+    max_filesize = getattr(settings, max_filesize_setting_name, 5242880)
+    return stream_file_to_storage(
+        url,
+        storage,
+        name,
+        max_filesize,
+        max_filesize_setting_name,
+        max_length=max_length,
+        validators=validators,
+    )
+
+
+def download_image(
+    url: str, *, validators: DownloadValidators | None = None
+) -> UploadedFile:
     max_filesize_setting_name = "BYNDER_MAX_IMAGE_FILE_SIZE"
     max_filesize = getattr(settings, max_filesize_setting_name, 5242880)
-    return download_file(url, max_filesize, max_filesize_setting_name)
+    return download_file(
+        url, max_filesize, max_filesize_setting_name, validators=validators
+    )
+
+
+# Pillow format names that Willow knows by another name
+PILLOW_FORMAT_NAMES = {
+    "mpo": "jpeg",
+    "heif": "heic",
+}
+
+
+@dataclass(frozen=True)
+class ImageProbeResult:
+    width: int
+    height: int
+    format_name: str
+
+
+def probe_image(url: str) -> ImageProbeResult | None:
+    """
+    Return the dimensions and format of the image at ``url``, read from the
+    first ``BYNDER_IMAGE_PROBE_SIZE`` bytes of the file (requested using a
+    ``Range`` request), so that the whole file doesn't need to be downloaded
+    and decoded to find them out.
+
+    Returns ``None`` if the details can't be established for any reason
+    (e.g. the request fails, or the image header is larger than the number
+    of bytes requested).
+    """
+    probe_size = int(getattr(settings, "BYNDER_IMAGE_PROBE_SIZE", 65536))
+    timeout = getattr(settings, "BYNDER_DOWNLOAD_TIMEOUT", 20)
+    try:
+        response = get_download_session().get(
+            url,
+            headers={"Range": f"bytes=0-{probe_size - 1}"},
+            timeout=timeout,
+            stream=True,
+        )
+    except requests.RequestException:
+        return None
+    try:
+        # Servers that don't support ranges return the whole file, so only
+        # ever read as much as was asked for
+        if response.status_code not in (HTTPStatus.OK, HTTPStatus.PARTIAL_CONTENT):
+            return None
+        data = bytearray()
+        for chunk in response.iter_content(chunk_size=8192):
+            data += chunk
+            if len(data) >= probe_size:
+                break
+    except requests.RequestException:
+        return None
+    finally:
+        response.close()
+
+    # Pillow only reads the image header when opening a file, so (unlike
+    # Willow) doesn't mind the rest of the file being missing
+    try:
+        with PILImage.open(BytesIO(data[:probe_size])) as image:
+            width, height = image.size
+            format_name = image.format.lower()
+    except (OSError, UnidentifiedImageError, PILImage.DecompressionBombError):
+        # Most likely, the header didn't fit within the data received
+        return None
+    return ImageProbeResult(
+        width, height, PILLOW_FORMAT_NAMES.get(format_name, format_name)
+    )
 
 
 def get_image_info(file: File) -> tuple[int, int, str, bool]:
@@ -103,11 +914,194 @@ def filename_from_url(url: str) -> str:
     return os.path.basename(url)
 
 
-def get_bynder_client() -> BynderClient:
-    return BynderClient(
-        domain=getattr(settings, "BYNDER_DOMAIN", ""),
+def get_bynder_client(budget: str = ratelimit.INTERACTIVE) -> BynderClient:
+    """
+    Return a ``BynderClient`` for talking to the Bynder API. Requests made
+    with its ``asset_bank_client`` count towards the named rate limit
+    ``budget`` (see ``wagtail_bynder.ratelimit``): ``ratelimit.INTERACTIVE``
+    for requests that editors are waiting for, or ``ratelimit.BACKGROUND``
+    for everything else.
+
+    Clients are created on first use, and then reused (along with their
+    pooled connections to the API) for the same domain, token and budget.
+    By default, a client is shared by all threads in the process. If the
+    ``BYNDER_CLIENT_SCOPE`` setting is ``"thread"``, each thread gets its own
+    client instead.
+    """
+    key = (
+        getattr(settings, "BYNDER_DOMAIN", ""),
+        getattr(settings, "BYNDER_API_TOKEN", ""),
+        budget,
+    )
+    if getattr(settings, "BYNDER_CLIENT_SCOPE", "process") == "thread":
+        local = _THREAD_BYNDER_CLIENTS
+        if getattr(local, "generation", None) != _BYNDER_CLIENTS_GENERATION:
+            local.clients = {}
+            local.generation = _BYNDER_CLIENTS_GENERATION
+        clients = local.clients
+        if key not in clients:
+            clients[key] = create_bynder_client(budget)
+        return clients[key]
+
+    try:
+        return _BYNDER_CLIENTS[key]
+    except KeyError:
+        pass
+    with _BYNDER_CLIENTS_LOCK:
+        if key not in _BYNDER_CLIENTS:
+            _BYNDER_CLIENTS[key] = create_bynder_client(budget)
+        return _BYNDER_CLIENTS[key]
+
+
+def create_bynder_client(budget: str = ratelimit.INTERACTIVE) -> BynderClient:
+    """
+    Return a new ``BynderClient``, with a connection pool sized according to
+    the ``BYNDER_API_POOL_SIZE`` setting, and requests made with its
+    ``asset_bank_client`` counting towards the named rate limit ``budget``
+    (and guarded by the circuit breaker, if one is configured).
+
+    The ``asset_bank_client`` also has an ``iter_media_list()`` method, for
+    parsing the results of ``media_list()`` as they arrive.
+    """
+    domain = getattr(settings, "BYNDER_DOMAIN", "")
+    client = BynderClient(
+        domain=domain,
         permanent_token=getattr(settings, "BYNDER_API_TOKEN", ""),
     )
+    session = getattr(client, "session", None)
+    if isinstance(session, requests.Session):
+        pool_size = int(getattr(settings, "BYNDER_API_POOL_SIZE", 10))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.hooks["response"].append(usage.record_api_response)
+        client.asset_bank_client = streaming.StreamingAssetBankClient(
+            client.asset_bank_client, session, domain
+        )
+    client.asset_bank_client = usage.UsageTrackingClient(client.asset_bank_client)
+    limiter = ratelimit.get_rate_limiter(budget)
+    if limiter is not None:
+        client.asset_bank_client = ratelimit.RateLimitedClient(
+            client.asset_bank_client, limiter
+        )
+    breaker = circuitbreaker.get_circuit_breaker()
+    if breaker is not None:
+        # Fail fast while Bynder is unavailable, rather than waiting on the
+        # rate limit only to make a request that's likely to fail
+        client.asset_bank_client = circuitbreaker.CircuitBreakerClient(
+            client.asset_bank_client, breaker
+        )
+    return client
+
+
+def warm_up_bynder_client(budget: str = ratelimit.INTERACTIVE) -> None:
+    """
+    Create the ``BynderClient`` for ``budget`` (see ``get_bynder_client()``)
+    and make a single, lightweight request to the Bynder API with it, so
+    that a connection is already open when it is first needed. Intended to
+    be called when a worker process starts (e.g. from ``wsgi.py``, or a
+    Gunicorn ``post_fork`` hook). Errors are logged rather than raised.
+    """
+    try:
+        get_bynder_client(budget).asset_bank_client.brands()
+    except Exception:
+        logger.warning("Failed to warm up the Bynder API client", exc_info=True)
+
+
+@receiver(setting_changed)
+def reset_bynder_clients(*, setting: str, **kwargs) -> None:
+    global _BYNDER_CLIENTS_GENERATION
+    if setting.startswith("BYNDER_"):
+        with _BYNDER_CLIENTS_LOCK:
+            _BYNDER_CLIENTS.clear()
+            # Have clients held by individual threads replaced too
+            _BYNDER_CLIENTS_GENERATION += 1
+
+
+def get_asset_data(
+    asset_id: str, *, client: Any = None, refresh: bool = False
+) -> dict[str, Any]:
+    """
+    Return the full details of the Bynder asset with ID ``asset_id``, as
+    returned by ``media_info()`` on ``client`` (an ``asset_bank_client``,
+    which defaults to that of ``get_bynder_client()``).
+
+    If the ``BYNDER_ASSET_DATA_CACHE_TIMEOUT`` setting is set, the data is
+    cached (in the cache named by ``BYNDER_ASSET_DATA_CACHE``) for that many
+    seconds, so that an asset chosen by several editors only has to be
+    fetched once. Use ``refresh=True`` to fetch the latest data regardless,
+    and replace anything that was cached.
+    """
+    if client is None:
+        client = get_bynder_client().asset_bank_client
+    timeout = get_asset_data_cache_timeout()
+    if not timeout:
+        return client.media_info(asset_id)
+
+    cache = get_asset_data_cache()
+    key = get_asset_data_cache_key(asset_id)
+    if not refresh:
+        data = cache.get(key)
+        if data is not None:
+            return data
+    data = client.media_info(asset_id)
+    cache.set(key, data, timeout)
+    return data
+
+
+def invalidate_stale_asset_data(assets: Iterable[dict[str, Any]]) -> None:
+    """
+    Remove cached data (see ``get_asset_data()``) for any of the supplied
+    ``assets`` (e.g. from ``media_list()``) with a different ``dateModified``
+    value to the one that was cached.
+    """
+    if not get_asset_data_cache_timeout():
+        return
+    cache = get_asset_data_cache()
+    date_modified = {
+        get_asset_data_cache_key(asset["id"]): asset.get("dateModified")
+        for asset in assets
+    }
+    if not date_modified:
+        return
+    stale_keys = [
+        key
+        for key, data in cache.get_many(date_modified).items()
+        if data.get("dateModified") != date_modified[key]
+    ]
+    if stale_keys:
+        cache.delete_many(stale_keys)
+
+
+def get_asset_data_cache_timeout() -> int | None:
+    timeout = getattr(settings, "BYNDER_ASSET_DATA_CACHE_TIMEOUT", None)
+    return int(timeout) if timeout else None
+
+
+def get_asset_data_cache():
+    return caches[getattr(settings, "BYNDER_ASSET_DATA_CACHE", "default")]
+
+
+def get_asset_data_cache_key(asset_id: str) -> str:
+    domain = getattr(settings, "BYNDER_DOMAIN", "")
+    return f"wagtail-bynder:asset-data:{domain}:{asset_id}"
+
+
+def get_import_lock(model: type, asset_id: str) -> CacheLock | None:
+    """
+    Return a ``CacheLock`` to hold while importing the Bynder asset with ID
+    ``asset_id`` as a ``model`` object, so that other processes and servers
+    can wait for the import to finish instead of repeating it. Returns
+    ``None`` if the ``BYNDER_IMPORT_LOCK_CACHE`` setting is not set.
+    """
+    cache_alias = getattr(settings, "BYNDER_IMPORT_LOCK_CACHE", None)
+    if not cache_alias:
+        return None
+    return CacheLock(
+        cache_alias,
+        f"wagtail-bynder:import-lock:{model._meta.label_lower}:{asset_id}",
+        timeout=getattr(settings, "BYNDER_IMPORT_LOCK_TIMEOUT", 120),
+    )
 
 
 def get_default_collection() -> Collection:
@@ -1,39 +1,144 @@
 import contextlib
+import logging
+import time
 
 from typing import TYPE_CHECKING, Any
 
 from django.conf import settings
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.shortcuts import redirect
 
+from wagtail_bynder import usage
+from wagtail_bynder.concurrency import SingleFlight
+from wagtail_bynder.exceptions import BynderUnavailable
 from wagtail_bynder.models import BynderAssetMixin
-from wagtail_bynder.utils import get_bynder_client
+from wagtail_bynder.utils import get_asset_data, get_bynder_client, get_import_lock
 
 
 if TYPE_CHECKING:
     from django.http import HttpRequest, HttpResponse
 
+    from wagtail_bynder.concurrency import CacheLock
+
+
+logger = logging.getLogger("wagtail_bynder")
+
+# Shared by all views in the process, so that concurrent requests to choose
+# the same asset share a single import
+_ASSET_IMPORTS = SingleFlight()
+
 
 class BynderAssetCopyMixin:
     model = type[BynderAssetMixin]
+    # How often to check whether an import in another process has finished
+    import_lock_poll_interval: float = 0.25
 
     def setup(self, *args, **kwargs):
         super().setup(*args, **kwargs)
         bynder_client = get_bynder_client()
         self.asset_client = bynder_client.asset_bank_client
 
+    def dispatch(self, *args, **kwargs):
+        # Have requests made to Bynder counted against the chooser
+        with usage.use_caller(usage.CHOOSER):
+            return super().dispatch(*args, **kwargs)
+
     def build_object_from_data(self, asset_data: dict[str, Any]) -> BynderAssetMixin:
         obj = self.model(bynder_id=asset_data["id"])
         obj.update_from_asset_data(asset_data)
         return obj
 
     def create_object(self, asset_id: str) -> BynderAssetMixin:
-        data = self.asset_client.media_info(asset_id)
+        """
+        Create and return an object for the Bynder asset with ID ``asset_id``.
+
+        If another request in the same process is already importing the same
+        asset, this waits for that import to finish and returns a fresh copy
+        of its object from the database (or raises a copy of its exception),
+        instead of fetching and saving everything a second time. Imports in
+        other processes are waited for in the same way if
+        ``BYNDER_IMPORT_LOCK_CACHE`` is set (see ``import_object()``).
+        """
+        obj, shared = _ASSET_IMPORTS.do_shared(
+            (self.model._meta.label, asset_id), self.import_object, asset_id
+        )
+        if not shared:
+            return obj
+        # The other request is still using the object, so must not share it
+        try:
+            return self.model.objects.get(pk=obj.pk)
+        except self.model.DoesNotExist:
+            # The other request's transaction hasn't been committed (or has
+            # been rolled back), so import the asset as if it hadn't started
+            return self.import_object(asset_id)
+
+    def import_object(self, asset_id: str) -> BynderAssetMixin:
+        """
+        Import the Bynder asset with ID ``asset_id`` (see ``copy_object()``),
+        while holding the import lock for it (if ``BYNDER_IMPORT_LOCK_CACHE``
+        is set). If the lock is held by another process, this waits for the
+        object created by that process instead.
+        """
+        lock = get_import_lock(self.model, asset_id)
+        if lock is None:
+            return self.copy_object(asset_id)
+
+        existing = self.wait_for_import(lock, asset_id)
+        if existing is not None:
+            return existing
+        try:
+            obj = self.copy_object(asset_id)
+        except BaseException:
+            lock.release()
+            raise
+        if not transaction.get_connection().in_atomic_block:
+            # The new object has been committed already
+            lock.release()
+        else:
+            # Keep others waiting until the new object is visible to them.
+            # There is no equivalent hook for rollbacks, so if the transaction
+            # is rolled back, the lock is left to expire instead
+            transaction.on_commit(lock.release)
+        return obj
+
+    def wait_for_import(
+        self, lock: "CacheLock", asset_id: str
+    ) -> BynderAssetMixin | None:
+        """
+        Wait until either ``lock`` can be acquired (returning ``None``), or an
+        object for ``asset_id`` has been created by whoever holds it
+        (returning that object). If neither has happened within the lock's
+        timeout, a warning is logged, and ``None`` is returned without the
+        lock being held.
+        """
+        deadline = time.monotonic() + lock.timeout
+        while not lock.acquire():
+            try:
+                return self.model.objects.get(bynder_id=asset_id)
+            except self.model.DoesNotExist:
+                pass
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(self.import_lock_poll_interval)
+        else:
+            return None
+        # One last try, in case the lock was released while checking
+        if not lock.acquire():
+            logger.warning(
+                "Gave up waiting %ss for another process to import Bynder asset "
+                "'%s', so it will be imported without holding the import lock.",
+                lock.timeout,
+                asset_id,
+            )
+        return None
+
+    def copy_object(self, asset_id: str) -> BynderAssetMixin:
+        data = get_asset_data(asset_id, client=self.asset_client)
         obj = self.build_object_from_data(data)
         try:
             # If the asset finished saving in a different thread during the download/update process,
             # return the pre-existing object
-            return self.model.objects.get(bynder_id=asset_id)
+            pre_existing = self.model.objects.get(bynder_id=asset_id)
         except self.model.DoesNotExist:
             try:
                 # Save the new object, triggering transfer of the file to media storage
@@ -50,13 +155,30 @@ class BynderAssetCopyMixin:
                 else:
                     # If the newly-downloaded file was successfully copied to storage, delete it
                     with contextlib.suppress(ValueError, FileNotFoundError):
-                        if obj.file.path != pre_existing.file.path:
+                        if (
+                            obj.file.path != pre_existing.file.path
+                            and not obj.file_is_shared()
+                        ):
                             obj.file.delete()
                 return pre_existing
+        else:
+            # Files streamed directly to storage will have been saved already,
+            # so must be deleted
+            file = getattr(obj, "file", None)
+            if file and file._committed and not obj.file_is_shared():
+                file.delete(save=False)
+            return pre_existing
         return obj
 
     def update_object(self, asset_id: str, obj: BynderAssetMixin) -> BynderAssetMixin:
-        data = self.asset_client.media_info(asset_id)
+        try:
+            data = get_asset_data(asset_id, client=self.asset_client)
+        except BynderUnavailable:
+            # Better to use the object as it is than not at all
+            logger.warning(
+                "Bynder is unavailable, so %r was not updated before use.", obj
+            )
+            return obj
         if not obj.is_up_to_date(data):
             obj.update_from_asset_data(data)
             obj.save()
@@ -2,15 +2,19 @@ from unittest import mock
 
 import responses
 
+from django.core.cache import caches
 from django.db import IntegrityError
 from django.http import HttpRequest
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils.functional import cached_property
 from django.views.generic.base import View
 from testapp.factories import CustomImageFactory
 from testapp.models import CustomImage
 from wagtail_factories import ImageFactory
 
+from wagtail_bynder.concurrency import CacheLock
+from wagtail_bynder.exceptions import BynderUnavailable
+from wagtail_bynder.utils import get_import_lock
 from wagtail_bynder.views.mixins import BynderAssetCopyMixin
 
 from .utils import TEST_ASSET_ID, get_test_asset_data
@@ -70,6 +74,37 @@ class BynderAssetCopyMixinTests(TestCase):
         save_mock.assert_called_once()
         self.assertEqual(obj.bynder_id, TEST_ASSET_ID)
 
+    def test_create_object_when_sharing_import(self):
+        # Another request imported the asset, so a copy of its object should
+        # be returned, rather than the same instance
+        imported = CustomImageFactory(bynder_id=TEST_ASSET_ID)
+        with mock.patch(
+            "wagtail_bynder.views.mixins._ASSET_IMPORTS.do_shared",
+            return_value=(imported, True),
+        ):
+            obj = self.view.create_object(TEST_ASSET_ID)
+
+        self.assertEqual(obj, imported)
+        self.assertIsNot(obj, imported)
+
+    def test_create_object_when_shared_import_not_visible(self):
+        # The other request's object hasn't been committed
+        imported = CustomImageFactory.build(bynder_id=TEST_ASSET_ID, pk=999)
+        created = CustomImageFactory.build(bynder_id=TEST_ASSET_ID)
+        with (
+            mock.patch(
+                "wagtail_bynder.views.mixins._ASSET_IMPORTS.do_shared",
+                return_value=(imported, True),
+            ),
+            mock.patch.object(
+                self.view, "import_object", return_value=created
+            ) as import_object_mock,
+        ):
+            obj = self.view.create_object(TEST_ASSET_ID)
+
+        import_object_mock.assert_called_once_with(TEST_ASSET_ID)
+        self.assertIs(obj, created)
+
     @responses.activate
     def test_update_object_when_object_is_up_to_date(self):
         # Create an object that matches the asset ID being used
@@ -134,6 +169,48 @@ class BynderAssetCopyMixinTests(TestCase):
         update_from_asset_data_mock.assert_called_once_with(TEST_ASSET_DATA)
         self.assertEqual(result, existing)
 
+    @responses.activate
+    def test_create_object_clash_handling_after_file_streamed_to_storage(self):
+        # Create an image with a matching bynder_id
+        existing = CustomImageFactory.create(bynder_id=TEST_ASSET_ID)
+
+        # Files streamed to storage are saved before the object is
+        fake_obj = mock.MagicMock()
+        fake_obj.file._committed = True
+        fake_obj.file_is_shared.return_value = False
+
+        with mock.patch.object(
+            self.view,
+            "build_object_from_data",
+            return_value=fake_obj,
+        ):
+            result = self.view.create_object(TEST_ASSET_ID)
+
+        # The redundant copy of the file should have been deleted
+        self.assertEqual(result, existing)
+        fake_obj.file.delete.assert_called_once_with(save=False)
+        fake_obj.save.assert_not_called()
+
+    @responses.activate
+    def test_create_object_clash_handling_with_shared_file(self):
+        existing = CustomImageFactory.create(bynder_id=TEST_ASSET_ID)
+
+        # The object was given a file belonging to another object
+        fake_obj = mock.MagicMock()
+        fake_obj.file._committed = True
+        fake_obj.file_is_shared.return_value = True
+
+        with mock.patch.object(
+            self.view,
+            "build_object_from_data",
+            return_value=fake_obj,
+        ):
+            result = self.view.create_object(TEST_ASSET_ID)
+
+        # The file is still in use, so should not have been deleted
+        self.assertEqual(result, existing)
+        fake_obj.file.delete.assert_not_called()
+
     @responses.activate
     def test_create_object_clash_handling_on_save(self):
         def create_dupe_and_throw_integrity_error():
@@ -189,3 +266,150 @@ class BynderAssetCopyMixinTests(TestCase):
             # With no 'bynder_id' match to be found, the error is allowed
             # to bubble up
             self.view.create_object(TEST_ASSET_ID)
+
+    def test_update_object_when_bynder_unavailable(self):
+        obj = CustomImageFactory.create(bynder_id=TEST_ASSET_ID)
+        self.view.asset_client = mock.Mock()
+        self.view.asset_client.media_info.side_effect = BynderUnavailable()
+
+        with (
+            mock.patch.object(obj, "update_from_asset_data") as update_mock,
+            self.assertLogs("wagtail_bynder", level="WARNING"),
+        ):
+            result = self.view.update_object(TEST_ASSET_ID, obj)
+
+        # The object is used as it is
+        self.assertEqual(result, obj)
+        update_mock.assert_not_called()
+
+
+@override_settings(
+    BYNDER_IMPORT_LOCK_CACHE="default",
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "wagtail-bynder-import-lock-tests",
+        }
+    },
+)
+class BynderAssetCopyMixinImportLockTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(caches["default"].clear)
+
+        class TestViewClass(BynderAssetCopyMixin, View):
+            model = CustomImage
+            import_lock_poll_interval = 0.01
+
+        request = HttpRequest()
+        request.method = ""
+        request.path = "/"
+        self.view = TestViewClass()
+        self.view.setup(request)
+
+    def test_import_holds_lock_until_commit(self):
+        created = CustomImageFactory.build(bynder_id=TEST_ASSET_ID)
+        with (
+            mock.patch.object(
+                self.view, "copy_object", return_value=created
+            ) as copy_object_mock,
+            self.captureOnCommitCallbacks() as callbacks,
+        ):
+            result = self.view.create_object(TEST_ASSET_ID)
+            # Other processes can't start importing the same asset
+            self.assertFalse(get_import_lock(CustomImage, TEST_ASSET_ID).acquire())
+
+        self.assertEqual(result, created)
+        copy_object_mock.assert_called_once_with(TEST_ASSET_ID)
+
+        # The lock is released once the new object is committed
+        for callback in callbacks:
+            callback()
+        self.assertTrue(get_import_lock(CustomImage, TEST_ASSET_ID).acquire())
+
+    def test_lock_released_straight_away_outside_transaction(self):
+        created = CustomImageFactory.build(bynder_id=TEST_ASSET_ID)
+        with (
+            mock.patch.object(self.view, "copy_object", return_value=created),
+            mock.patch(
+                "wagtail_bynder.views.mixins.transaction.get_connection",
+                return_value=mock.Mock(in_atomic_block=False),
+            ),
+            self.captureOnCommitCallbacks() as callbacks,
+        ):
+            self.view.create_object(TEST_ASSET_ID)
+
+        self.assertEqual(callbacks, [])
+        self.assertTrue(get_import_lock(CustomImage, TEST_ASSET_ID).acquire())
+
+    def test_lock_released_if_import_fails(self):
+        with (
+            mock.patch.object(self.view, "copy_object", side_effect=ValueError),
+            self.assertRaises(ValueError),
+        ):
+            self.view.create_object(TEST_ASSET_ID)
+
+        self.assertTrue(get_import_lock(CustomImage, TEST_ASSET_ID).acquire())
+
+    def test_waits_for_import_in_another_process(self):
+        # Another process holds the lock, and finishes the import while
+        # this one is waiting
+        self.assertTrue(get_import_lock(CustomImage, TEST_ASSET_ID).acquire())
+        existing = None
+
+        def finish_import(seconds):
+            nonlocal existing
+            existing = CustomImageFactory.create(bynder_id=TEST_ASSET_ID)
+
+        with (
+            mock.patch("wagtail_bynder.views.mixins.time.sleep", finish_import),
+            mock.patch.object(self.view, "copy_object") as copy_object_mock,
+        ):
+            result = self.view.create_object(TEST_ASSET_ID)
+
+        copy_object_mock.assert_not_called()
+        self.assertEqual(result, existing)
+
+    @override_settings(BYNDER_IMPORT_LOCK_TIMEOUT=0)
+    def test_imports_anyway_after_timeout(self):
+        # Another process holds the lock, but doesn't finish in time
+        lock_key = get_import_lock(CustomImage, TEST_ASSET_ID).key
+        self.assertTrue(CacheLock("default", lock_key, timeout=60).acquire())
+        created = CustomImageFactory.build(bynder_id=TEST_ASSET_ID)
+
+        with (
+            mock.patch.object(
+                self.view, "copy_object", return_value=created
+            ) as copy_object_mock,
+            self.assertLogs("wagtail_bynder", level="WARNING") as logs,
+        ):
+            result = self.view.create_object(TEST_ASSET_ID)
+
+        copy_object_mock.assert_called_once_with(TEST_ASSET_ID)
+        self.assertEqual(result, created)
+        self.assertIn("without holding the import lock", logs.output[0])
+
+    @override_settings(BYNDER_IMPORT_LOCK_TIMEOUT=0)
+    def test_lock_acquired_after_timeout(self):
+        # The other process finishes (without creating an object) just as
+        # the timeout is reached
+        lock = get_import_lock(CustomImage, TEST_ASSET_ID)
+        created = CustomImageFactory.build(bynder_id=TEST_ASSET_ID)
+
+        with (
+            mock.patch.object(
+                lock, "acquire", side_effect=[False, True]
+            ) as acquire_mock,
+            mock.patch(
+                "wagtail_bynder.views.mixins.get_import_lock", return_value=lock
+            ),
+            mock.patch.object(self.view, "copy_object", return_value=created),
+            mock.patch.object(lock, "release") as release_mock,
+            self.assertNoLogs("wagtail_bynder", level="WARNING"),
+        ):
+            result = self.view.create_object(TEST_ASSET_ID)
+
+        self.assertEqual(acquire_mock.call_count, 2)
+        self.assertEqual(result, created)
+        # The lock is held until the new object is committed
+        release_mock.assert_not_called()
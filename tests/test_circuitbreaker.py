@@ -0,0 +1,144 @@
+from unittest import mock
+
+import requests
+
+from django.test import SimpleTestCase, override_settings
+from freezegun import freeze_time
+
+from wagtail_bynder import circuitbreaker
+from wagtail_bynder.exceptions import BynderUnavailable
+
+
+def get_http_error(status_code: int) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(response=response)
+
+
+class IsFailureTests(SimpleTestCase):
+    def test_is_failure(self):
+        self.assertTrue(circuitbreaker.is_failure(requests.ConnectionError()))
+        self.assertTrue(circuitbreaker.is_failure(requests.Timeout()))
+        self.assertTrue(
+            circuitbreaker.is_failure(requests.exceptions.ChunkedEncodingError())
+        )
+        self.assertTrue(circuitbreaker.is_failure(get_http_error(503)))
+        # Errors caused by the request itself don't count
+        self.assertFalse(circuitbreaker.is_failure(get_http_error(404)))
+        self.assertFalse(circuitbreaker.is_failure(ValueError()))
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def make_failed_call(self, breaker):
+        with self.assertRaises(requests.ConnectionError):
+            breaker.call(mock.Mock(side_effect=requests.ConnectionError()))
+
+    def test_opens_after_repeated_failures(self):
+        with freeze_time("2024-01-01 12:00:00"):
+            breaker = circuitbreaker.CircuitBreaker(3, 30)
+            func = mock.Mock(return_value="data")
+
+            self.make_failed_call(breaker)
+            self.make_failed_call(breaker)
+            self.assertEqual(breaker.call(func), "data")
+            # A success resets the count
+            self.make_failed_call(breaker)
+            self.make_failed_call(breaker)
+            self.assertEqual(breaker.state, circuitbreaker.CLOSED)
+            self.make_failed_call(breaker)
+            self.assertEqual(breaker.state, circuitbreaker.OPEN)
+
+            # Calls now fail fast
+            func.reset_mock()
+            with self.assertRaises(BynderUnavailable):
+                breaker.call(func)
+            func.assert_not_called()
+
+    def test_other_errors_do_not_count(self):
+        breaker = circuitbreaker.CircuitBreaker(1, 30)
+        with self.assertRaises(requests.HTTPError):
+            breaker.call(mock.Mock(side_effect=get_http_error(404)))
+        self.assertEqual(breaker.state, circuitbreaker.CLOSED)
+
+    def test_recovery(self):
+        with freeze_time("2024-01-01 12:00:00") as frozen_time:
+            breaker = circuitbreaker.CircuitBreaker(1, 30)
+            self.make_failed_call(breaker)
+
+            # After the recovery timeout, a failed request reopens the breaker
+            frozen_time.tick(30)
+            self.make_failed_call(breaker)
+            with self.assertRaises(BynderUnavailable):
+                breaker.call(mock.Mock())
+
+            # A successful one closes it
+            frozen_time.tick(30)
+            self.assertEqual(breaker.call(mock.Mock(return_value="data")), "data")
+            self.assertEqual(breaker.state, circuitbreaker.CLOSED)
+
+    def test_single_probe_while_half_open(self):
+        with freeze_time("2024-01-01 12:00:00") as frozen_time:
+            breaker = circuitbreaker.CircuitBreaker(1, 30)
+            self.make_failed_call(breaker)
+            frozen_time.tick(30)
+
+            def probe():
+                # Other requests made while checking for recovery fail fast
+                with self.assertRaises(BynderUnavailable):
+                    breaker.call(mock.Mock())
+                return "data"
+
+            self.assertEqual(breaker.call(probe), "data")
+
+
+class GetCircuitBreakerTests(SimpleTestCase):
+    @override_settings(
+        BYNDER_CIRCUIT_BREAKER_THRESHOLD=5,
+        BYNDER_CIRCUIT_BREAKER_RECOVERY_TIMEOUT=60,
+    )
+    def test_shared_breaker(self):
+        breaker = circuitbreaker.get_circuit_breaker()
+        self.assertIs(circuitbreaker.get_circuit_breaker(), breaker)
+        self.assertEqual(breaker.failure_threshold, 5)
+        self.assertEqual(breaker.recovery_timeout, 60)
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(circuitbreaker.get_circuit_breaker())
+
+
+class CircuitBreakerClientTests(SimpleTestCase):
+    def test_method_calls_are_guarded(self):
+        client = mock.Mock()
+        client.media_info.return_value = {"id": "1"}
+        breaker = circuitbreaker.CircuitBreaker(1, 30)
+        guarded_client = circuitbreaker.CircuitBreakerClient(client, breaker)
+
+        self.assertEqual(guarded_client.media_info("1"), {"id": "1"})
+
+        client.media_list.side_effect = requests.Timeout()
+        with self.assertRaises(requests.Timeout):
+            guarded_client.media_list({})
+        with self.assertRaises(BynderUnavailable):
+            guarded_client.media_info("1")
+        client.media_info.assert_called_once_with("1")
+
+    def test_errors_while_streaming_are_failures(self):
+        def iter_media_list(query):
+            yield {"id": "1"}
+            raise requests.exceptions.ChunkedEncodingError("Connection lost")
+
+        client = mock.Mock()
+        client.iter_media_list = iter_media_list
+        breaker = circuitbreaker.CircuitBreaker(1, 30)
+        guarded_client = circuitbreaker.CircuitBreakerClient(client, breaker)
+
+        assets = guarded_client.iter_media_list({})
+        # Getting the response succeeded
+        self.assertEqual(breaker.state, circuitbreaker.CLOSED)
+        self.assertEqual(next(assets), {"id": "1"})
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            next(assets)
+
+        self.assertEqual(breaker.state, circuitbreaker.OPEN)
+        with self.assertRaises(BynderUnavailable):
+            guarded_client.media_info("1")
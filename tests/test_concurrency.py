@@ -0,0 +1,423 @@
+import threading
+import time
+
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from freezegun import freeze_time
+
+from wagtail_bynder.concurrency import (
+    AdaptiveConcurrencyLimit,
+    CacheLock,
+    SingleFlight,
+    TaskRunner,
+    iter_in_background,
+)
+
+
+class TaskRunnerTests(SimpleTestCase):
+    def test_results_for_all_items(self):
+        def double(item):
+            if item == 3:
+                raise ValueError("Bad item")
+            return item * 2
+
+        results = list(TaskRunner(double, max_concurrency=4).imap_unordered(range(10)))
+
+        self.assertEqual(sorted(result.item for result in results), list(range(10)))
+        for result in results:
+            if result.item == 3:
+                # Errors are captured, rather than raised
+                self.assertIsInstance(result.error, ValueError)
+                with self.assertRaises(ValueError):
+                    result.get()
+            else:
+                self.assertEqual(result.get(), result.item * 2)
+
+    def test_runs_concurrently(self):
+        # Each call waits for all four calls to have started, so this
+        # would time out if they were made one at a time
+        barrier = threading.Barrier(4, timeout=5)
+
+        def wait(item):
+            barrier.wait()
+            return threading.current_thread()
+
+        results = list(TaskRunner(wait, max_concurrency=4).imap_unordered(range(4)))
+
+        self.assertEqual(len(results), 4)
+        for result in results:
+            self.assertIsNot(result.get(), threading.current_thread())
+
+    def test_runs_one_at_a_time_without_concurrency(self):
+        results = list(
+            TaskRunner(
+                lambda item: threading.current_thread(), max_concurrency=1
+            ).imap_unordered(range(3))
+        )
+
+        self.assertEqual([result.item for result in results], [0, 1, 2])
+        self.assertEqual(len({result.get() for result in results}), 1)
+
+
+class OverloadedError(Exception):
+    pass
+
+
+def get_retry_delay(error):
+    if isinstance(error, OverloadedError):
+        return 0
+    return None
+
+
+class AdaptiveConcurrencyLimitTests(SimpleTestCase):
+    def test_additive_increase(self):
+        limit = AdaptiveConcurrencyLimit(3)
+        self.assertEqual(limit.current, 1)
+        limit.record_success(0.1)
+        self.assertEqual(limit.current, 2)
+        # It takes a round of calls to add one more
+        limit.record_success(0.1)
+        limit.record_success(0.1)
+        self.assertEqual(limit.current, 2)
+        limit.record_success(0.1)
+        self.assertEqual(limit.current, 3)
+        # But never more than the maximum
+        for _ in range(10):
+            limit.record_success(0.1)
+        self.assertEqual(limit.current, 3)
+
+    def test_multiplicative_decrease_on_overload(self):
+        with freeze_time("2024-01-01 12:00:00") as frozen_time:
+            limit = AdaptiveConcurrencyLimit(16)
+            limit.limit = 16.0
+            limit.record_success(1)
+
+            limit.record_overload()
+            self.assertEqual(limit.current, 8)
+            # Calls that were already in flight don't reduce it further
+            limit.record_overload()
+            self.assertEqual(limit.current, 8)
+
+            frozen_time.tick(1)
+            limit.record_overload()
+            self.assertEqual(limit.current, 4)
+
+    def test_multiplicative_decrease_on_rising_latency(self):
+        limit = AdaptiveConcurrencyLimit(16)
+        limit.limit = 16.0
+        limit.record_success(0.1)
+        # Calls are now taking far longer than they were
+        for _ in range(5):
+            limit.record_success(2.0)
+        self.assertLess(limit.current, 16)
+
+    def test_runner_retries_overloaded_calls(self):
+        limit = AdaptiveConcurrencyLimit(4, get_retry_delay=get_retry_delay)
+        limit.limit = 4.0
+        attempts = []
+
+        def func(item):
+            attempts.append(item)
+            if attempts.count(item) == 1:
+                raise OverloadedError
+            return item * 2
+
+        results = list(
+            TaskRunner(func, max_concurrency=4, limit=limit).imap_unordered([1])
+        )
+
+        self.assertEqual(results[0].get(), 2)
+        self.assertEqual(attempts, [1, 1])
+        self.assertEqual(limit.current, 2)
+
+    def test_runner_gives_up_after_max_retries(self):
+        limit = AdaptiveConcurrencyLimit(
+            4, max_retries=2, get_retry_delay=get_retry_delay
+        )
+        func = mock.Mock(side_effect=OverloadedError)
+
+        results = list(
+            TaskRunner(func, max_concurrency=4, limit=limit).imap_unordered([1])
+        )
+
+        self.assertIsInstance(results[0].error, OverloadedError)
+        self.assertEqual(func.call_count, 3)
+
+    def test_runner_respects_limit(self):
+        limit = AdaptiveConcurrencyLimit(4)
+        in_flight = []
+        max_in_flight = 0
+        lock = threading.Lock()
+
+        def func(item):
+            nonlocal max_in_flight
+            with lock:
+                in_flight.append(item)
+                max_in_flight = max(max_in_flight, len(in_flight))
+            time.sleep(0.01)
+            with lock:
+                in_flight.remove(item)
+
+        # Freeze the limit at its starting value
+        with mock.patch.object(limit, "record_success"):
+            list(
+                TaskRunner(func, max_concurrency=4, limit=limit).imap_unordered(
+                    range(8)
+                )
+            )
+
+        self.assertEqual(max_in_flight, 1)
+
+
+class TaskRunnerOrderedTests(SimpleTestCase):
+    def test_results_are_in_order(self):
+        def func(item):
+            # Have later items finish first
+            time.sleep((5 - item) * 0.01)
+            return item * 2
+
+        self.assertEqual(
+            list(TaskRunner(func, max_concurrency=3).imap(range(6))),
+            [0, 2, 4, 6, 8, 10],
+        )
+
+    def test_runs_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def func(item):
+            barrier.wait()
+            return threading.current_thread()
+
+        results = list(TaskRunner(func, max_concurrency=3).imap(range(3)))
+
+        self.assertEqual(len(set(results)), 3)
+        self.assertNotIn(threading.current_thread(), results)
+
+    def test_exceptions_are_raised(self):
+        def func(item):
+            if item == 1:
+                raise ValueError("Bad item")
+            return item
+
+        results = TaskRunner(func, max_concurrency=2).imap(range(3))
+
+        self.assertEqual(next(results), 0)
+        with self.assertRaises(ValueError):
+            next(results)
+
+    def test_database_connections_are_closed_once_per_worker(self):
+        # Make sure that both workers are used
+        barrier = threading.Barrier(2, timeout=5)
+
+        def func(item):
+            if item < 2:
+                barrier.wait()
+            return item
+
+        closed_by = []
+        with mock.patch("wagtail_bynder.concurrency.connections") as connections_mock:
+            connections_mock.close_all.side_effect = lambda: closed_by.append(
+                threading.current_thread()
+            )
+            results = list(TaskRunner(func, max_concurrency=2).imap(range(6)))
+
+        self.assertEqual(results, list(range(6)))
+        # Each worker closes its own connections, once all items are done
+        self.assertEqual(len(closed_by), 2)
+        self.assertEqual(len(set(closed_by)), 2)
+        self.assertNotIn(threading.current_thread(), closed_by)
+
+
+class IterInBackgroundTests(SimpleTestCase):
+    def test_items_are_yielded_in_order(self):
+        threads = set()
+
+        def items():
+            for item in range(5):
+                threads.add(threading.current_thread())
+                yield item
+
+        self.assertEqual(
+            list(iter_in_background(items(), buffer_size=2)), [0, 1, 2, 3, 4]
+        )
+        self.assertEqual(len(threads), 1)
+        self.assertNotIn(threading.current_thread(), threads)
+
+    def test_buffer_is_bounded(self):
+        produced = []
+
+        def items():
+            try:
+                for item in range(10):
+                    produced.append(item)
+                    yield item
+            finally:
+                produced.append("closed")
+
+        results = iter_in_background(items(), buffer_size=2)
+        self.assertEqual(next(results), 0)
+        # Give the background thread time to fill the buffer
+        time.sleep(0.3)
+        # Two items are waiting in the buffer, with one more ready to add
+        self.assertEqual(produced, [0, 1, 2, 3])
+
+        # Stopping early closes the generator
+        results.close()
+        self.assertEqual(produced, [0, 1, 2, 3, "closed"])
+
+    def test_exceptions_are_raised(self):
+        def items():
+            yield 1
+            raise ValueError("Request failed")
+
+        results = iter_in_background(items(), buffer_size=2)
+
+        self.assertEqual(next(results), 1)
+        with self.assertRaisesMessage(ValueError, "Request failed"):
+            next(results)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def call_concurrently(self, single_flight, func, count=4):
+        # All threads make their call at the same time
+        barrier = threading.Barrier(count, timeout=5)
+        results = []
+
+        def call():
+            barrier.wait()
+            try:
+                results.append(single_flight.do("key", func))
+            except ValueError as e:
+                results.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+        return results
+
+    def test_concurrent_calls_are_coalesced(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        def func():
+            calls.append(threading.current_thread())
+            # Give the other threads time to join this call
+            time.sleep(0.2)
+            return object()
+
+        results = self.call_concurrently(single_flight, func)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 4)
+        self.assertEqual(len({id(result) for result in results}), 1)
+        # The call is forgotten once finished
+        self.assertEqual(single_flight.calls, {})
+
+    def test_exceptions_are_shared(self):
+        single_flight = SingleFlight()
+        error = ValueError("Import failed")
+
+        def func():
+            time.sleep(0.2)
+            raise error
+
+        results = self.call_concurrently(single_flight, func)
+
+        self.assertEqual(len(results), 4)
+        for result in results:
+            self.assertIsInstance(result, ValueError)
+            self.assertEqual(result.args, ("Import failed",))
+        # Each waiting thread raises a copy of the error, caused by it
+        self.assertEqual(len({id(result) for result in results}), 4)
+        self.assertEqual(results.count(error), 1)
+        for result in results:
+            if result is not error:
+                self.assertIs(result.__cause__, error)
+        self.assertEqual(single_flight.calls, {})
+
+    def test_do_shared(self):
+        single_flight = SingleFlight()
+        shared = []
+
+        def call():
+            barrier.wait()
+            shared.append(single_flight.do_shared("key", func)[1])
+
+        def func():
+            time.sleep(0.2)
+            return 1
+
+        barrier = threading.Barrier(3, timeout=5)
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        # Only the thread that made the call has the result to itself
+        self.assertEqual(sorted(shared), [False, True, True])
+
+    def test_sequential_calls_are_not_coalesced(self):
+        single_flight = SingleFlight()
+        func = mock.Mock(side_effect=[1, 2])
+
+        self.assertEqual(single_flight.do("key", func), 1)
+        self.assertEqual(single_flight.do("key", func), 2)
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "wagtail-bynder-lock-tests",
+        }
+    }
+)
+class CacheLockTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(caches["default"].clear)
+
+    def test_acquire_and_release(self):
+        lock = CacheLock("default", "test-lock", timeout=60)
+        other_lock = CacheLock("default", "test-lock", timeout=60)
+
+        self.assertTrue(lock.acquire())
+        # The lock is shared by everything using the same key
+        self.assertFalse(other_lock.acquire())
+        # Only the holder can release it
+        other_lock.release()
+        self.assertFalse(other_lock.acquire())
+
+        lock.release()
+        self.assertTrue(other_lock.acquire())
+
+    def test_release_after_expiry(self):
+        lock = CacheLock("default", "test-lock", timeout=60)
+        other_lock = CacheLock("default", "test-lock", timeout=60)
+        self.assertTrue(lock.acquire())
+
+        # Simulate the lock expiring and being taken by someone else
+        caches["default"].delete("test-lock")
+        self.assertTrue(other_lock.acquire())
+
+        # Releasing the expired lock leaves the new holder's lock alone
+        lock.release()
+        self.assertFalse(CacheLock("default", "test-lock", timeout=60).acquire())
+
+    def test_lock_about_to_expire_is_left_to_expire(self):
+        with freeze_time("2024-01-01 12:00:00") as frozen_time:
+            lock = CacheLock("default", "test-lock", timeout=60)
+            self.assertTrue(lock.acquire())
+
+            frozen_time.tick(59.5)
+            # Releasing now could delete a lock taken just after this expires
+            lock.release()
+            self.assertFalse(CacheLock("default", "test-lock", timeout=60).acquire())
+
+            frozen_time.tick(1)
+            self.assertTrue(CacheLock("default", "test-lock", timeout=60).acquire())
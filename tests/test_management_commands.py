@@ -1,15 +1,20 @@
 import datetime
+import threading
+import time
 
 from io import StringIO
 from typing import Type
 from unittest import mock
 
 from django.core.management import call_command
-from django.test import SimpleTestCase, TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 from freezegun import freeze_time
 from requests import HTTPError, Response
+from requests.exceptions import ChunkedEncodingError
 from testapp.factories import CustomDocumentFactory, CustomImageFactory, VideoFactory
 
+from wagtail_bynder import usage
+from wagtail_bynder.concurrency import AdaptiveConcurrencyLimit, TaskRunner
 from wagtail_bynder.exceptions import BynderAssetDownloadError
 from wagtail_bynder.management.commands.refresh_bynder_documents import (
     Command as UpdateDocuments,
@@ -30,6 +35,7 @@ from wagtail_bynder.management.commands.update_stale_videos import (
     Command as UpdateStaleVideos,
 )
 from wagtail_bynder.models import BynderAssetMixin
+from wagtail_bynder.records import AssetRecord
 
 from .utils import TEST_ASSET_ID, get_test_asset_data
 
@@ -82,6 +88,16 @@ class SyncCommandTestsMixin:
         # Patch save() to prevent unnecessary database writes
         self.patched_obj.save = mock.Mock()
 
+    def get_expected_asset_data(self):
+        """
+        Return the asset data that objects should be updated with. Commands
+        that don't fetch data for individual assets use an ``AssetRecord``
+        of the data returned by 'media_list'.
+        """
+        if self.uses_media_info_for_individual_assets:
+            return TEST_ASSET_DATA
+        return AssetRecord(TEST_ASSET_DATA, None)
+
     def call_command(self, *args, **kwargs):
         """
         Calls the command with the provided arguments, whilst also also mocking
@@ -134,7 +150,7 @@ class SyncCommandTestsMixin:
         mocked_client.asset_bank_client.media_list.assert_called_once_with(
             {
                 "dateModified": expected_datemodified.strftime("%Y-%m-%dT%H:%M:%SZ"),
-                "orderBy": "dateModified desc",
+                "orderBy": "dateModified asc",
                 "page": 1,
                 "limit": self.command_class.page_size,
                 "type": self.asset_type,
@@ -148,7 +164,9 @@ class SyncCommandTestsMixin:
             )
 
         # Check the patched object was updated and saved as expected
-        model_instance.update_from_asset_data.assert_called_once_with(TEST_ASSET_DATA)
+        model_instance.update_from_asset_data.assert_called_once_with(
+            self.get_expected_asset_data()
+        )
         model_instance.save.assert_called_once()
 
     @freeze_time()
@@ -213,6 +231,379 @@ class SyncCommandTestsMixin:
             expected_timespan_description,
         )
 
+    def test_concurrency(self):
+        self.patched_obj.prepare_for_update = mock.Mock()
+        output = self.call_command(concurrency=4)
+
+        self.assertIn(f"Updating object for asset '{TEST_ASSET_ID}'", output)
+        # Files should have been fetched ahead of the update
+        expected_asset_data = self.get_expected_asset_data()
+        self.patched_obj.prepare_for_update.assert_called_once_with(expected_asset_data)
+        self.patched_obj.update_from_asset_data.assert_called_once_with(
+            expected_asset_data
+        )
+        self.patched_obj.save.assert_called_once()
+
+    def test_workers(self):
+        output = self.call_command(workers=2)
+
+        self.assertIn(f"Updating object for asset '{TEST_ASSET_ID}'", output)
+        self.assertIn("1 of 1 stale objects were updated for this batch.", output)
+        self.patched_obj.update_from_asset_data.assert_called_once_with(
+            self.get_expected_asset_data()
+        )
+        self.patched_obj.save.assert_called_once()
+
+    def test_workers_download_error(self):
+        self.patched_obj.update_from_asset_data.side_effect = BynderAssetDownloadError(
+            "Connection reset"
+        )
+        output = self.call_command(workers=2)
+
+        self.assertIn(f"ERROR: Failed to download asset '{TEST_ASSET_ID}'", output)
+        self.assertIn("0 of 1 stale objects were updated for this batch.", output)
+        self.patched_obj.save.assert_not_called()
+
+    def test_usage_summary(self):
+        self.mock_api_client.asset_bank_client = usage.UsageTrackingClient(
+            self.mock_api_client.asset_bank_client
+        )
+        output = self.call_command()
+
+        # Only requests made while the command was running are included
+        self.assertIn("Requests made to Bynder: ", output)
+        self.assertIn("  media_list: 1\n", output)
+
+    def test_adaptive_concurrency(self):
+        with mock.patch(
+            "wagtail_bynder.management.commands.base.TaskRunner",
+            wraps=TaskRunner,
+        ) as runner_class_mock:
+            output = self.call_command(concurrency=4, adaptive_concurrency=True)
+
+        self.assertIn(f"Updating object for asset '{TEST_ASSET_ID}'", output)
+        limit = runner_class_mock.call_args.kwargs["limit"]
+        self.assertIsInstance(limit, AdaptiveConcurrencyLimit)
+        self.assertEqual(limit.maximum, 4)
+        self.patched_obj.save.assert_called_once()
+
+
+class GetAssetsTests(SimpleTestCase):
+    """
+    Tests for the keyset pagination used by ``BaseBynderSyncCommand.get_assets()``
+    """
+
+    def get_command(self, pages):
+        command = UpdateStaleImages()
+        command.page_size = 2
+        command.date_modified_from = datetime.datetime(2024, 1, 1)
+        command.bynder_client = mock.Mock()
+        command.bynder_client.asset_bank_client.media_list.side_effect = pages
+        return command
+
+    def get_asset(self, id, date_modified):
+        return {"id": id, "dateModified": date_modified}
+
+    def test_pages_by_date_modified(self):
+        command = self.get_command(
+            [
+                [
+                    self.get_asset("1", "2024-01-02T00:00:00Z"),
+                    self.get_asset("2", "2024-01-03T00:00:00Z"),
+                ],
+                # The next page overlaps with the previous one
+                [
+                    self.get_asset("2", "2024-01-03T00:00:00Z"),
+                    self.get_asset("3", "2024-01-04T00:00:00Z"),
+                ],
+                [self.get_asset("4", "2024-01-05T00:00:00Z")],
+            ]
+        )
+
+        assets = list(command.get_assets())
+
+        # Each asset is yielded once
+        self.assertEqual([asset["id"] for asset in assets], ["1", "2", "3", "4"])
+        media_list = command.bynder_client.asset_bank_client.media_list
+        self.assertEqual(
+            [call.args[0]["dateModified"] for call in media_list.call_args_list],
+            ["2024-01-01T00:00:00Z", "2024-01-02T23:59:59Z", "2024-01-03T23:59:59Z"],
+        )
+        for call in media_list.call_args_list:
+            self.assertEqual(call.args[0]["orderBy"], "dateModified asc")
+            self.assertEqual(call.args[0]["page"], 1)
+
+    def test_empty_page_ends_pagination(self):
+        for empty_page in (None, []):
+            with self.subTest(empty_page=empty_page):
+                command = self.get_command(
+                    [
+                        [
+                            self.get_asset("1", "2024-01-02T00:00:00Z"),
+                            self.get_asset("2", "2024-01-03T00:00:00Z"),
+                        ],
+                        empty_page,
+                    ]
+                )
+
+                assets = list(command.get_assets())
+
+                self.assertEqual([asset["id"] for asset in assets], ["1", "2"])
+                media_list = command.bynder_client.asset_bank_client.media_list
+                self.assertEqual(media_list.call_count, 2)
+
+    def test_page_modified_within_same_second(self):
+        command = self.get_command(
+            [
+                [
+                    self.get_asset("1", "2024-01-01T00:00:00Z"),
+                    self.get_asset("2", "2024-01-01T00:00:00Z"),
+                ],
+                [
+                    self.get_asset("3", "2024-01-01T00:00:00Z"),
+                    self.get_asset("4", "2024-01-01T00:00:01Z"),
+                ],
+                [],
+            ]
+        )
+
+        assets = list(command.get_assets())
+
+        self.assertEqual([asset["id"] for asset in assets], ["1", "2", "3", "4"])
+        media_list = command.bynder_client.asset_bank_client.media_list
+        # Without a later date to start from, the next page of the same
+        # results is requested instead
+        self.assertEqual(media_list.call_args_list[1].args[0]["page"], 2)
+        self.assertEqual(
+            media_list.call_args_list[1].args[0]["dateModified"],
+            "2024-01-01T00:00:00Z",
+        )
+
+    def test_stream_pages(self):
+        command = self.get_command([])
+        command.stream_pages = True
+        client = command.bynder_client.asset_bank_client
+        client.iter_media_list.side_effect = [
+            iter(
+                [
+                    self.get_asset("1", "2024-01-02T00:00:00Z"),
+                    self.get_asset("2", "2024-01-03T00:00:00Z"),
+                ]
+            ),
+            iter([self.get_asset("3", "2024-01-04T00:00:00Z")]),
+        ]
+
+        assets = list(command.get_assets())
+
+        self.assertEqual([asset["id"] for asset in assets], ["1", "2", "3"])
+        self.assertEqual(client.iter_media_list.call_count, 2)
+        client.media_list.assert_not_called()
+
+    def test_stream_pages_interrupted(self):
+        def interrupted(*assets):
+            yield from assets
+            raise ChunkedEncodingError("Connection broken")
+
+        command = self.get_command([])
+        command.stream_pages = True
+        client = command.bynder_client.asset_bank_client
+        client.iter_media_list.side_effect = [
+            interrupted(self.get_asset("1", "2024-01-02T00:00:00Z")),
+            iter(
+                [
+                    self.get_asset("2", "2024-01-03T00:00:00Z"),
+                    self.get_asset("3", "2024-01-04T00:00:00Z"),
+                ]
+            ),
+            iter([]),
+        ]
+
+        assets = list(command.get_assets())
+
+        # The page is resumed from the last asset received
+        self.assertEqual([asset["id"] for asset in assets], ["1", "2", "3"])
+        self.assertEqual(
+            [
+                call.args[0]["dateModified"]
+                for call in client.iter_media_list.call_args_list
+            ],
+            ["2024-01-01T00:00:00Z", "2024-01-01T23:59:59Z", "2024-01-03T23:59:59Z"],
+        )
+
+    def test_stream_pages_interrupted_without_progress(self):
+        def interrupted():
+            raise ChunkedEncodingError("Connection broken")
+            yield
+
+        command = self.get_command([])
+        command.stream_pages = True
+        command.bynder_client.asset_bank_client.iter_media_list.return_value = (
+            interrupted()
+        )
+
+        with self.assertRaises(ChunkedEncodingError):
+            list(command.get_assets())
+
+    def test_next_page_size(self):
+        command = UpdateStaleImages()
+        # The page size doesn't change by default
+        self.assertEqual(command.get_next_page_size(200, 0.1), 200)
+
+        command.adaptive_page_size = True
+        command.page_latency_target = 2.0
+        self.assertEqual(command.get_next_page_size(200, 0.1), 400)
+        self.assertEqual(command.get_next_page_size(800, 0.1), 1000)
+        self.assertEqual(command.get_next_page_size(200, 1.5), 200)
+        self.assertEqual(command.get_next_page_size(200, 3.0), 100)
+        self.assertEqual(command.get_next_page_size(60, 3.0), 50)
+
+    def test_adaptive_page_size(self):
+        command = self.get_command(
+            [
+                [
+                    self.get_asset("1", "2024-01-02T00:00:00Z"),
+                    self.get_asset("2", "2024-01-03T00:00:00Z"),
+                ],
+                [self.get_asset("3", "2024-01-04T00:00:00Z")],
+            ]
+        )
+        command.adaptive_page_size = True
+
+        list(command.get_assets())
+
+        media_list = command.bynder_client.asset_bank_client.media_list
+        self.assertEqual(
+            [call.args[0]["limit"] for call in media_list.call_args_list], [2, 4]
+        )
+
+    def test_batch_size(self):
+        assets = [
+            self.get_asset(str(i), f"2024-01-0{i}T00:00:00Z") for i in range(1, 6)
+        ]
+        out = StringIO()
+        with (
+            mock.patch("wagtail_bynder.management.commands.base.get_bynder_client"),
+            mock.patch.object(UpdateStaleImages, "get_assets", return_value=assets),
+            mock.patch.object(UpdateStaleImages, "process_batch") as process_batch_mock,
+        ):
+            call_command(
+                "update_stale_images",
+                "--batch-size=2",
+                "--page-size=500",
+                stdout=out,
+                stderr=StringIO(),
+            )
+
+        self.assertEqual(
+            [len(call.args[0]) for call in process_batch_mock.call_args_list],
+            [2, 2, 1],
+        )
+
+    def test_asset_records(self):
+        asset = self.get_asset("1", "2024-01-01T00:00:00Z")
+        asset["name"] = "Asset"
+        asset["property_Region"] = ["Europe"]
+        command = UpdateStaleImages()
+        command.batch_size = 10
+
+        with mock.patch.object(UpdateStaleImages, "get_assets", return_value=[asset]):
+            # All fields are kept by default
+            (batch,) = command.get_batches()
+            self.assertEqual(dict(batch["1"]), asset)
+
+            with override_settings(BYNDER_COMPACT_ASSET_RECORDS=True):
+                (batch,) = command.get_batches()
+                self.assertNotIn("property_Region", batch["1"])
+                self.assertEqual(batch["1"]["name"], "Asset")
+
+            with override_settings(
+                BYNDER_COMPACT_ASSET_RECORDS=True,
+                BYNDER_ASSET_RECORD_EXTRA_FIELDS=["property_Region"],
+            ):
+                (batch,) = command.get_batches()
+                self.assertEqual(batch["1"]["property_Region"], ["Europe"])
+
+    def test_prefetch_batches(self):
+        threads = []
+
+        def get_assets():
+            threads.append(threading.current_thread())
+            for i in range(1, 4):
+                yield self.get_asset(str(i), f"2024-01-0{i}T00:00:00Z")
+
+        for args, in_background in (([], False), (["--prefetch-batches=2"], True)):
+            threads.clear()
+            with (
+                self.subTest(args=args),
+                mock.patch("wagtail_bynder.management.commands.base.get_bynder_client"),
+                mock.patch.object(
+                    UpdateStaleImages, "get_assets", side_effect=get_assets
+                ),
+                mock.patch.object(
+                    UpdateStaleImages, "process_batch"
+                ) as process_batch_mock,
+            ):
+                call_command(
+                    "update_stale_images",
+                    "--batch-size=2",
+                    *args,
+                    stdout=StringIO(),
+                    stderr=StringIO(),
+                )
+
+                self.assertEqual(
+                    [list(call.args[0]) for call in process_batch_mock.call_args_list],
+                    [["1", "2"], ["3"]],
+                )
+                self.assertEqual(
+                    threads[0] is not threading.current_thread(), in_background
+                )
+
+    def test_since(self):
+        out = StringIO()
+        with (
+            mock.patch("wagtail_bynder.management.commands.base.get_bynder_client"),
+            mock.patch.object(UpdateStaleImages, "get_assets", return_value=[]),
+        ):
+            call_command(
+                "update_stale_images",
+                "--since=2024-01-01T12:00:00Z",
+                stdout=out,
+                stderr=StringIO(),
+            )
+        self.assertIn(
+            "Looking for image assets modified since 2024-01-01T12:00:00Z",
+            out.getvalue(),
+        )
+
+
+class UpdateObjectsInWorkersTests(SimpleTestCase):
+    def test_output_is_ordered(self):
+        def update_object(obj, asset_data):
+            command.stdout.write(f"Updating {obj}")
+            # Have later objects finish first
+            time.sleep((3 - obj) * 0.05)
+            command.stdout.write(f"Updated {obj}")
+            return obj != 2
+
+        out = StringIO()
+        command = UpdateStaleImages(stdout=out)
+        command.workers = 3
+        stdout = command.stdout
+
+        with mock.patch.object(command, "update_object", side_effect=update_object):
+            outcomes = list(
+                command.update_objects_in_workers((obj, {}) for obj in (0, 1, 2))
+            )
+
+        self.assertEqual(outcomes, [True, True, False])
+        # Output for each object is written together, in order
+        self.assertEqual(
+            out.getvalue(),
+            "Updating 0\nUpdated 0\nUpdating 1\nUpdated 1\nUpdating 2\nUpdated 2\n",
+        )
+        self.assertIs(command.stdout, stdout)
+
 
 class RefreshCommandTestsMixin:
     """
@@ -224,6 +615,7 @@ class RefreshCommandTestsMixin:
     command_name: str = ""
     command_class: Type
     factory_class: Type
+    fetches_assets_in_batches: bool = True
 
     @classmethod
     def setUpClass(cls):
@@ -262,6 +654,16 @@ class RefreshCommandTestsMixin:
             media_info_side_effect
         )
 
+        def media_list_side_effect(query):
+            # Only the asset with a recognised ID is returned
+            if TEST_ASSET_ID in query["ids"].split(","):
+                return [TEST_ASSET_DATA]
+            return []
+
+        self.mock_api_client.asset_bank_client.media_list.side_effect = (
+            media_list_side_effect
+        )
+
     def call_command(self, *args, **kwargs):
         """
         Calls the command with the provided arguments, whilst also also mocking
@@ -298,12 +700,26 @@ class RefreshCommandTestsMixin:
     def test_default(self):
         output, update_from_asset_data_mock, save_mock = self.call_command()
 
-        self.mock_api_client.asset_bank_client.media_info.assert_has_calls(
-            [
-                mock.call(self.asset_one.bynder_id),
-                mock.call(self.asset_two.bynder_id),
-            ]
-        )
+        media_info_mock = self.mock_api_client.asset_bank_client.media_info
+        if self.fetches_assets_in_batches:
+            # Data for all objects should have been fetched with a single request
+            self.mock_api_client.asset_bank_client.media_list.assert_called_once_with(
+                {
+                    "ids": ",".join(
+                        sorted([self.asset_one.bynder_id, self.asset_two.bynder_id])
+                    ),
+                    "limit": 2,
+                }
+            )
+            # Only the asset missing from the results should have been checked
+            media_info_mock.assert_called_once_with(self.asset_two.bynder_id)
+        else:
+            # Data for each object should have been fetched individually
+            self.mock_api_client.asset_bank_client.media_list.assert_not_called()
+            self.assertEqual(
+                sorted(call.args[0] for call in media_info_mock.call_args_list),
+                sorted([self.asset_one.bynder_id, self.asset_two.bynder_id]),
+            )
 
         update_from_asset_data_mock.assert_called_once_with(
             TEST_ASSET_DATA, force_download=False
@@ -345,11 +761,35 @@ class RefreshCommandTestsMixin:
         self.assertIn(self.deleted_msg, output)
         self.assertEqual(self.model_class.objects.all().count(), 1)
 
+    def test_asset_missing_from_batch_is_checked_before_delete(self):
+        # Bynder leaves the asset out of the batch results, but still has it
+        self.mock_api_client.asset_bank_client.media_list.side_effect = None
+        self.mock_api_client.asset_bank_client.media_list.return_value = []
+
+        output, update_from_asset_data_mock, _ = self.call_command(
+            delete_not_recognised=True
+        )
+
+        update_from_asset_data_mock.assert_called_once_with(
+            TEST_ASSET_DATA, force_download=False
+        )
+        self.assertIn(
+            "During this run, 1 asset id(s) were not recognised by Bynder", output
+        )
+        self.assertEqual(
+            list(self.model_class.objects.values_list("bynder_id", flat=True)),
+            [TEST_ASSET_ID],
+        )
+
     def test_from(self):
         output, update_from_asset_data_mock, save_mock = self.call_command(
             **{"from": self.asset_two.pk}
         )
 
+        if self.fetches_assets_in_batches:
+            self.mock_api_client.asset_bank_client.media_list.assert_called_once_with(
+                {"ids": self.asset_two.bynder_id, "limit": 1}
+            )
         self.mock_api_client.asset_bank_client.media_info.assert_called_once_with(
             self.asset_two.bynder_id
         )
@@ -369,6 +809,37 @@ class RefreshCommandTestsMixin:
 
         save_mock.assert_called_once()
 
+    def test_verify_files(self):
+        _, update_from_asset_data_mock, save_mock = self.call_command(verify_files=True)
+
+        update_from_asset_data_mock.assert_called_once_with(
+            TEST_ASSET_DATA, force_download=False, verify_file=True
+        )
+        save_mock.assert_called_once()
+
+    def test_concurrency(self):
+        with mock.patch(
+            f"{self.model_class.__module__}.{self.model_class.__name__}.prepare_for_update"
+        ) as prepare_for_update_mock:
+            output, update_from_asset_data_mock, save_mock = self.call_command(
+                concurrency=4
+            )
+
+        self.assertEqual(
+            self.mock_api_client.asset_bank_client.media_list.call_count,
+            int(self.fetches_assets_in_batches),
+        )
+        prepare_for_update_mock.assert_called_once_with(
+            TEST_ASSET_DATA, force_download=False
+        )
+        update_from_asset_data_mock.assert_called_once_with(
+            TEST_ASSET_DATA, force_download=False
+        )
+        save_mock.assert_called_once()
+        self.assertIn(
+            "During this run, 1 asset id(s) were not recognised by Bynder", output
+        )
+
 
 class UpdateDocumentsTestCase(RefreshCommandTestsMixin, TestCase):
     """
@@ -388,6 +859,8 @@ class UpdateImagesTestCase(RefreshCommandTestsMixin, TestCase):
     command_name = "refresh_bynder_images"
     command_class = UpdateImages
     factory_class = CustomImageFactory
+    # Batch results don't include focal point data
+    fetches_assets_in_batches = False
 
 
 class UpdateVideosTestCase(RefreshCommandTestsMixin, TestCase):
@@ -483,6 +956,7 @@ class RefreshCommandErrorHandlingMixin:
 
         # Define a mock to stand-in for the Bynder API client
         self.mock_api_client = mock.Mock()
+        self.mock_api_client.media_list.return_value = [TEST_ASSET_DATA]
         self.mock_api_client.media_info.return_value = TEST_ASSET_DATA
 
     def call_command_with_error(self, error):
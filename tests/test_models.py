@@ -1,17 +1,30 @@
 import io
+import os
 
 from unittest import mock
 
 from django.conf import settings
-from django.test import SimpleTestCase, override_settings
+from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
 from wagtail.documents import get_document_model
 from wagtail.images import get_image_model
 
 from wagtail_bynder import get_video_model
-from wagtail_bynder.exceptions import BynderAssetDataError, BynderAssetDownloadError
-from wagtail_bynder.utils import filename_from_url
+from wagtail_bynder.exceptions import (
+    BynderAssetDataError,
+    BynderAssetDownloadError,
+    BynderAssetFileNotModified,
+)
+from wagtail_bynder.records import AssetRecord
+from wagtail_bynder.utils import (
+    DownloadValidators,
+    ImageProbeResult,
+    StoredFileDetails,
+    filename_from_url,
+)
 
 from .utils import (
+    get_fake_document,
     get_fake_downloaded_document,
     get_fake_downloaded_image,
     get_test_asset_data,
@@ -94,6 +107,42 @@ class BynderSyncedDocumentTests(SimpleTestCase):
         )
         self.assertEqual(self.obj.original_filesize, self.asset_data["fileSize"])
 
+    @override_settings(BYNDER_STREAM_DOCUMENTS_TO_STORAGE=True)
+    def test_update_file_streamed_to_storage(self):
+        self.obj.source_filename = None
+        self.obj.original_filesize = None
+
+        details = StoredFileDetails("documents/my-groovy-document.pdf", 1024, "abc")
+        with (
+            mock.patch(
+                "wagtail_bynder.models.utils.stream_document_to_storage",
+                return_value=details,
+            ) as stream_document_to_storage_mock,
+            mock.patch.object(self.obj, "download_file") as download_file_mock,
+        ):
+            self.obj.update_file(self.asset_data)
+
+        download_file_mock.assert_not_called()
+        stream_document_to_storage_mock.assert_called_once_with(
+            self.asset_data["original"],
+            self.obj.file.storage,
+            "documents/my-groovy-document.pdf",
+            max_length=100,
+            validators=None,
+        )
+
+        # The file has already been saved to storage
+        self.assertEqual(self.obj.file.name, details.name)
+        self.assertTrue(self.obj.file._committed)
+        self.assertEqual(self.obj.file_size, details.size)
+        self.assertEqual(self.obj.file_hash, details.file_hash)
+        self.assertTrue(self.obj._file_changed)
+        self.assertTrue(self.obj._file_metadata_set)
+        self.assertEqual(
+            self.obj.source_filename, filename_from_url(self.asset_data["original"])
+        )
+        self.assertEqual(self.obj.original_filesize, self.asset_data["fileSize"])
+
     def test_update_from_asset_data(self):
         self.obj.title = None
         self.obj.copyright = None
@@ -118,14 +167,33 @@ class BynderSyncedDocumentTests(SimpleTestCase):
         self.assertEqual(self.obj.is_limited_use, self.asset_data["limited"] == 1)
         self.assertEqual(self.obj.is_public, self.asset_data["isPublic"] == 1)
 
+    def test_update_from_asset_record(self):
+        record = AssetRecord(self.asset_data)
+        self.obj.title = None
+        self.obj.bynder_last_modified = None
+
+        with (
+            mock.patch(
+                "wagtail_bynder.models.utils.get_default_collection", return_value=None
+            ),
+            mock.patch.object(self.obj, "update_file") as update_file_mock,
+        ):
+            self.obj.update_from_asset_data(record)
+        self.assertEqual(self.obj.title, self.asset_data["name"])
+        self.assertEqual(self.obj.bynder_last_modified, self.asset_data["dateModified"])
+        update_file_mock.assert_called_once_with(record)
+
     def test_download_error_prevents_bad_file_creation(self):
         """Test that server errors prevent creation of bad files"""
-        # Mock the requests.get to return a 502 error
+        # Mock the download session to return a 502 error
         mock_response = mock.Mock()
         mock_response.status_code = 502
 
         with (
-            mock.patch("wagtail_bynder.utils.requests.get", return_value=mock_response),
+            mock.patch(
+                "wagtail_bynder.utils.get_download_session",
+                return_value=mock.Mock(get=mock.Mock(return_value=mock_response)),
+            ),
             self.assertRaises(BynderAssetDownloadError) as cm,
         ):
             self.obj.download_file(self.asset_data["original"])
@@ -136,6 +204,125 @@ class BynderSyncedDocumentTests(SimpleTestCase):
         self.assertFalse(self.obj.file)
 
 
+class BynderSyncedDocumentSaveTests(TestCase):
+    def test_save_with_file_on_disk(self):
+        # Downloaded files that were spooled to disk should be accepted like
+        # any other file, and the temporary file removed once saved
+        spooled_file = TemporaryUploadedFile("spooled.txt", "text/plain", 0, "utf-8")
+        spooled_file.write(b"Some text")
+        spooled_file.size = 9
+        spooled_file.seek(0)
+        path = spooled_file.temporary_file_path()
+
+        obj = get_document_model()(title="Spooled", collection_id=1)
+        obj.file = spooled_file
+        obj._file_changed = True
+        obj.save()
+
+        obj.refresh_from_db()
+        self.assertEqual(obj.file_size, 9)
+        with obj.open_file() as f:
+            self.assertEqual(f.read(), b"Some text")
+        self.assertFalse(os.path.exists(path))
+
+
+@override_settings(BYNDER_DEDUPLICATE_FILES=True)
+class FileDeduplicationTests(TestCase):
+    def setUp(self):
+        self.model = get_document_model()
+        self.asset_data = get_test_asset_data(type="document")
+        self.contents = get_fake_document().getvalue()
+        self.existing = self.create_document("Existing", "some-other-id")
+
+    def create_document(self, title, bynder_id):
+        obj = self.model(title=title, bynder_id=bynder_id, collection_id=1)
+        with mock.patch.object(
+            obj,
+            "download_file",
+            return_value=InMemoryUploadedFile(
+                io.BytesIO(self.contents),
+                "file",
+                "fake.pdf",
+                "application/pdf",
+                len(self.contents),
+                None,
+            ),
+        ):
+            obj.update_file(self.asset_data)
+        obj.save()
+        return obj
+
+    def test_identical_file_is_shared(self):
+        obj = self.create_document("Duplicate", self.asset_data["id"])
+
+        self.assertEqual(obj.file.name, self.existing.file.name)
+        self.assertEqual(obj.file_size, self.existing.file_size)
+        self.assertEqual(obj.file_hash, self.existing.file_hash)
+        self.assertTrue(obj.file_is_shared())
+
+    def test_shared_file_kept_when_one_object_deleted(self):
+        obj = self.create_document("Duplicate", self.asset_data["id"])
+        storage = obj.file.storage
+        name = obj.file.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.existing.delete()
+        self.assertTrue(storage.exists(name))
+
+        # Once nothing else uses it, the file should be deleted as usual
+        with self.captureOnCommitCallbacks(execute=True):
+            obj.delete()
+        self.assertFalse(storage.exists(name))
+
+    @override_settings(BYNDER_STREAM_DOCUMENTS_TO_STORAGE=True)
+    def test_identical_streamed_file_is_shared(self):
+        obj = self.model(
+            title="Duplicate", bynder_id=self.asset_data["id"], collection_id=1
+        )
+        storage = self.model._meta.get_field("file").storage
+        stored_name = storage.save("documents/streamed.pdf", io.BytesIO(self.contents))
+        details = StoredFileDetails(
+            stored_name, len(self.contents), self.existing.file_hash
+        )
+
+        with mock.patch.object(obj, "stream_file_to_storage", return_value=details):
+            obj.update_file(self.asset_data)
+
+        self.assertEqual(obj.file.name, self.existing.file.name)
+        # The new copy should have been removed from storage
+        self.assertFalse(storage.exists(stored_name))
+
+    @override_settings(BYNDER_STREAM_DOCUMENTS_TO_STORAGE=True)
+    def test_streamed_file_deleted_when_save_fails(self):
+        obj = self.model(title="Streamed", bynder_id=self.asset_data["id"])
+        storage = self.model._meta.get_field("file").storage
+        stored_name = storage.save("documents/streamed.pdf", io.BytesIO(b"Other"))
+        details = StoredFileDetails(stored_name, 5, "not-a-duplicate")
+
+        with mock.patch.object(obj, "stream_file_to_storage", return_value=details):
+            obj.update_file(self.asset_data)
+        self.assertEqual(obj.file.name, stored_name)
+
+        with (
+            mock.patch(
+                "wagtail.documents.models.AbstractDocument.save",
+                side_effect=ValueError("Save failed"),
+            ),
+            self.assertRaises(ValueError),
+        ):
+            obj.save()
+
+        # The streamed file should not be left in storage
+        self.assertFalse(storage.exists(stored_name))
+
+    @override_settings(BYNDER_DEDUPLICATE_FILES=False)
+    def test_files_not_shared_when_disabled(self):
+        obj = self.create_document("Duplicate", self.asset_data["id"])
+
+        self.assertNotEqual(obj.file.name, self.existing.file.name)
+        self.assertFalse(obj.file_is_shared())
+
+
 class BynderSyncedImageTests(SimpleTestCase):
     def setUp(self):
         model_class = get_image_model()
@@ -237,6 +424,211 @@ class BynderSyncedImageTests(SimpleTestCase):
         self.assertEqual(self.obj.original_height, self.asset_data["height"])
         self.assertEqual(self.obj.original_width, self.asset_data["width"])
 
+    def test_update_file_stores_download_validators(self):
+        fake_image = get_fake_downloaded_image()
+        fake_image.validators = DownloadValidators(
+            '"abc123"', "Tue, 10 Oct 2023 09:52:05 GMT"
+        )
+        with mock.patch.object(self.obj, "download_file", return_value=fake_image):
+            self.obj.update_file(self.asset_data)
+
+        self.assertEqual(self.obj.source_etag, '"abc123"')
+        self.assertEqual(self.obj.source_last_modified, "Tue, 10 Oct 2023 09:52:05 GMT")
+
+    def test_update_file_when_not_modified(self):
+        self.obj.file.name = "original_images/existing.jpg"
+        self.obj.original_filesize = None
+
+        with (
+            mock.patch.object(
+                self.obj,
+                "download_file",
+                side_effect=BynderAssetFileNotModified("Not modified"),
+            ),
+            mock.patch.object(
+                self.obj, "process_downloaded_file"
+            ) as process_downloaded_file_mock,
+        ):
+            self.obj.update_file(self.asset_data)
+
+        # The existing file should be left as it is, with no conversion
+        # or purging of renditions
+        process_downloaded_file_mock.assert_not_called()
+        self.assertEqual(self.obj.file.name, "original_images/existing.jpg")
+        self.assertFalse(hasattr(self.obj, "_file_changed"))
+        self.assertEqual(self.obj.original_filesize, self.asset_data["fileSize"])
+
+    def test_prepare_for_update(self):
+        fake_image = get_fake_downloaded_image()
+        with (
+            mock.patch.object(
+                self.obj, "download_file", return_value=fake_image
+            ) as download_file_mock,
+            mock.patch.object(
+                self.obj, "process_downloaded_file", return_value=fake_image
+            ),
+        ):
+            self.obj.prepare_for_update(self.asset_data)
+            download_file_mock.assert_called_once()
+            self.obj.update_file(self.asset_data)
+
+        # The file downloaded ahead of time should have been used
+        download_file_mock.assert_called_once()
+        self.assertIs(self.obj.file.file, fake_image)
+        self.assertTrue(self.obj._file_changed)
+
+    def test_prepare_for_update_keeps_errors_for_update_file(self):
+        error = BynderAssetDownloadError("Server error")
+        with mock.patch.object(
+            self.obj, "download_file", side_effect=error
+        ) as download_file_mock:
+            # Errors should not be raised straight away
+            self.obj.prepare_for_update(self.asset_data)
+            with self.assertRaises(BynderAssetDownloadError) as cm:
+                self.obj.update_file(self.asset_data)
+
+        self.assertIs(cm.exception, error)
+        download_file_mock.assert_called_once()
+
+    def test_prepare_for_update_when_file_unchanged(self):
+        self.obj.file.name = "original_images/existing.jpg"
+        with mock.patch.object(self.obj, "download_file") as download_file_mock:
+            self.obj.prepare_for_update(self.asset_data)
+
+        download_file_mock.assert_not_called()
+        self.assertFalse(hasattr(self.obj, "_prepared_file"))
+
+    def test_prepare_for_update_probes_file_once(self):
+        self.obj.file.name = "original_images/existing.jpg"
+        with (
+            mock.patch.object(
+                self.obj, "probe_file_has_changed", return_value=False
+            ) as probe_file_has_changed_mock,
+            mock.patch.object(self.obj, "update_file") as update_file_mock,
+            # Avoid updating anything other than the file
+            mock.patch("wagtail_bynder.models.BynderAssetMixin.update_from_asset_data"),
+        ):
+            self.obj.prepare_for_update(self.asset_data, verify_file=True)
+            self.obj.update_from_asset_data(self.asset_data, verify_file=True)
+
+        # The decision made by prepare_for_update() should have been reused
+        probe_file_has_changed_mock.assert_called_once_with(self.asset_data)
+        update_file_mock.assert_not_called()
+
+    def test_probe_file_has_changed(self):
+        self.obj.file.name = "original_images/existing.jpg"
+        probe_image_path = "wagtail_bynder.models.utils.probe_image"
+
+        # Same dimensions and format
+        with mock.patch(
+            probe_image_path, return_value=ImageProbeResult(50, 50, "jpeg")
+        ) as probe_image_mock:
+            self.assertFalse(self.obj.probe_file_has_changed(self.asset_data))
+        probe_image_mock.assert_called_once_with(
+            self.asset_data["thumbnails"]["WagtailSource"]
+        )
+
+        # Different dimensions
+        with mock.patch(
+            probe_image_path, return_value=ImageProbeResult(60, 50, "jpeg")
+        ):
+            self.assertTrue(self.obj.probe_file_has_changed(self.asset_data))
+
+        # Different format
+        with mock.patch(probe_image_path, return_value=ImageProbeResult(50, 50, "png")):
+            self.assertTrue(self.obj.probe_file_has_changed(self.asset_data))
+
+        # Unknown
+        with mock.patch(probe_image_path, return_value=None):
+            self.assertTrue(self.obj.probe_file_has_changed(self.asset_data))
+
+    @override_settings(
+        BYNDER_MAX_SOURCE_IMAGE_WIDTH=100, BYNDER_MAX_SOURCE_IMAGE_HEIGHT=100
+    )
+    def test_probe_file_has_changed_allows_for_downsizing(self):
+        self.obj.file.name = "original_images/existing.jpg"
+        self.obj.width, self.obj.height = 100, 50
+        with mock.patch(
+            "wagtail_bynder.models.utils.probe_image",
+            return_value=ImageProbeResult(400, 200, "jpeg"),
+        ):
+            self.assertFalse(self.obj.probe_file_has_changed(self.asset_data))
+
+    def test_file_needs_update_with_verify_file(self):
+        self.obj.file.name = "original_images/existing.jpg"
+        with mock.patch.object(
+            self.obj, "probe_file_has_changed", return_value=True
+        ) as probe_file_has_changed_mock:
+            self.assertFalse(self.obj.file_needs_update(self.asset_data))
+            probe_file_has_changed_mock.assert_not_called()
+            self.assertTrue(
+                self.obj.file_needs_update(self.asset_data, verify_file=True)
+            )
+            probe_file_has_changed_mock.assert_called_once_with(self.asset_data)
+
+    def test_get_download_validators(self):
+        source_url = self.asset_data["thumbnails"]["WagtailSource"]
+        self.obj.source_etag = '"abc123"'
+        self.obj.source_last_modified = "Tue, 10 Oct 2023 09:52:05 GMT"
+
+        # Without a file, there is nothing to validate against
+        self.assertIsNone(self.obj.get_download_validators(source_url))
+
+        self.obj.file.name = "original_images/existing.jpg"
+
+        # Nor if the file is missing from storage
+        self.assertIsNone(self.obj.get_download_validators(source_url))
+
+        with mock.patch.object(self.obj.file.storage, "exists", return_value=True):
+            self.assertEqual(
+                self.obj.get_download_validators(source_url),
+                DownloadValidators('"abc123"', "Tue, 10 Oct 2023 09:52:05 GMT"),
+            )
+
+            # Validators for one file shouldn't be used for another
+            self.assertIsNone(
+                self.obj.get_download_validators("https://example.com/different.jpg")
+            )
+
+            with override_settings(BYNDER_CONDITIONAL_DOWNLOADS=False):
+                self.assertIsNone(self.obj.get_download_validators(source_url))
+
+            self.obj.source_etag = ""
+            self.obj.source_last_modified = ""
+            self.assertIsNone(self.obj.get_download_validators(source_url))
+
+    def test_force_download_skips_download_validators(self):
+        self.obj.file.name = "original_images/existing.jpg"
+        self.obj.source_etag = '"abc123"'
+        self.obj.source_last_modified = "Tue, 10 Oct 2023 09:52:05 GMT"
+        fake_image = get_fake_downloaded_image()
+
+        def download_image(source_url, validators=None):
+            # Behave like the server would for an unchanged file
+            if validators:
+                raise BynderAssetFileNotModified("Not modified")
+            return fake_image
+
+        with (
+            mock.patch.object(self.obj.file.storage, "exists", return_value=True),
+            mock.patch(
+                "wagtail_bynder.models.utils.download_image",
+                side_effect=download_image,
+            ) as download_image_mock,
+            mock.patch.object(
+                self.obj, "process_downloaded_file", return_value=fake_image
+            ),
+            mock.patch("wagtail_bynder.models.BynderAssetMixin.update_from_asset_data"),
+        ):
+            self.obj.update_from_asset_data(self.asset_data, force_download=True)
+
+        download_image_mock.assert_called_once_with(
+            self.asset_data["thumbnails"]["WagtailSource"], validators=None
+        )
+        # The file should have been replaced, despite being 'unchanged'
+        self.assertTrue(self.obj._file_changed)
+        self.assertEqual(self.obj.file.name, fake_image.name)
+
     def test_update_from_asset_data(self):
         self.obj.title = None
         self.obj.copyright = None
@@ -333,6 +725,37 @@ class BynderSyncedImageTests(SimpleTestCase):
         # No attribute values should on the object itself should have changed
         self.assertEqual(state_before, self.obj.__dict__)
 
+    @override_settings(BYNDER_DOWNLOAD_MAX_MEMORY_SIZE=100)
+    def test_process_downloaded_file_spools_large_images_to_disk(self):
+        fake_image = get_fake_downloaded_image("example.jpg", 500, 200)
+
+        result = self.obj.process_downloaded_file(fake_image, self.asset_data)
+
+        # The converted image is larger than BYNDER_DOWNLOAD_MAX_MEMORY_SIZE,
+        # so should be left on disk
+        self.assertIsInstance(result, TemporaryUploadedFile)
+        self.assertEqual(result.name, "example.jpg")
+        self.assertEqual(result.content_type, "image/jpeg")
+        self.assertEqual(result.size, os.path.getsize(result.temporary_file_path()))
+        result.close()
+
+    def test_process_downloaded_file_from_disk(self):
+        fake_image = get_fake_downloaded_image("example.png", 500, 200)
+        spooled_image = TemporaryUploadedFile(
+            fake_image.name, fake_image.content_type, fake_image.size, None
+        )
+        fake_image.seek(0)
+        spooled_image.write(fake_image.read())
+        spooled_image.seek(0)
+        path = spooled_image.temporary_file_path()
+
+        result = self.obj.process_downloaded_file(spooled_image, self.asset_data)
+
+        self.assertIsInstance(result, InMemoryUploadedFile)
+        self.assertEqual(result.name, "example.png")
+        # The temporary file should have been removed once converted
+        self.assertFalse(os.path.exists(path))
+
     @override_settings(
         BYNDER_MAX_SOURCE_IMAGE_WIDTH=100,
         BYNDER_MAX_SOURCE_IMAGE_HEIGHT=100,
@@ -382,12 +805,15 @@ class BynderSyncedImageTests(SimpleTestCase):
 
     def test_download_error_prevents_bad_file_creation(self):
         """Test that server errors prevent creation of bad files"""
-        # Mock the requests.get to return a 502 error
+        # Mock the download session to return a 502 error
         mock_response = mock.Mock()
         mock_response.status_code = 502
 
         with (
-            mock.patch("wagtail_bynder.utils.requests.get", return_value=mock_response),
+            mock.patch(
+                "wagtail_bynder.utils.get_download_session",
+                return_value=mock.Mock(get=mock.Mock(return_value=mock_response)),
+            ),
             self.assertRaises(BynderAssetDownloadError) as cm,
         ):
             self.obj.download_file(self.asset_data["thumbnails"]["WagtailSource"])
@@ -0,0 +1,145 @@
+from unittest import mock
+
+import requests
+
+from django.test import SimpleTestCase, override_settings
+from freezegun import freeze_time
+
+from wagtail_bynder import ratelimit
+
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "wagtail-bynder-ratelimit-tests",
+    }
+}
+
+
+class TokenBucketRateLimiterTests(SimpleTestCase):
+    @freeze_time("2024-01-01 12:00:00")
+    def test_try_acquire(self):
+        limiter = ratelimit.TokenBucketRateLimiter(2)
+        # One second's worth of requests can be made straight away
+        self.assertEqual(limiter.try_acquire(), 0)
+        self.assertEqual(limiter.try_acquire(), 0)
+        # After which, the next request must wait for a token
+        self.assertAlmostEqual(limiter.try_acquire(), 0.5)
+
+    def test_try_acquire_after_waiting(self):
+        with freeze_time("2024-01-01 12:00:00") as frozen_time:
+            limiter = ratelimit.TokenBucketRateLimiter(2)
+            limiter.try_acquire()
+            limiter.try_acquire()
+            self.assertGreater(limiter.try_acquire(), 0)
+            frozen_time.tick(0.5)
+            self.assertEqual(limiter.try_acquire(), 0)
+
+    @freeze_time("2024-01-01 12:00:00")
+    def test_try_acquire_amount_larger_than_capacity(self):
+        limiter = ratelimit.TokenBucketRateLimiter(1000)
+        # Allowed while the bucket is full, leaving it in debt
+        self.assertEqual(limiter.try_acquire(3000), 0)
+        self.assertAlmostEqual(limiter.try_acquire(100), 2.1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CacheRateLimiterTests(SimpleTestCase):
+    def test_try_acquire(self):
+        with freeze_time("2024-01-01 12:00:00.25") as frozen_time:
+            limiter = ratelimit.CacheRateLimiter(2, "default", "test-limiter")
+            other_limiter = ratelimit.CacheRateLimiter(2, "default", "test-limiter")
+            self.assertEqual(limiter.try_acquire(), 0)
+            # The allowance is shared by everything using the same key
+            self.assertEqual(other_limiter.try_acquire(), 0)
+            self.assertAlmostEqual(limiter.try_acquire(), 0.75)
+            # The allowance is renewed for the next window
+            frozen_time.tick(0.75)
+            self.assertEqual(limiter.try_acquire(), 0)
+
+    def test_slow_rates_use_longer_windows(self):
+        limiter = ratelimit.CacheRateLimiter(0.5, "default", "test-slow-limiter")
+        self.assertEqual(limiter.window, 2)
+        self.assertEqual(limiter.limit, 1)
+
+
+class GetRateLimiterTests(SimpleTestCase):
+    @override_settings(BYNDER_API_RATE_LIMITS={ratelimit.BACKGROUND: 5})
+    def test_separate_budgets(self):
+        limiter = ratelimit.get_rate_limiter(ratelimit.BACKGROUND)
+        self.assertIsInstance(limiter, ratelimit.TokenBucketRateLimiter)
+        self.assertEqual(limiter.rate, 5)
+        # The same limiter is shared by the whole process
+        self.assertIs(ratelimit.get_rate_limiter(ratelimit.BACKGROUND), limiter)
+        # No limit is set for interactive requests
+        self.assertIsNone(ratelimit.get_rate_limiter(ratelimit.INTERACTIVE))
+
+    @override_settings(
+        CACHES=LOCMEM_CACHES,
+        BYNDER_API_RATE_LIMITS={ratelimit.INTERACTIVE: 10},
+        BYNDER_API_RATE_LIMIT_CACHE="default",
+    )
+    def test_shared_via_cache(self):
+        limiter = ratelimit.get_rate_limiter(ratelimit.INTERACTIVE)
+        self.assertIsInstance(limiter, ratelimit.CacheRateLimiter)
+        self.assertEqual(limiter.cache_alias, "default")
+
+    def test_no_limits_by_default(self):
+        self.assertIsNone(ratelimit.get_rate_limiter(ratelimit.INTERACTIVE))
+        self.assertIsNone(ratelimit.get_rate_limiter(ratelimit.BACKGROUND))
+
+
+class GetDownloadBandwidthLimiterTests(SimpleTestCase):
+    @override_settings(BYNDER_DOWNLOAD_BANDWIDTH_LIMIT=1048576)
+    def test_background_only(self):
+        self.assertIsNone(ratelimit.get_download_bandwidth_limiter())
+        with ratelimit.use_budget(ratelimit.BACKGROUND):
+            limiter = ratelimit.get_download_bandwidth_limiter()
+            self.assertIsInstance(limiter, ratelimit.TokenBucketRateLimiter)
+            self.assertEqual(limiter.rate, 1048576)
+            # The same limiter is shared by all downloads
+            self.assertIs(ratelimit.get_download_bandwidth_limiter(), limiter)
+        self.assertEqual(ratelimit.get_current_budget(), ratelimit.INTERACTIVE)
+
+    def test_no_limit_by_default(self):
+        with ratelimit.use_budget(ratelimit.BACKGROUND):
+            self.assertIsNone(ratelimit.get_download_bandwidth_limiter())
+
+
+class RateLimitedClientTests(SimpleTestCase):
+    def test_method_calls_are_rate_limited(self):
+        client = mock.Mock()
+        client.media_info.return_value = {"id": "abc"}
+        limiter = mock.Mock(spec=ratelimit.RateLimiter)
+        rate_limited_client = ratelimit.RateLimitedClient(client, limiter)
+
+        self.assertEqual(rate_limited_client.media_info("abc"), {"id": "abc"})
+        client.media_info.assert_called_once_with("abc")
+        limiter.acquire.assert_called_once()
+
+
+class GetRetryAfterTests(SimpleTestCase):
+    def get_error(self, status_code, headers=None):
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers.update(headers or {})
+        return requests.HTTPError(response=response)
+
+    def test_too_many_requests(self):
+        self.assertEqual(
+            ratelimit.get_retry_after(self.get_error(429, {"Retry-After": "5"})), 5
+        )
+        self.assertEqual(
+            ratelimit.get_retry_after(self.get_error(429)),
+            ratelimit.DEFAULT_RETRY_AFTER,
+        )
+
+    @freeze_time("2024-01-01 12:00:00")
+    def test_retry_after_date(self):
+        error = self.get_error(503, {"Retry-After": "Mon, 01 Jan 2024 12:00:30 GMT"})
+        self.assertEqual(ratelimit.get_retry_after(error), 30)
+
+    def test_other_errors(self):
+        self.assertIsNone(ratelimit.get_retry_after(self.get_error(503)))
+        self.assertIsNone(ratelimit.get_retry_after(self.get_error(404)))
+        self.assertIsNone(ratelimit.get_retry_after(ValueError()))
@@ -0,0 +1,89 @@
+import datetime
+
+from django.test import SimpleTestCase
+from wagtail.documents import get_document_model
+
+from wagtail_bynder.records import AssetRecord, get_date_modified
+
+from .utils import get_test_asset_data
+
+
+class AssetRecordTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.asset_data = get_test_asset_data(type="document")
+        self.asset_data["property_Region"] = ["Europe"]
+
+    def test_behaves_like_asset_data(self):
+        record = AssetRecord(self.asset_data)
+
+        self.assertEqual(record["id"], self.asset_data["id"])
+        self.assertEqual(record["dateModified"], self.asset_data["dateModified"])
+        self.assertEqual(record.get("original"), self.asset_data["original"])
+        self.assertIn("thumbnails", record)
+        # Fields the models don't use are not kept
+        self.assertNotIn("property_Region", record)
+        self.assertIsNone(record.get("property_Region"))
+        with self.assertRaises(KeyError):
+            record["property_Region"]
+
+        self.assertEqual(
+            dict(record),
+            {
+                key: value
+                for key, value in self.asset_data.items()
+                if key in AssetRecord.fields
+            },
+        )
+
+    def test_missing_fields(self):
+        del self.asset_data["original"]
+        record = AssetRecord(self.asset_data)
+
+        self.assertNotIn("original", record)
+        self.assertNotIn("original", list(record))
+        with self.assertRaises(KeyError):
+            record["original"]
+
+    def test_extra_fields(self):
+        record = AssetRecord(self.asset_data, ["property_Region", "property_Missing"])
+
+        self.assertEqual(record["property_Region"], ["Europe"])
+        self.assertNotIn("property_Missing", record)
+        self.assertEqual(list(record)[-1], "property_Region")
+
+    def test_all_fields(self):
+        record = AssetRecord(self.asset_data, None)
+
+        self.assertEqual(dict(record), self.asset_data)
+
+    def test_is_compact(self):
+        record = AssetRecord(self.asset_data)
+
+        self.assertFalse(hasattr(record, "__dict__"))
+
+    def test_date_modified(self):
+        self.asset_data["dateModified"] = "2024-01-02T03:04:05Z"
+        record = AssetRecord(self.asset_data)
+        expected = datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.UTC)
+
+        self.assertEqual(record.date_modified, expected)
+        self.assertEqual(get_date_modified(record), expected)
+        # Raw asset data is still supported
+        self.assertEqual(get_date_modified(self.asset_data), expected)
+
+    def test_is_up_to_date(self):
+        self.asset_data["dateModified"] = "2024-01-02T00:00:00Z"
+        record = AssetRecord(self.asset_data)
+        obj = get_document_model()(
+            # Avoid a query for the default collection
+            collection_id=1,
+            bynder_last_modified=datetime.datetime(2024, 1, 1, tzinfo=datetime.UTC),
+        )
+
+        self.assertFalse(obj.is_up_to_date(record))
+        self.assertFalse(obj.is_up_to_date(self.asset_data))
+
+        obj.bynder_last_modified = datetime.datetime(2024, 1, 2, tzinfo=datetime.UTC)
+        self.assertTrue(obj.is_up_to_date(record))
+        self.assertTrue(obj.is_up_to_date(self.asset_data))
@@ -0,0 +1,84 @@
+import json
+
+from unittest import mock
+
+from django.test import SimpleTestCase
+from requests import HTTPError
+
+from wagtail_bynder.streaming import StreamingAssetBankClient, iter_json_array
+
+
+def split(data: bytes, size: int) -> list[bytes]:
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+class IterJsonArrayTests(SimpleTestCase):
+    def test_items_split_across_chunks(self):
+        items = [
+            {"id": "1", "name": "Café ☕", "tags": ["a", "b"]},
+            {"id": "2", "width": 1024, "ratio": 1.5, "archive": 0},
+            [],
+            "text",
+            12.5e3,
+            None,
+            True,
+        ]
+        data = json.dumps(items, indent=2, ensure_ascii=False).encode()
+        # Including chunks that split multi-byte characters and numbers
+        for size in (1, 2, 5, 64, len(data)):
+            with self.subTest(size=size):
+                self.assertEqual(list(iter_json_array(split(data, size))), items)
+
+    def test_empty_array(self):
+        self.assertEqual(list(iter_json_array([b" [", b" ] "])), [])
+
+    def test_items_are_yielded_as_they_arrive(self):
+        def chunks():
+            yield b'[{"id": "1"}, '
+            # The first item is available before the rest has arrived
+            self.assertEqual(received, [{"id": "1"}])
+            yield b'{"id": "2"}]'
+
+        received = []
+        received.extend(iter_json_array(chunks()))
+        self.assertEqual(received, [{"id": "1"}, {"id": "2"}])
+
+    def test_invalid_data(self):
+        for data in (b'{"id": "1"}', b"[1, 2", b"[1,]", b"[1 2]", b'[{"id": ', b""):
+            with self.subTest(data=data), self.assertRaises(ValueError):
+                list(iter_json_array(split(data, 1)))
+
+
+class StreamingAssetBankClientTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.response = mock.Mock()
+        self.response.iter_content.return_value = [b'[{"id": "1"},', b' {"id": "2"}]']
+        self.session = mock.Mock()
+        self.session.request.return_value = self.response
+        self.asset_bank_client = mock.Mock()
+        self.client = StreamingAssetBankClient(
+            self.asset_bank_client, self.session, "example.bynder.com"
+        )
+
+    def test_iter_media_list(self):
+        results = self.client.iter_media_list({"limit": 2})
+
+        self.session.request.assert_called_once_with(
+            "GET",
+            "https://example.bynder.com/api/v4/media/",
+            params={"limit": 2},
+            stream=True,
+        )
+        self.assertEqual(list(results), [{"id": "1"}, {"id": "2"}])
+        self.response.close.assert_called_once()
+
+    def test_error_response(self):
+        self.response.raise_for_status.side_effect = HTTPError("Too many requests")
+
+        with self.assertRaises(HTTPError):
+            self.client.iter_media_list({"limit": 2})
+        self.response.close.assert_called_once()
+
+    def test_other_methods(self):
+        self.assertIs(self.client.media_info, self.asset_bank_client.media_info)
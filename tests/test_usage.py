@@ -0,0 +1,89 @@
+from unittest import mock
+
+import requests
+import responses
+
+from django.test import SimpleTestCase
+
+from wagtail_bynder import usage
+from wagtail_bynder.utils import create_download_session
+
+
+class UsageTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        usage.reset_usage()
+        self.addCleanup(usage.reset_usage)
+
+    def test_calls_counted_by_caller_and_endpoint(self):
+        client = mock.Mock()
+        tracked_client = usage.UsageTrackingClient(client)
+
+        tracked_client.media_list({})
+        with usage.use_caller(usage.CHOOSER):
+            tracked_client.media_info("abc")
+            tracked_client.media_info("def")
+        with usage.use_caller("update_stale_images"):
+            tracked_client.media_info("abc")
+
+        summary = usage.get_usage()
+        self.assertEqual(summary.total, 4)
+        self.assertEqual(summary.by_endpoint(), {"media_list": 1, "media_info": 3})
+        self.assertEqual(
+            summary.by_caller(),
+            {usage.OTHER: 1, usage.CHOOSER: 2, "update_stale_images": 1},
+        )
+        self.assertEqual(client.media_info.call_count, 3)
+
+    def test_iter_media_list_counted_as_media_list(self):
+        tracked_client = usage.UsageTrackingClient(mock.Mock())
+
+        tracked_client.media_list({})
+        tracked_client.iter_media_list({})
+
+        self.assertEqual(usage.get_usage().by_endpoint(), {"media_list": 2})
+
+    def test_since(self):
+        tracked_client = usage.UsageTrackingClient(mock.Mock())
+        tracked_client.media_list({})
+        earlier = usage.get_usage()
+        tracked_client.media_list({})
+        tracked_client.media_info("abc")
+
+        summary = usage.get_usage().since(earlier)
+        self.assertEqual(summary.by_endpoint(), {"media_list": 1, "media_info": 1})
+
+    def test_rate_limit_headers(self):
+        response = requests.Response()
+        response.headers.update(
+            {
+                "Content-Type": "application/json",
+                "X-RateLimit-Limit": "4500",
+                "X-RateLimit-Remaining": "4499",
+            }
+        )
+        usage.record_api_response(response)
+
+        self.assertEqual(
+            usage.get_usage().rate_limit_headers,
+            {"X-RateLimit-Limit": "4500", "X-RateLimit-Remaining": "4499"},
+        )
+
+    @responses.activate
+    def test_downloads_counted(self):
+        url = "https://test-org.bynder.com/m/abc/original/test.jpg"
+        responses.add(responses.HEAD, url, status=200)
+        responses.add(responses.GET, url, body=b"data", status=200)
+        session = create_download_session()
+
+        with usage.use_caller("refresh_bynder_images"):
+            session.head(url)
+            session.get(url)
+
+        self.assertEqual(
+            usage.get_usage().calls,
+            {
+                ("refresh_bynder_images", usage.DOWNLOAD_PREFLIGHT): 1,
+                ("refresh_bynder_images", usage.DOWNLOAD): 1,
+            },
+        )
@@ -1,9 +1,41 @@
+import hashlib
+import os
+import tempfile
+import threading
+
 from unittest import mock
 
-from django.test import SimpleTestCase
+import requests
+
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
+from django.test import SimpleTestCase, override_settings
 
-from wagtail_bynder.exceptions import BynderAssetDownloadError
-from wagtail_bynder.utils import download_file
+from wagtail_bynder import ratelimit
+from wagtail_bynder.exceptions import (
+    BynderAssetDownloadError,
+    BynderAssetDownloadInterrupted,
+    BynderAssetFileNotModified,
+    BynderAssetFileTooLarge,
+)
+from wagtail_bynder.utils import (
+    DownloadValidators,
+    ImageProbeResult,
+    PartialDownload,
+    download_file,
+    get_asset_data,
+    get_bynder_client,
+    get_download_session,
+    invalidate_stale_asset_data,
+    probe_image,
+    reset_bynder_clients,
+    stream_file_to_storage,
+    warm_up_bynder_client,
+)
+
+from .utils import TEST_ASSET_ID, get_fake_image, get_test_asset_data
 
 
 class DownloadFileTests(SimpleTestCase):
@@ -15,7 +47,10 @@ class DownloadFileTests(SimpleTestCase):
         mock_response.status_code = 502
 
         with (
-            mock.patch("wagtail_bynder.utils.requests.get", return_value=mock_response),
+            mock.patch(
+                "wagtail_bynder.utils.get_download_session",
+                return_value=mock.Mock(get=mock.Mock(return_value=mock_response)),
+            ),
             self.assertRaises(BynderAssetDownloadError) as cm,
         ):
             download_file("https://example.com/file.jpg", 5242880, "TEST_SETTING")
@@ -32,7 +67,10 @@ class DownloadFileTests(SimpleTestCase):
         mock_response.iter_content = mock.Mock(return_value=[])
 
         with (
-            mock.patch("wagtail_bynder.utils.requests.get", return_value=mock_response),
+            mock.patch(
+                "wagtail_bynder.utils.get_download_session",
+                return_value=mock.Mock(get=mock.Mock(return_value=mock_response)),
+            ),
             self.assertRaises(BynderAssetDownloadError) as cm,
         ):
             download_file("https://example.com/empty.jpg", 5242880, "TEST_SETTING")
@@ -48,7 +86,8 @@ class DownloadFileTests(SimpleTestCase):
         mock_response.iter_content = mock.Mock(return_value=[b"test ", b"data"])
 
         with mock.patch(
-            "wagtail_bynder.utils.requests.get", return_value=mock_response
+            "wagtail_bynder.utils.get_download_session",
+            return_value=mock.Mock(get=mock.Mock(return_value=mock_response)),
         ):
             result = download_file(
                 "https://example.com/good.jpg", 5242880, "TEST_SETTING"
@@ -57,3 +96,760 @@ class DownloadFileTests(SimpleTestCase):
         # Should return an InMemoryUploadedFile
         self.assertEqual(result.name, "good.jpg")
         self.assertGreater(result.size, 0)
+
+    def test_download_file_raises_error_on_connection_error(self):
+        """Test that download_file raises BynderAssetDownloadError when the connection fails"""
+        mock_session = mock.Mock()
+        mock_session.get.side_effect = requests.ConnectionError("Connection reset")
+
+        with (
+            mock.patch(
+                "wagtail_bynder.utils.get_download_session", return_value=mock_session
+            ),
+            self.assertRaises(BynderAssetDownloadError) as cm,
+        ):
+            download_file("https://example.com/file.jpg", 5242880, "TEST_SETTING")
+
+        self.assertIn("file.jpg", str(cm.exception))
+        self.assertIn("Connection reset", str(cm.exception))
+
+    def test_download_file_closes_response(self):
+        """Test that download_file always returns the connection to the pool"""
+        mock_response = mock.Mock()
+        mock_response.status_code = 502
+
+        with (
+            mock.patch(
+                "wagtail_bynder.utils.get_download_session",
+                return_value=mock.Mock(get=mock.Mock(return_value=mock_response)),
+            ),
+            self.assertRaises(BynderAssetDownloadError),
+        ):
+            download_file("https://example.com/file.jpg", 5242880, "TEST_SETTING")
+
+        mock_response.close.assert_called_once()
+
+    def test_download_file_is_held_in_memory_by_default(self):
+        mock_response = mock.Mock()
+        mock_response.status_code = 200
+        mock_response.iter_content = mock.Mock(return_value=[b"test ", b"data"])
+
+        with mock.patch(
+            "wagtail_bynder.utils.get_download_session",
+            return_value=mock.Mock(get=mock.Mock(return_value=mock_response)),
+        ):
+            result = download_file(
+                "https://example.com/good.pdf", 5242880, "TEST_SETTING"
+            )
+
+        self.assertIsInstance(result, InMemoryUploadedFile)
+        self.assertEqual(result.read(), b"test data")
+
+    @override_settings(BYNDER_DOWNLOAD_MAX_MEMORY_SIZE=6)
+    def test_download_file_spools_to_disk_when_over_max_memory_size(self):
+        mock_response = mock.Mock()
+        mock_response.status_code = 200
+        mock_response.iter_content = mock.Mock(
+            return_value=[b"test ", b"data", b" and more"]
+        )
+
+        with mock.patch(
+            "wagtail_bynder.utils.get_download_session",
+            return_value=mock.Mock(get=mock.Mock(return_value=mock_response)),
+        ):
+            result = download_file(
+                "https://example.com/good.pdf", 5242880, "TEST_SETTING"
+            )
+
+        self.assertIsInstance(result, TemporaryUploadedFile)
+        self.assertEqual(result.name, "good.pdf")
+        self.assertEqual(result.content_type, "application/pdf")
+        self.assertEqual(result.size, 18)
+        self.assertEqual(result.read(), b"test data and more")
+        path = result.temporary_file_path()
+        result.close()
+        self.assertFalse(os.path.exists(path))
+
+    @override_settings(BYNDER_DOWNLOAD_MAX_MEMORY_SIZE=6)
+    def test_download_file_removes_spooled_file_when_too_large(self):
+        mock_response = mock.Mock()
+        mock_response.status_code = 200
+        mock_response.iter_content = mock.Mock(
+            return_value=[b"test ", b"data", b" and more"]
+        )
+
+        spooled_files = []
+
+        def create_spooled_file(*args):
+            spooled_files.append(TemporaryUploadedFile(*args))
+            return spooled_files[-1]
+
+        with (
+            mock.patch(
+                "wagtail_bynder.utils.get_download_session",
+                return_value=mock.Mock(get=mock.Mock(return_value=mock_response)),
+            ),
+            mock.patch(
+                "wagtail_bynder.utils.TemporaryUploadedFile",
+                side_effect=create_spooled_file,
+            ),
+            self.assertRaises(BynderAssetFileTooLarge),
+        ):
+            download_file("https://example.com/big.pdf", 12, "TEST_SETTING")
+
+        spooled_file = spooled_files[0]
+        self.assertTrue(spooled_file.file.closed)
+        self.assertFalse(os.path.exists(spooled_file.file.name))
+
+    def test_download_file_returns_validators(self):
+        mock_response = mock.Mock()
+        mock_response.status_code = 200
+        mock_response.headers = {
+            "ETag": '"abc123"',
+            "Last-Modified": "Tue, 10 Oct 2023 09:52:05 GMT",
+        }
+        mock_response.iter_content = mock.Mock(return_value=[b"test ", b"data"])
+        mock_session = mock.Mock(get=mock.Mock(return_value=mock_response))
+
+        with mock.patch(
+            "wagtail_bynder.utils.get_download_session", return_value=mock_session
+        ):
+            result = download_file(
+                "https://example.com/good.jpg", 5242880, "TEST_SETTING"
+            )
+
+        # No conditional headers should have been sent
+        self.assertEqual(mock_session.get.call_args.kwargs["headers"], {})
+        self.assertEqual(
+            result.validators,
+            DownloadValidators('"abc123"', "Tue, 10 Oct 2023 09:52:05 GMT"),
+        )
+
+    def test_download_file_with_validators(self):
+        mock_response = mock.Mock()
+        mock_response.status_code = 304
+        mock_session = mock.Mock(get=mock.Mock(return_value=mock_response))
+
+        with (
+            mock.patch(
+                "wagtail_bynder.utils.get_download_session", return_value=mock_session
+            ),
+            self.assertRaises(BynderAssetFileNotModified),
+        ):
+            download_file(
+                "https://example.com/good.jpg",
+                5242880,
+                "TEST_SETTING",
+                validators=DownloadValidators(
+                    '"abc123"', "Tue, 10 Oct 2023 09:52:05 GMT"
+                ),
+            )
+
+        self.assertEqual(
+            mock_session.get.call_args.kwargs["headers"],
+            {
+                "If-None-Match": '"abc123"',
+                "If-Modified-Since": "Tue, 10 Oct 2023 09:52:05 GMT",
+            },
+        )
+        mock_response.iter_content.assert_not_called()
+        mock_response.close.assert_called_once()
+
+
+class DownloadSizeTests(SimpleTestCase):
+    """Tests for using the known size of a file before downloading it"""
+
+    url = "https://example.com/file.jpg"
+
+    def get_mock_session(self, chunks, content_length):
+        mock_response = mock.Mock()
+        mock_response.status_code = 200
+        mock_response.headers = {"Content-Length": str(content_length)}
+        mock_response.iter_content = mock.Mock(return_value=chunks)
+        return mock.Mock(
+            get=mock.Mock(return_value=mock_response),
+            head=mock.Mock(return_value=mock_response),
+        )
+
+    def test_file_too_large_rejected_before_reading_body(self):
+        mock_session = self.get_mock_session([b"test ", b"data"], 1000)
+
+        with (
+            mock.patch(
+                "wagtail_bynder.utils.get_download_session", return_value=mock_session
+            ),
+            self.assertRaises(BynderAssetFileTooLarge),
+        ):
+            download_file(self.url, 999, "TEST_SETTING")
+
+        response = mock_session.get.return_value
+        response.iter_content.assert_not_called()
+        response.close.assert_called()
+        # No preflight request should be made by default
+        mock_session.head.assert_not_called()
+
+    def test_content_length_ignored_for_compressed_responses(self):
+        mock_session = self.get_mock_session([b"test ", b"data"], 1000)
+        mock_session.get.return_value.headers["Content-Encoding"] = "gzip"
+
+        with mock.patch(
+            "wagtail_bynder.utils.get_download_session", return_value=mock_session
+        ):
+            result = download_file(self.url, 999, "TEST_SETTING")
+
+        self.assertEqual(result.read(), b"test data")
+
+    def test_file_downloaded_to_buffer_of_known_size(self):
+        mock_session = self.get_mock_session([b"test ", b"data"], 9)
+
+        with mock.patch(
+            "wagtail_bynder.utils.get_download_session", return_value=mock_session
+        ):
+            result = download_file(self.url, 5242880, "TEST_SETTING")
+
+        self.assertIsInstance(result, InMemoryUploadedFile)
+        self.assertEqual(result.size, 9)
+        self.assertEqual(result.file.getbuffer().nbytes, 9)
+        self.assertEqual(result.read(), b"test data")
+
+    @override_settings(BYNDER_DOWNLOAD_MAX_MEMORY_SIZE=8)
+    def test_file_of_known_size_written_straight_to_disk(self):
+        mock_session = self.get_mock_session([b"test ", b"data"], 9)
+
+        with (
+            mock.patch(
+                "wagtail_bynder.utils.get_download_session", return_value=mock_session
+            ),
+            mock.patch(
+                "wagtail_bynder.utils.TemporaryUploadedFile",
+                wraps=TemporaryUploadedFile,
+            ) as temporary_file_mock,
+        ):
+            result = download_file(self.url, 5242880, "TEST_SETTING")
+
+        self.assertIsInstance(result, TemporaryUploadedFile)
+        # The file should have been created before anything was written
+        temporary_file_mock.assert_called_once_with("file.jpg", "image/jpeg", 0, None)
+        self.assertEqual(result.size, 9)
+        self.assertEqual(result.read(), b"test data")
+        result.close()
+
+    @override_settings(BYNDER_DOWNLOAD_PREFLIGHT=True)
+    def test_preflight_request_rejects_file_too_large(self):
+        mock_session = self.get_mock_session([b"test ", b"data"], 1000)
+
+        with (
+            mock.patch(
+                "wagtail_bynder.utils.get_download_session", return_value=mock_session
+            ),
+            self.assertRaises(BynderAssetFileTooLarge),
+        ):
+            download_file(self.url, 999, "TEST_SETTING")
+
+        mock_session.head.assert_called_once()
+        mock_session.get.assert_not_called()
+
+    @override_settings(BYNDER_DOWNLOAD_PREFLIGHT=True)
+    def test_preflight_request_errors_ignored(self):
+        mock_session = self.get_mock_session([b"test ", b"data"], 9)
+        mock_session.head.side_effect = requests.ConnectionError("Oops")
+
+        with mock.patch(
+            "wagtail_bynder.utils.get_download_session", return_value=mock_session
+        ):
+            result = download_file(self.url, 5242880, "TEST_SETTING")
+
+        self.assertEqual(result.read(), b"test data")
+
+
+class DownloadBandwidthLimitTests(SimpleTestCase):
+    """Tests for limiting the bandwidth used by background downloads"""
+
+    url = "https://example.com/file.jpg"
+
+    def download(self):
+        mock_response = mock.Mock()
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.iter_content = mock.Mock(return_value=[b"test ", b"data"])
+        with (
+            mock.patch(
+                "wagtail_bynder.utils.get_download_session",
+                return_value=mock.Mock(get=mock.Mock(return_value=mock_response)),
+            ),
+            mock.patch.object(
+                ratelimit.TokenBucketRateLimiter, "acquire"
+            ) as acquire_mock,
+        ):
+            result = download_file(self.url, 5242880, "TEST_SETTING")
+        self.assertEqual(result.read(), b"test data")
+        return acquire_mock
+
+    @override_settings(BYNDER_DOWNLOAD_BANDWIDTH_LIMIT=1024)
+    def test_background_downloads_are_limited(self):
+        with ratelimit.use_budget(ratelimit.BACKGROUND):
+            acquire_mock = self.download()
+
+        acquire_mock.assert_has_calls([mock.call(5), mock.call(4)])
+
+    @override_settings(BYNDER_DOWNLOAD_BANDWIDTH_LIMIT=1024)
+    def test_interactive_downloads_are_not_limited(self):
+        acquire_mock = self.download()
+
+        acquire_mock.assert_not_called()
+
+    def test_no_limit_by_default(self):
+        with ratelimit.use_budget(ratelimit.BACKGROUND):
+            acquire_mock = self.download()
+
+        acquire_mock.assert_not_called()
+
+
+class DownloadSessionTests(SimpleTestCase):
+    """Tests for the shared session used to download asset files"""
+
+    def test_session_is_reused(self):
+        self.assertIs(get_download_session(), get_download_session())
+
+    @override_settings(
+        BYNDER_DOWNLOAD_MAX_RETRIES=5,
+        BYNDER_DOWNLOAD_RETRY_BACKOFF_FACTOR=2,
+        BYNDER_DOWNLOAD_POOL_SIZE=4,
+    )
+    def test_session_is_configured_from_settings(self):
+        adapter = get_download_session().get_adapter("https://example.com/")
+        self.assertEqual(adapter.max_retries.total, 5)
+        self.assertEqual(adapter.max_retries.backoff_factor, 2)
+        self.assertIn(503, adapter.max_retries.status_forcelist)
+        self.assertEqual(adapter._pool_maxsize, 4)
+
+    def test_session_is_replaced_when_settings_change(self):
+        session = get_download_session()
+        with override_settings(BYNDER_DOWNLOAD_MAX_RETRIES=0):
+            self.assertIsNot(get_download_session(), session)
+
+
+class ResumableDownloadTests(SimpleTestCase):
+    """Tests for resuming interrupted downloads using Range requests"""
+
+    url = "https://example.com/large.pdf"
+
+    def setUp(self):
+        super().setUp()
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+        self.enterContext(
+            override_settings(BYNDER_DOWNLOAD_RESUME_DIR=self.tempdir.name)
+        )
+
+    @staticmethod
+    def get_mock_response(status_code, chunks, headers=None, *, interrupt=False):
+        def iter_content(chunk_size):
+            yield from chunks
+            if interrupt:
+                raise requests.ConnectionError("Connection reset")
+
+        mock_response = mock.Mock()
+        mock_response.status_code = status_code
+        mock_response.headers = headers or {}
+        mock_response.iter_content = iter_content
+        return mock_response
+
+    def download(self, *responses):
+        mock_session = mock.Mock(get=mock.Mock(side_effect=responses))
+        with mock.patch(
+            "wagtail_bynder.utils.get_download_session", return_value=mock_session
+        ):
+            return download_file(self.url, 5242880, "TEST_SETTING"), mock_session
+
+    def interrupt_download(self, headers):
+        with self.assertRaises(BynderAssetDownloadInterrupted):
+            self.download(
+                self.get_mock_response(
+                    200, [b"first ", b"part "], headers, interrupt=True
+                )
+            )
+
+    def test_interrupted_download_is_resumed(self):
+        headers = {"ETag": '"abc123"'}
+        self.interrupt_download(headers)
+        self.assertEqual(len(os.listdir(self.tempdir.name)), 2)
+
+        result, mock_session = self.download(
+            self.get_mock_response(
+                206,
+                [b"second part"],
+                {"ETag": '"abc123"', "Content-Range": "bytes 11-21/22"},
+            )
+        )
+
+        self.assertEqual(
+            mock_session.get.call_args.kwargs["headers"],
+            {"Range": "bytes=11-", "If-Range": '"abc123"'},
+        )
+        self.assertEqual(result.read(), b"first part second part")
+        self.assertEqual(result.size, 22)
+        self.assertEqual(result.validators, DownloadValidators('"abc123"'))
+        # The partial file should have been removed
+        self.assertEqual(os.listdir(self.tempdir.name), [])
+
+    def test_resume_uses_last_modified_for_weak_etags(self):
+        self.interrupt_download(
+            {"ETag": 'W/"abc123"', "Last-Modified": "Tue, 10 Oct 2023 09:52:05 GMT"}
+        )
+        _, mock_session = self.download(
+            self.get_mock_response(200, [b"the whole thing"])
+        )
+        self.assertEqual(
+            mock_session.get.call_args.kwargs["headers"],
+            {"Range": "bytes=11-", "If-Range": "Tue, 10 Oct 2023 09:52:05 GMT"},
+        )
+
+    def test_download_restarts_when_source_has_changed(self):
+        self.interrupt_download({"ETag": '"abc123"'})
+
+        # Bynder ignores the Range header when If-Range doesn't match
+        result, _ = self.download(
+            self.get_mock_response(200, [b"new file"], {"ETag": '"def456"'})
+        )
+
+        self.assertEqual(result.read(), b"new file")
+        self.assertEqual(result.validators, DownloadValidators('"def456"'))
+
+    def test_download_restarts_when_range_not_satisfiable(self):
+        self.interrupt_download({"ETag": '"abc123"'})
+
+        result, mock_session = self.download(
+            self.get_mock_response(416, []),
+            self.get_mock_response(200, [b"whole file"], {"ETag": '"abc123"'}),
+        )
+
+        self.assertEqual(mock_session.get.call_count, 2)
+        self.assertEqual(mock_session.get.call_args.kwargs["headers"], {})
+        self.assertEqual(result.read(), b"whole file")
+
+    def test_download_in_progress_elsewhere_is_not_resumed_or_touched(self):
+        self.interrupt_download({"ETag": '"abc123"'})
+        shared_files = sorted(os.listdir(self.tempdir.name))
+
+        # Another download of the same file holds the lock on the partial file
+        other = PartialDownload(self.url, self.tempdir.name)
+        self.addCleanup(other.close)
+
+        result, mock_session = self.download(
+            self.get_mock_response(200, [b"whole file"], {"ETag": '"abc123"'})
+        )
+
+        self.assertEqual(mock_session.get.call_args.kwargs["headers"], {})
+        self.assertEqual(result.read(), b"whole file")
+        # The shared partial file should have been left alone, and the one
+        # used for this download removed
+        self.assertEqual(sorted(os.listdir(self.tempdir.name)), shared_files)
+        with open(other.path, "rb") as f:
+            self.assertEqual(f.read(), b"first part ")
+
+    def test_interrupted_download_elsewhere_is_not_kept(self):
+        other = PartialDownload(self.url, self.tempdir.name)
+        self.addCleanup(other.close)
+
+        self.interrupt_download({"ETag": '"abc123"'})
+
+        self.assertEqual(os.listdir(self.tempdir.name), [os.path.basename(other.path)])
+
+    def test_interrupted_download_without_validators_is_not_kept(self):
+        self.interrupt_download({})
+        self.assertEqual(os.listdir(self.tempdir.name), [])
+
+    def test_partial_file_removed_when_too_large(self):
+        self.interrupt_download({"ETag": '"abc123"'})
+
+        mock_session = mock.Mock(
+            get=mock.Mock(
+                return_value=self.get_mock_response(
+                    206,
+                    [b"second part"],
+                    {"ETag": '"abc123"', "Content-Range": "bytes 11-21/22"},
+                )
+            )
+        )
+        with (
+            mock.patch(
+                "wagtail_bynder.utils.get_download_session", return_value=mock_session
+            ),
+            self.assertRaises(BynderAssetFileTooLarge),
+        ):
+            # The bytes received previously should count towards the limit
+            download_file(self.url, 20, "TEST_SETTING")
+
+        self.assertEqual(os.listdir(self.tempdir.name), [])
+
+
+class StreamFileToStorageTests(SimpleTestCase):
+    """Tests for streaming downloaded files directly into a storage backend"""
+
+    def setUp(self):
+        super().setUp()
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+        self.storage = FileSystemStorage(location=self.tempdir.name)
+
+    def stream(self, chunks, max_filesize=5242880, name="documents/file.pdf"):
+        mock_response = mock.Mock()
+        mock_response.status_code = 200
+        mock_response.iter_content = mock.Mock(return_value=chunks)
+        with mock.patch(
+            "wagtail_bynder.utils.get_download_session",
+            return_value=mock.Mock(get=mock.Mock(return_value=mock_response)),
+        ):
+            result = stream_file_to_storage(
+                "https://example.com/file.pdf",
+                self.storage,
+                name,
+                max_filesize,
+                "TEST_SETTING",
+            )
+        mock_response.close.assert_called()
+        return result
+
+    def test_stream_file_to_storage(self):
+        chunks = [b"test ", b"data", b" and more"]
+        result = self.stream(chunks)
+
+        self.assertEqual(result.name, "documents/file.pdf")
+        self.assertEqual(result.size, 18)
+        self.assertEqual(
+            result.file_hash,
+            hashlib.sha1(b"test data and more", usedforsecurity=False).hexdigest(),
+        )
+        with self.storage.open(result.name) as f:
+            self.assertEqual(f.read(), b"test data and more")
+
+    def test_stream_file_to_storage_uses_available_name(self):
+        self.storage.save("documents/file.pdf", ContentFile(b"existing"))
+        result = self.stream([b"new data"])
+
+        self.assertNotEqual(result.name, "documents/file.pdf")
+        with self.storage.open("documents/file.pdf") as f:
+            self.assertEqual(f.read(), b"existing")
+        with self.storage.open(result.name) as f:
+            self.assertEqual(f.read(), b"new data")
+
+    def test_stream_file_to_storage_when_too_large(self):
+        with self.assertRaises(BynderAssetFileTooLarge):
+            self.stream([b"test ", b"data", b" and more"], max_filesize=12)
+
+        # The partially written file should have been removed
+        self.assertFalse(self.storage.exists("documents/file.pdf"))
+
+    def test_stream_file_to_storage_rejects_file_too_large_upfront(self):
+        mock_response = mock.Mock()
+        mock_response.status_code = 200
+        mock_response.headers = {"Content-Length": "1000"}
+        with (
+            mock.patch(
+                "wagtail_bynder.utils.get_download_session",
+                return_value=mock.Mock(get=mock.Mock(return_value=mock_response)),
+            ),
+            self.assertRaises(BynderAssetFileTooLarge),
+        ):
+            stream_file_to_storage(
+                "https://example.com/file.pdf",
+                self.storage,
+                "documents/file.pdf",
+                999,
+                "TEST_SETTING",
+            )
+        mock_response.iter_content.assert_not_called()
+        self.assertFalse(self.storage.exists("documents/file.pdf"))
+
+    def test_stream_file_to_storage_when_empty(self):
+        with self.assertRaises(BynderAssetDownloadError):
+            self.stream([])
+
+        self.assertFalse(self.storage.exists("documents/file.pdf"))
+
+
+class ProbeImageTests(SimpleTestCase):
+    """Tests for reading image details from the start of a file"""
+
+    url = "https://example.com/image.jpg"
+
+    def probe(self, data, status_code=206):
+        mock_response = mock.Mock()
+        mock_response.status_code = status_code
+        mock_response.iter_content = mock.Mock(return_value=[data])
+        mock_session = mock.Mock(get=mock.Mock(return_value=mock_response))
+        with mock.patch(
+            "wagtail_bynder.utils.get_download_session", return_value=mock_session
+        ):
+            result = probe_image(self.url)
+        mock_response.close.assert_called_once()
+        return result, mock_session
+
+    @override_settings(BYNDER_IMAGE_PROBE_SIZE=4096)
+    def test_probe_image(self):
+        data = get_fake_image(width=640, height=480).getvalue()
+        result, mock_session = self.probe(data)
+
+        self.assertEqual(result, ImageProbeResult(640, 480, "jpeg"))
+        self.assertEqual(
+            mock_session.get.call_args.kwargs["headers"], {"Range": "bytes=0-4095"}
+        )
+
+    def test_probe_image_when_range_not_supported(self):
+        data = get_fake_image(width=640, height=480).getvalue()
+        result, _ = self.probe(data, status_code=200)
+
+        self.assertEqual(result, ImageProbeResult(640, 480, "jpeg"))
+
+    def test_probe_image_when_header_incomplete(self):
+        data = get_fake_image(width=640, height=480).getvalue()
+        result, _ = self.probe(data[:10])
+
+        self.assertIsNone(result)
+
+    def test_probe_image_when_not_an_image(self):
+        result, _ = self.probe(b"%PDF-1.7 not an image")
+
+        self.assertIsNone(result)
+
+    def test_probe_image_error_response(self):
+        result, _ = self.probe(b"Not found", status_code=404)
+
+        self.assertIsNone(result)
+
+
+class BynderClientTests(SimpleTestCase):
+    """Tests for the reuse of Bynder API clients"""
+
+    def setUp(self):
+        super().setUp()
+        reset_bynder_clients(setting="BYNDER_API_TOKEN")
+        # The 'asset_bank_client' of each client created, before wrapping
+        self.asset_bank_clients = []
+
+        def create_client(**kwargs):
+            client = mock.Mock(session=requests.Session())
+            self.asset_bank_clients.append(client.asset_bank_client)
+            return client
+
+        patcher = mock.patch(
+            "wagtail_bynder.utils.BynderClient", side_effect=create_client
+        )
+        self.client_class_mock = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(reset_bynder_clients, setting="BYNDER_API_TOKEN")
+
+    def test_client_is_reused(self):
+        client = get_bynder_client()
+        self.assertIs(get_bynder_client(), client)
+        self.client_class_mock.assert_called_once()
+
+        # Clients are shared between threads by default
+        other_clients = []
+        thread = threading.Thread(
+            target=lambda: other_clients.append(get_bynder_client())
+        )
+        thread.start()
+        thread.join()
+        self.assertIs(other_clients[0], client)
+
+    def test_client_per_budget(self):
+        self.assertIsNot(
+            get_bynder_client(ratelimit.INTERACTIVE),
+            get_bynder_client(ratelimit.BACKGROUND),
+        )
+
+    def test_client_replaced_when_settings_change(self):
+        client = get_bynder_client()
+        with override_settings(BYNDER_DOMAIN="another.bynder.com"):
+            self.assertIsNot(get_bynder_client(), client)
+
+    @override_settings(BYNDER_CLIENT_SCOPE="thread")
+    def test_client_per_thread(self):
+        client = get_bynder_client()
+        self.assertIs(get_bynder_client(), client)
+
+        other_clients = []
+        thread = threading.Thread(
+            target=lambda: other_clients.append(get_bynder_client())
+        )
+        thread.start()
+        thread.join()
+        self.assertIsNot(other_clients[0], client)
+
+    @override_settings(BYNDER_API_POOL_SIZE=25)
+    def test_connection_pool_size(self):
+        adapter = get_bynder_client().session.get_adapter("https://example.com")
+        self.assertEqual(adapter._pool_maxsize, 25)
+
+    def test_warm_up(self):
+        warm_up_bynder_client()
+        self.asset_bank_clients[0].brands.assert_called_once()
+
+    def test_warm_up_errors_are_logged(self):
+        get_bynder_client()
+        self.asset_bank_clients[0].brands.side_effect = requests.ConnectionError()
+        with self.assertLogs("wagtail_bynder", level="WARNING"):
+            warm_up_bynder_client()
+
+
+@override_settings(
+    BYNDER_ASSET_DATA_CACHE_TIMEOUT=300,
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "wagtail-bynder-asset-data-tests",
+        }
+    },
+)
+class AssetDataCacheTests(SimpleTestCase):
+    """Tests for the caching of asset data by get_asset_data()"""
+
+    def setUp(self):
+        super().setUp()
+        self.asset_data = get_test_asset_data(id=TEST_ASSET_ID)
+        self.client = mock.Mock()
+        self.client.media_info.return_value = self.asset_data
+        self.addCleanup(caches["default"].clear)
+
+    def test_data_is_cached(self):
+        self.assertEqual(
+            get_asset_data(TEST_ASSET_ID, client=self.client), self.asset_data
+        )
+        self.assertEqual(
+            get_asset_data(TEST_ASSET_ID, client=self.client), self.asset_data
+        )
+        self.client.media_info.assert_called_once_with(TEST_ASSET_ID)
+
+    def test_refresh(self):
+        get_asset_data(TEST_ASSET_ID, client=self.client)
+        new_data = {**self.asset_data, "dateModified": "2024-01-02T12:00:00Z"}
+        self.client.media_info.return_value = new_data
+        self.assertEqual(
+            get_asset_data(TEST_ASSET_ID, client=self.client, refresh=True), new_data
+        )
+        # The refreshed data replaces the cached data
+        self.assertEqual(get_asset_data(TEST_ASSET_ID, client=self.client), new_data)
+        self.assertEqual(self.client.media_info.call_count, 2)
+
+    @override_settings(BYNDER_ASSET_DATA_CACHE_TIMEOUT=None)
+    def test_data_not_cached_by_default(self):
+        get_asset_data(TEST_ASSET_ID, client=self.client)
+        get_asset_data(TEST_ASSET_ID, client=self.client)
+        self.assertEqual(self.client.media_info.call_count, 2)
+
+    def test_invalidate_stale_asset_data(self):
+        get_asset_data(TEST_ASSET_ID, client=self.client)
+
+        # Data is kept when the asset is unchanged
+        invalidate_stale_asset_data([self.asset_data])
+        get_asset_data(TEST_ASSET_ID, client=self.client)
+        self.client.media_info.assert_called_once()
+
+        # Data is removed once the asset has been modified
+        invalidate_stale_asset_data(
+            [{"id": TEST_ASSET_ID, "dateModified": "2024-01-02T12:00:00Z"}]
+        )
+        get_asset_data(TEST_ASSET_ID, client=self.client)
+        self.assertEqual(self.client.media_info.call_count, 2)
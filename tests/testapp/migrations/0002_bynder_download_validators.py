@@ -0,0 +1,46 @@
+# Generated by Django 5.0.14 on 2026-10-16 21:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("testapp", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customdocument",
+            name="source_etag",
+            field=models.CharField(
+                blank=True, editable=False, max_length=255, verbose_name="source ETag"
+            ),
+        ),
+        migrations.AddField(
+            model_name="customdocument",
+            name="source_last_modified",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=64,
+                verbose_name="source last modified",
+            ),
+        ),
+        migrations.AddField(
+            model_name="customimage",
+            name="source_etag",
+            field=models.CharField(
+                blank=True, editable=False, max_length=255, verbose_name="source ETag"
+            ),
+        ),
+        migrations.AddField(
+            model_name="customimage",
+            name="source_last_modified",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=64,
+                verbose_name="source last modified",
+            ),
+        ),
+    ]